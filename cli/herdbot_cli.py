@@ -10,20 +10,78 @@ Usage:
 """
 
 import asyncio
+import atexit
+import contextlib
 import json
 import sys
+from collections.abc import Coroutine, Iterator
 from typing import Any
 
 import click
 import httpx
 
+try:
+    import orjson
+
+    def _dumps(obj: Any, indent: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    _loads = orjson.loads
+except ImportError:
+
+    def _dumps(obj: Any, indent: bool = False) -> str:
+        return json.dumps(obj, indent=2 if indent else None)
+
+    _loads = json.loads
+
 # Default server URL
 DEFAULT_URL = "http://localhost:8000"
 
+# monitor writes stdout in chunks instead of one flush per message
+MONITOR_FLUSH_BYTES = 16384
+MONITOR_FLUSH_INTERVAL_S = 0.05
+
+
+def _run(main: Coroutine[Any, Any, Any]) -> Any:
+    """Run a command's coroutine, on uvloop when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main)
+    return uvloop.run(main)
+
+
+# Keep-alive HTTP clients shared by all commands in this process, keyed by URL
+_CLIENTS: dict[str, httpx.Client] = {}
+
+
+def _close_clients() -> None:
+    """Close all shared HTTP clients."""
+    for client in _CLIENTS.values():
+        client.close()
+    _CLIENTS.clear()
+
 
 def get_client(url: str) -> httpx.Client:
-    """Create HTTP client."""
-    return httpx.Client(base_url=url, timeout=30.0)
+    """Get the shared HTTP client for a server URL, creating it on first use."""
+    client = _CLIENTS.get(url)
+    if client is None:
+        if not _CLIENTS:
+            atexit.register(_close_clients)
+        client = httpx.Client(
+            base_url=url,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=4),
+        )
+        _CLIENTS[url] = client
+    return client
+
+
+@contextlib.contextmanager
+def shared_client(url: str) -> Iterator[httpx.Client]:
+    """Use the shared HTTP client without closing it on exit."""
+    yield get_client(url)
 
 
 def get_async_client(url: str) -> httpx.AsyncClient:
@@ -49,6 +107,9 @@ def start(host: str, port: int, workers: int, reload: bool) -> None:
     """Start the herdbot server."""
     import uvicorn
 
+    from server.core import get_settings
+
+    settings = get_settings()
     click.echo(f"Starting herdbot server on {host}:{port}")
 
     uvicorn.run(
@@ -57,6 +118,11 @@ def start(host: str, port: int, workers: int, reload: bool) -> None:
         port=port,
         workers=workers,
         reload=reload,
+        # "auto" picks uvloop when installed (uvicorn[standard] ships it)
+        loop="auto" if settings.use_uvloop else "asyncio",
+        # Idle telemetry streams are kept alive with protocol-level pings
+        ws_ping_interval=settings.ws_ping_interval_s,
+        ws_ping_timeout=settings.ws_ping_timeout_s,
         log_level="info",
     )
 
@@ -67,38 +133,34 @@ def devices(ctx: click.Context) -> None:
     """List all registered devices."""
     url = ctx.obj["url"]
 
-    try:
-        with get_client(url) as client:
-            response = client.get("/devices")
+    async def fetch() -> tuple[dict[str, Any], list[str]]:
+        async with httpx.AsyncClient(base_url=url, http2=True, timeout=30.0) as client:
+            response = await client.get("/devices", params={"with_status": "true"})
             response.raise_for_status()
             data = response.json()
 
-            if not data["devices"]:
-                click.echo("No devices registered")
-                return
-
-            click.echo(f"\nDevices ({data['online']}/{data['total']} online):\n")
-            click.echo(f"{'ID':<20} {'Type':<15} {'Status':<10} {'Name'}")
-            click.echo("-" * 60)
-
-            for device in data["devices"]:
-                device_id = device.get("device_id", "unknown")
-                device_type = device.get("device_type", "unknown")
-                name = device.get("name", "-")
-
-                # Get status
-                status_resp = client.get(f"/devices/{device_id}/status")
-                status = "unknown"
-                if status_resp.status_code == 200:
-                    status_data = status_resp.json()
-                    status = status_data.get("status", "unknown")
-
-                status_color = "green" if status == "online" else "red"
-                click.echo(
-                    f"{device_id:<20} {device_type:<15} "
-                    f"{click.style(status, fg=status_color):<10} {name}"
+            statuses = data.get("statuses")
+            if statuses is not None:
+                return data, [
+                    statuses.get(device.get("device_id"), {}).get("status", "unknown")
+                    for device in data["devices"]
+                ]
+
+            # Older servers ignore with_status: fan out the per-device status
+            # requests over one connection instead
+            responses = await asyncio.gather(
+                *(
+                    client.get(f"/devices/{device.get('device_id', 'unknown')}/status")
+                    for device in data["devices"]
                 )
+            )
+            return data, [
+                r.json().get("status", "unknown") if r.status_code == 200 else "unknown"
+                for r in responses
+            ]
 
+    try:
+        data, statuses = _run(fetch())
     except httpx.ConnectError:
         click.echo(f"Error: Cannot connect to server at {url}", err=True)
         sys.exit(1)
@@ -106,6 +168,24 @@ def devices(ctx: click.Context) -> None:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
 
+    if not data["devices"]:
+        click.echo("No devices registered")
+        return
+
+    click.echo(f"\nDevices ({data['online']}/{data['total']} online):\n")
+    click.echo(f"{'ID':<20} {'Type':<15} {'Status':<10} {'Name'}")
+    click.echo("-" * 60)
+
+    for device, status in zip(data["devices"], statuses, strict=True):
+        device_id = device.get("device_id", "unknown")
+        device_type = device.get("device_type", "unknown")
+        name = device.get("name", "-")
+
+        status_color = "green" if status == "online" else "red"
+        click.echo(
+            f"{device_id:<20} {device_type:<15} {click.style(status, fg=status_color):<10} {name}"
+        )
+
 
 @cli.command()
 @click.argument("device_id")
@@ -117,13 +197,13 @@ def send(ctx: click.Context, device_id: str, action: str, params: str) -> None:
     url = ctx.obj["url"]
 
     try:
-        params_dict = json.loads(params)
+        params_dict = _loads(params)
     except json.JSONDecodeError:
         click.echo("Error: Invalid JSON parameters", err=True)
         sys.exit(1)
 
     try:
-        with get_client(url) as client:
+        with shared_client(url) as client:
             response = client.post(
                 f"/devices/{device_id}/command",
                 json={"action": action, "params": params_dict},
@@ -159,42 +239,82 @@ def monitor(ctx: click.Context, device_id: str, format: str) -> None:
         import websockets
 
         ws_url = url.replace("http://", "ws://").replace("https://", "wss://")
+        loop = asyncio.get_running_loop()
 
         click.echo(f"Connecting to {device_id}...")
 
         try:
+            # Telemetry frames are small; deflate costs CPU without saving much
             async with websockets.connect(
-                f"{ws_url}/telemetry/stream/{device_id}"
+                f"{ws_url}/telemetry/stream/{device_id}",
+                compression=None,
+                max_size=2**20,
+                ping_interval=20,
             ) as ws:
                 click.echo("Connected. Streaming telemetry (Ctrl+C to stop):\n")
 
-                while True:
-                    msg = await ws.recv()
-                    data = json.loads(msg)
-
-                    if data.get("type") == "keepalive":
-                        continue
-
-                    if format == "json":
-                        click.echo(json.dumps(data, indent=2))
-                    else:
-                        sensor = data.get("sensor_type", "unknown")
-                        value = data.get("value", "?")
-                        unit = data.get("unit", "")
-                        ts = data.get("timestamp", "")[:19]
-
-                        if isinstance(value, dict):
-                            value = json.dumps(value)
-                        elif isinstance(value, list):
-                            value = ", ".join(str(v) for v in value[:3])
-
-                        click.echo(f"[{ts}] {sensor}: {value} {unit}")
+                out = sys.stdout
+                buf: list[str] = []
+                buf_size = 0
+                last_flush = loop.time()
+
+                # Lines still buffered when the stream ends (server closed
+                # the socket, Ctrl+C) are written out before returning
+                try:
+                    while True:
+                        # With output pending, wait at most until the next flush is due
+                        if buf:
+                            timeout = MONITOR_FLUSH_INTERVAL_S - (loop.time() - last_flush)
+                            try:
+                                msg = await asyncio.wait_for(ws.recv(decode=False), max(timeout, 0))
+                            except TimeoutError:
+                                msg = None
+                        else:
+                            msg = await ws.recv(decode=False)
+
+                        if msg is not None:
+                            data = _loads(msg)
+                            # Readings that arrive together are batched into one array
+                            readings = data if isinstance(data, list) else (data,)
+
+                            for data in readings:
+                                if format == "json":
+                                    line = _dumps(data, indent=True)
+                                else:
+                                    sensor = data.get("sensor_type", "unknown")
+                                    value = data.get("value", "?")
+                                    unit = data.get("unit", "")
+                                    ts = data.get("timestamp", "")[:19]
+
+                                    if isinstance(value, dict):
+                                        value = _dumps(value)
+                                    elif isinstance(value, list):
+                                        value = ", ".join(str(v) for v in value[:3])
+
+                                    line = f"[{ts}] {sensor}: {value} {unit}"
+
+                                buf.append(line)
+                                buf.append("\n")
+                                buf_size += len(line) + 1
+
+                        if buf_size >= MONITOR_FLUSH_BYTES or (
+                            buf and loop.time() - last_flush >= MONITOR_FLUSH_INTERVAL_S
+                        ):
+                            out.write("".join(buf))
+                            out.flush()
+                            buf.clear()
+                            buf_size = 0
+                            last_flush = loop.time()
+                finally:
+                    if buf:
+                        out.write("".join(buf))
+                        out.flush()
 
         except Exception as e:
             click.echo(f"Error: {e}", err=True)
 
     try:
-        asyncio.run(stream())
+        _run(stream())
     except KeyboardInterrupt:
         click.echo("\nStopped")
 
@@ -216,7 +336,7 @@ def health(ctx: click.Context) -> None:
     url = ctx.obj["url"]
 
     try:
-        with get_client(url) as client:
+        with shared_client(url) as client:
             response = client.get("/health")
             response.raise_for_status()
             data = response.json()
@@ -247,7 +367,7 @@ def ask(ctx: click.Context, message: str, provider: str | None) -> None:
     url = ctx.obj["url"]
 
     try:
-        with get_client(url) as client:
+        with shared_client(url) as client:
             payload: dict[str, Any] = {"message": message}
             if provider:
                 payload["provider"] = provider
@@ -12,7 +12,10 @@ Usage:
     3. Upload to ESP32 and run
 """
 
+import math
+import struct
 import time
+from array import array
 
 # Herdbot imports
 from herdbot import Device
@@ -32,6 +35,15 @@ I2C_SDA = 21
 I2C_SCL = 22
 MPU6050_ADDR = 0x68
 
+# Unit conversion, folded into a single multiply per axis
+_DEG2RAD = math.pi / 180.0
+_G = 9.81
+ACC_SCALE = _G / 16384.0  # raw (+-2g range) -> m/s^2
+GYRO_SCALE = _DEG2RAD / 131.0  # raw (+-250 deg/s range) -> rad/s
+
+# Samples per MQTT message (10 x 50 ms = 500 ms, stays under one TCP segment)
+BATCH_N = 10
+
 
 class MPU6050:
     """Simple MPU6050 driver."""
@@ -45,24 +57,20 @@ class MPU6050:
         time.sleep(0.1)
 
     def read_raw(self) -> tuple:
-        """Read raw accelerometer and gyroscope values."""
+        """Read accelerometer (m/s^2) and gyroscope (rad/s) values."""
         data = self.i2c.readfrom_mem(self.addr, 0x3B, 14)
 
-        ax = self._bytes_to_int(data[0:2]) / 16384.0
-        ay = self._bytes_to_int(data[2:4]) / 16384.0
-        az = self._bytes_to_int(data[4:6]) / 16384.0
-
-        gx = self._bytes_to_int(data[8:10]) / 131.0
-        gy = self._bytes_to_int(data[10:12]) / 131.0
-        gz = self._bytes_to_int(data[12:14]) / 131.0
-
-        return (ax, ay, az, gx, gy, gz)
+        # Seven big-endian int16 registers: accel xyz, temperature, gyro xyz
+        ax, ay, az, _t, gx, gy, gz = struct.unpack(">hhhhhhh", data)
 
-    def _bytes_to_int(self, data: bytes) -> int:
-        value = (data[0] << 8) | data[1]
-        if value >= 0x8000:
-            value -= 0x10000
-        return value
+        return (
+            ax * ACC_SCALE,
+            ay * ACC_SCALE,
+            az * ACC_SCALE,
+            gx * GYRO_SCALE,
+            gy * GYRO_SCALE,
+            gz * GYRO_SCALE,
+        )
 
 
 def main():
@@ -94,24 +102,19 @@ def main():
     @device.on_command("calibrate")
     def handle_calibrate(params):
         print("Calibrating IMU...")
-        # Simple calibration: take average of several readings
+        # Simple calibration: average several readings (the I2C burst read
+        # paces the loop, so no sleep between samples)
         samples = 100
-        ax_sum = ay_sum = az_sum = 0
-        gx_sum = gy_sum = gz_sum = 0
+        acc = array("f", [0.0] * 6)
 
         for _ in range(samples):
-            ax, ay, az, gx, gy, gz = imu.read_raw()
-            ax_sum += ax
-            ay_sum += ay
-            az_sum += az
-            gx_sum += gx
-            gy_sum += gy
-            gz_sum += gz
-            time.sleep(0.01)
+            r = imu.read_raw()
+            for i in range(6):
+                acc[i] += r[i]
 
         offsets = {
-            "accel_offset": [ax_sum/samples, ay_sum/samples, az_sum/samples - 1.0],
-            "gyro_offset": [gx_sum/samples, gy_sum/samples, gz_sum/samples],
+            "accel_offset": [acc[0] / samples, acc[1] / samples, acc[2] / samples - _G],
+            "gyro_offset": [acc[3] / samples, acc[4] / samples, acc[5] / samples],
         }
 
         print(f"Calibration complete: {offsets}")
@@ -126,32 +129,33 @@ def main():
 
     # Main loop
     last_publish = 0
-    publish_interval_ms = 50  # 20 Hz
+    publish_interval_ms = 50  # 20 Hz sampling
+    batch = []
+
+    # Bind hot-loop callables once
+    check_msg = device._mqtt.check_msg
+    read_raw = imu.read_raw
+    ticks_ms = time.ticks_ms
+    ticks_diff = time.ticks_diff
+    sleep_ms = time.sleep_ms
 
     try:
         while True:
             # Check for commands
-            device._mqtt.check_msg()
-
-            # Publish IMU data at interval
-            now = time.ticks_ms()
-            if time.ticks_diff(now, last_publish) >= publish_interval_ms:
-                ax, ay, az, gx, gy, gz = imu.read_raw()
-
-                # Convert gyro to rad/s
-                import math
-                gx_rad = gx * math.pi / 180
-                gy_rad = gy * math.pi / 180
-                gz_rad = gz * math.pi / 180
+            check_msg()
 
-                imu_sensor.publish_raw(
-                    accel=[ax * 9.81, ay * 9.81, az * 9.81],  # Convert to m/s^2
-                    gyro=[gx_rad, gy_rad, gz_rad]
-                )
+            # Sample IMU data at interval, publish in batches
+            now = ticks_ms()
+            if ticks_diff(now, last_publish) >= publish_interval_ms:
+                ax, ay, az, gx, gy, gz = read_raw()
+                batch.append((now, ax, ay, az, gx, gy, gz))
+                if len(batch) == BATCH_N:
+                    imu_sensor.publish_raw_batch(batch)
+                    batch = []
 
                 last_publish = now
 
-            time.sleep_ms(5)
+            sleep_ms(5)
 
     except KeyboardInterrupt:
         pass
@@ -58,6 +58,10 @@ class MotorController:
         self.max_speed = 1023  # Max PWM duty
         self.wheel_base = 0.2  # meters between wheels
 
+        # Last values written to the hardware (direction: 1, -1, or 0 = off)
+        self._left_duty = self._right_duty = None
+        self._left_dir = self._right_dir = None
+
         # Stop motors initially
         self.stop()
 
@@ -68,30 +72,55 @@ class MotorController:
             motor: "left" or "right"
             speed: -1.0 to 1.0 (negative = reverse)
         """
-        speed = max(-1.0, min(1.0, speed))
-        duty = int(abs(speed) * self.max_speed)
+        duty = int(speed * self.max_speed)
+        if duty > self.max_speed:
+            duty = self.max_speed
+        elif duty < -self.max_speed:
+            duty = -self.max_speed
 
         if motor == "left":
-            if speed >= 0:
-                self.left_in1.value(1)
-                self.left_in2.value(0)
-            else:
-                self.left_in1.value(0)
-                self.left_in2.value(1)
-            self.left_en.duty(duty)
-
+            self._write_left(duty)
         elif motor == "right":
-            if speed >= 0:
-                self.right_in1.value(1)
-                self.right_in2.value(0)
-            else:
-                self.right_in1.value(0)
-                self.right_in2.value(1)
+            self._write_right(duty)
+
+    def _write_left(self, duty: int):
+        """Write a signed duty (-max_speed..max_speed) to the left motor.
+
+        Pins and PWM are only written when the value changes, so repeated
+        identical commands do not touch the hardware.
+        """
+        direction = 1
+        if duty < 0:
+            duty = -duty
+            direction = -1
+        if direction != self._left_dir:
+            self.left_in1.value(1 if direction > 0 else 0)
+            self.left_in2.value(0 if direction > 0 else 1)
+            self._left_dir = direction
+        if duty != self._left_duty:
+            self.left_en.duty(duty)
+            self._left_duty = duty
+
+    def _write_right(self, duty: int):
+        """Write a signed duty (-max_speed..max_speed) to the right motor."""
+        direction = 1
+        if duty < 0:
+            duty = -duty
+            direction = -1
+        if direction != self._right_dir:
+            self.right_in1.value(1 if direction > 0 else 0)
+            self.right_in2.value(0 if direction > 0 else 1)
+            self._right_dir = direction
+        if duty != self._right_duty:
             self.right_en.duty(duty)
+            self._right_duty = duty
 
     def set_velocity(self, linear: float, angular: float):
         """Set robot velocity using differential drive.
 
+        If either wheel would exceed the maximum speed, both are scaled down
+        by the same factor so the commanded turn ratio (heading) is kept.
+
         Args:
             linear: Linear velocity in m/s
             angular: Angular velocity in rad/s
@@ -105,17 +134,32 @@ class MotorController:
 
         # Normalize to -1..1 range (assuming max speed = 1 m/s)
         max_vel = 1.0
-        self.set_motor("left", v_left / max_vel)
-        self.set_motor("right", v_right / max_vel)
+        a_left = -v_left if v_left < 0 else v_left
+        a_right = -v_right if v_right < 0 else v_right
+        m = max(a_left, a_right, max_vel)
+
+        scale = self.max_speed / m
+        self._write_left(int(v_left * scale))
+        self._write_right(int(v_right * scale))
 
     def stop(self):
         """Stop all motors."""
+        if (
+            self._left_duty == 0
+            and self._right_duty == 0
+            and self._left_dir == 0
+            and self._right_dir == 0
+        ):
+            return
+
         self.left_en.duty(0)
         self.right_en.duty(0)
         self.left_in1.value(0)
         self.left_in2.value(0)
         self.right_in1.value(0)
         self.right_in2.value(0)
+        self._left_duty = self._right_duty = 0
+        self._left_dir = self._right_dir = 0
 
 
 def main():
@@ -185,20 +229,26 @@ def main():
 
     print("Waiting for commands... (Ctrl+C to stop)")
 
+    # Bind hot-loop callables once
+    check_msg = device._mqtt.check_msg
+    ticks_ms = time.ticks_ms
+    ticks_diff = time.ticks_diff
+    sleep_ms = time.sleep_ms
+
     # Main loop
     try:
         while True:
             # Check for commands
-            device._mqtt.check_msg()
+            check_msg()
 
             # Safety timeout - stop if no commands received
-            now = time.ticks_ms()
-            if time.ticks_diff(now, last_command_time) > command_timeout_ms:
+            now = ticks_ms()
+            if ticks_diff(now, last_command_time) > command_timeout_ms:
                 # Only stop if motors might be running
                 motors.stop()
 
             # Small delay
-            time.sleep_ms(10)
+            sleep_ms(10)
 
     except KeyboardInterrupt:
         pass
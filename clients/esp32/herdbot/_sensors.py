@@ -0,0 +1 @@
+../../common/herdbot/_sensors.py
\ No newline at end of file
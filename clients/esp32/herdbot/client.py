@@ -3,9 +3,15 @@
 Handles MQTT connection, heartbeat, and command handling.
 """
 
-import json
+import gc
+import select
 import time
 
+try:
+    import ujson as json
+except ImportError:
+    import json
+
 try:
     import machine
     from umqtt.simple import MQTTClient
@@ -14,6 +20,41 @@ except ImportError:
     MQTTClient = None
     machine = None
 
+# Resolve MicroPython tick functions once, with CPython fallbacks for testing
+try:
+    _ticks_ms = time.ticks_ms
+    _ticks_diff = time.ticks_diff
+except AttributeError:
+
+    def _ticks_ms():
+        return int(time.time() * 1000)
+
+    def _ticks_diff(a, b):
+        return a - b
+
+
+# Native code emitter and compile-time constants on MicroPython; no-ops on
+# CPython so the module still imports for testing
+try:
+    import micropython
+    from micropython import const
+
+    _native = micropython.native
+except ImportError:
+
+    def const(value):
+        return value
+
+    def _native(func):
+        return func
+
+
+# Run gc.collect() before reporting free memory every N heartbeats
+GC_EVERY_N = const(30)
+
+# Messages held while the socket is not writable; older ones are dropped
+PENDING_MAX = const(16)
+
 
 class Device:
     """Herdbot device client.
@@ -55,11 +96,38 @@ class Device:
         self._connected = False
         self._command_handlers = {}
         self._heartbeat_sequence = 0
-        self._start_time = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
+        self._start_time = _ticks_ms()
         self._topic_prefix = "herd"
 
-        # Sensor references
-        self._sensors = {}
+        # Encoded MQTT topics, built once on first use
+        self._topic_cache = {}
+        self._sensor_topics = {}
+
+        # Heartbeat JSON with placeholders for the fields that change
+        self._hb_template = (
+            '{"device_id":' + json.dumps(device_id) + ',"sequence":%d,"uptime_ms":%d,'
+            '"load":%s,"memory_free":%d,"timestamp":"%s"}'
+        )
+
+        # (epoch second, ISO string) of the last formatted timestamp
+        self._ts_cache = (-1, "")
+
+        # Registered Sensor helpers; a sensor's position is its _idx
+        self._sensors = []
+
+        # (topic, payload, keep) tuples waiting for a writable socket
+        self._pending = []
+        self._out_poller = None
+
+        # Build the fixed topics now so they are allocated with the rest of
+        # the long-lived state
+        for suffix in ("info", "heartbeat"):
+            self._topic("devices/" + device_id + "/" + suffix)
+        self._topic("commands/" + device_id + "/response")
+
+        # Drop the temporaries from construction before per-message
+        # allocations start, so long-lived objects stay packed together
+        gc.collect()
 
     def connect(self) -> bool:
         """Connect to the MQTT broker.
@@ -90,6 +158,10 @@ class Device:
             self._mqtt.connect()
             self._connected = True
 
+            # Used to check that a publish will not block
+            self._out_poller = select.poll()
+            self._out_poller.register(self._mqtt.sock, select.POLLOUT)
+
             # Subscribe to command topic
             cmd_topic = f"{self._topic_prefix}/commands/{self.device_id}"
             self._mqtt.subscribe(cmd_topic.encode())
@@ -122,33 +194,78 @@ class Device:
             "timestamp": self._get_timestamp(),
         }
 
-        topic = f"{self._topic_prefix}/devices/{self.device_id}/info"
-        self._publish(topic, info)
+        self._publish(self._topic("devices/" + self.device_id + "/info"), info, keep=True)
 
     def _publish_heartbeat(self):
-        """Publish heartbeat message."""
-        self._heartbeat_sequence += 1
+        """Publish heartbeat message.
 
-        uptime_ms = self._get_uptime_ms()
+        Only a few fields change between heartbeats, so the payload is filled
+        into a JSON template built once in __init__ instead of serializing a
+        dict every time.
+        """
+        self._heartbeat_sequence += 1
 
-        heartbeat = {
-            "device_id": self.device_id,
-            "sequence": self._heartbeat_sequence,
-            "uptime_ms": uptime_ms,
-            "load": self._get_load(),
-            "memory_free": self._get_free_memory(),
-            "timestamp": self._get_timestamp(),
-        }
+        if self._mqtt and self._connected:
+            payload = self._hb_template % (
+                self._heartbeat_sequence,
+                self._get_uptime_ms(),
+                self._get_load(),
+                self._get_free_memory(),
+                self._get_timestamp(),
+            )
+            self._send(
+                self._topic("devices/" + self.device_id + "/heartbeat"),
+                payload.encode(),
+                keep=True,
+            )
 
-        topic = f"{self._topic_prefix}/devices/{self.device_id}/heartbeat"
-        self._publish(topic, heartbeat)
+    def _topic(self, suffix: str) -> bytes:
+        """Get the encoded topic for a suffix under the topic prefix."""
+        topic = self._topic_cache.get(suffix)
+        if topic is None:
+            topic = f"{self._topic_prefix}/{suffix}".encode()
+            self._topic_cache[suffix] = topic
+        return topic
 
-    def _publish(self, topic: str, data: dict):
-        """Publish JSON data to a topic."""
+    def _publish(self, topic: bytes, data: dict, keep: bool = False):
+        """Publish JSON data to an encoded topic."""
         if self._mqtt and self._connected:
             payload = json.dumps(data)
-            self._mqtt.publish(topic.encode(), payload.encode())
+            self._send(topic, payload.encode(), keep)
 
+    def _send(self, topic: bytes, payload: bytes, keep: bool = False):
+        """Publish an encoded message without blocking on a full socket.
+
+        While the socket cannot take more data (WiFi reassociation, slow
+        broker) messages wait in a bounded queue that run() and the next
+        send drain. When the queue is full the oldest message is dropped,
+        preferring ones not sent with keep=True (heartbeats, device info,
+        command responses).
+        """
+        if not (self._mqtt and self._connected):
+            return
+
+        self._drain_pending()
+        if not self._pending and self._out_poller.poll(0):
+            self._mqtt.publish(topic, payload)
+            return
+
+        if len(self._pending) >= PENDING_MAX:
+            drop = 0
+            for i, entry in enumerate(self._pending):
+                if not entry[2]:
+                    drop = i
+                    break
+            self._pending.pop(drop)
+        self._pending.append((topic, payload, keep))
+
+    def _drain_pending(self):
+        """Send queued messages while the socket accepts them."""
+        while self._pending and self._out_poller.poll(0):
+            topic, payload, _ = self._pending.pop(0)
+            self._mqtt.publish(topic, payload)
+
+    @_native
     def publish_sensor(self, sensor_id: str, sensor_type: str, value, unit: str = ""):
         """Publish sensor reading.
 
@@ -168,9 +285,56 @@ class Device:
             "timestamp": self._get_timestamp(),
         }
 
-        topic = f"{self._topic_prefix}/sensors/{self.device_id}/{sensor_id}"
+        topic = self._sensor_topics.get(sensor_id)
+        if topic is None:
+            topic = self._sensor_topic(sensor_id)
+            self._sensor_topics[sensor_id] = topic
         self._publish(topic, reading)
 
+    def _sensor_topic(self, sensor_id: str) -> bytes:
+        """Build the encoded topic for a sensor's readings."""
+        return f"{self._topic_prefix}/sensors/{self.device_id}/{sensor_id}".encode()
+
+    def _add_sensor(self, sensor):
+        """Register a Sensor helper with this device.
+
+        The sensor gets its index in the registry and its encoded topic, so
+        publishing a reading needs no lookup by sensor_id.
+        """
+        sensor._idx = len(self._sensors)
+        sensor._topic = self._sensor_topic(sensor.sensor_id)
+        self._sensors.append(sensor)
+
+    @_native
+    def _publish_reading(self, sensor, value):
+        """Publish a reading for a registered Sensor helper."""
+        reading = {
+            "device_id": self.device_id,
+            "sensor_type": sensor.sensor_type,
+            "sensor_id": sensor.sensor_id,
+            "value": value,
+            "unit": sensor.unit,
+            "quality": 1.0,
+            "timestamp": self._get_timestamp(),
+        }
+        self._publish(sensor._topic, reading)
+
+    def publish_sensor_batch(self, sensor_id: str, sensor_type: str, samples: list, unit: str = ""):
+        """Publish several sensor samples in a single MQTT message.
+
+        The samples are wrapped as ``{"samples": [...]}`` so the message is
+        still a regular sensor reading on the server side, which splits IMU
+        batches back into one reading per sample. Keep batches small enough
+        to fit one TCP segment (~1400 bytes).
+
+        Args:
+            sensor_id: Sensor identifier
+            sensor_type: Type of sensor
+            samples: List of samples (each a list/tuple of values)
+            unit: Unit of measurement
+        """
+        self.publish_sensor(sensor_id, sensor_type, {"samples": samples}, unit)
+
     def on_command(self, action: str):
         """Decorator to register a command handler.
 
@@ -189,6 +353,7 @@ class Device:
             return func
         return decorator
 
+    @_native
     def _on_message(self, topic, msg):
         """Handle incoming MQTT messages."""
         try:
@@ -232,8 +397,7 @@ class Device:
             "timestamp": self._get_timestamp(),
         }
 
-        topic = f"{self._topic_prefix}/commands/{self.device_id}/response"
-        self._publish(topic, response)
+        self._publish(self._topic("commands/" + self.device_id + "/response"), response, keep=True)
 
     def run(self, heartbeat_interval_ms: int = 2000):
         """Run the main device loop.
@@ -245,50 +409,71 @@ class Device:
             if not self.connect():
                 return
 
-        last_heartbeat = 0
+        self._publish_heartbeat()
+        last_heartbeat = _ticks_ms()
+
+        # Sleep in poll() until a message arrives or the next heartbeat is due
+        poller = select.poll()
+        poller.register(self._mqtt.sock, select.POLLIN)
 
         print(f"Device {self.device_id} running...")
 
         try:
             while True:
-                # Check for incoming messages
-                if self._mqtt:
-                    self._mqtt.check_msg()
+                if self._pending:
+                    self._drain_pending()
+
+                now = _ticks_ms()
+                wait_ms = heartbeat_interval_ms - _ticks_diff(now, last_heartbeat)
 
-                # Publish heartbeat
-                now = self._get_uptime_ms()
-                if now - last_heartbeat >= heartbeat_interval_ms:
+                if wait_ms <= 0:
                     self._publish_heartbeat()
                     last_heartbeat = now
+                    continue
 
-                # Small delay to prevent tight loop
-                time.sleep_ms(10) if hasattr(time, 'sleep_ms') else time.sleep(0.01)
+                if self._pending:
+                    # Come back soon to retry queued messages
+                    wait_ms = min(wait_ms, 50)
+
+                if poller.poll(wait_ms):
+                    self._mqtt.check_msg()
 
         except KeyboardInterrupt:
             print("Stopping...")
         finally:
             self.disconnect()
 
+    @_native
     def _get_timestamp(self) -> str:
-        """Get ISO format timestamp."""
-        t = time.localtime()
-        return f"{t[0]:04d}-{t[1]:02d}-{t[2]:02d}T{t[3]:02d}:{t[4]:02d}:{t[5]:02d}Z"
+        """Get ISO format timestamp (second resolution, cached per second)."""
+        now = int(time.time())
+        if now != self._ts_cache[0]:
+            t = time.localtime(now)
+            self._ts_cache = (
+                now,
+                f"{t[0]:04d}-{t[1]:02d}-{t[2]:02d}T{t[3]:02d}:{t[4]:02d}:{t[5]:02d}Z",
+            )
+        return self._ts_cache[1]
 
+    @_native
     def _get_uptime_ms(self) -> int:
         """Get device uptime in milliseconds."""
-        if hasattr(time, 'ticks_ms'):
-            return time.ticks_diff(time.ticks_ms(), self._start_time)
-        return int((time.time() * 1000) - self._start_time)
+        return _ticks_diff(_ticks_ms(), self._start_time)
 
     def _get_load(self) -> float:
         """Get CPU load estimate (placeholder)."""
         return 0.0
 
     def _get_free_memory(self) -> int:
-        """Get free memory in bytes."""
+        """Get free memory in bytes.
+
+        A full collection can stall the loop for tens of milliseconds, so it
+        only runs every GC_EVERY_N heartbeats. In between, the reported value
+        includes garbage that has not been collected yet and may read low.
+        """
         try:
-            import gc
-            gc.collect()
+            if self._heartbeat_sequence % GC_EVERY_N == 0:
+                gc.collect()
             return gc.mem_free()
         except:
             return 0
@@ -3,6 +3,7 @@
 Supports mDNS discovery and manual configuration.
 """
 
+import json
 import time
 
 try:
@@ -74,7 +75,8 @@ def _discover_mdns(timeout_s: int) -> str:
 def _discover_broadcast(timeout_s: int) -> str:
     """Discover server via UDP broadcast.
 
-    Sends a discovery request and waits for server response.
+    Sends a discovery request and blocks in recvfrom until a server replies,
+    re-sending the request once per second in case it was lost.
     """
     if socket is None:
         return None
@@ -83,7 +85,6 @@ def _discover_broadcast(timeout_s: int) -> str:
         # Create UDP socket
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        sock.settimeout(1)
 
         # Broadcast discovery request
         discovery_msg = b'{"type": "herdbot_discover"}'
@@ -91,31 +92,36 @@ def _discover_broadcast(timeout_s: int) -> str:
         discovery_port = 7448
 
         start_time = time.time()
+        next_send = start_time
+
+        while True:
+            now = time.time()
+            remaining = timeout_s - (now - start_time)
+            if remaining <= 0:
+                break
 
-        while time.time() - start_time < timeout_s:
             try:
-                sock.sendto(discovery_msg, (broadcast_addr, discovery_port))
+                if now >= next_send:
+                    sock.sendto(discovery_msg, (broadcast_addr, discovery_port))
+                    next_send = now + 1
 
-                # Wait for response
+                # Returns as soon as a reply arrives
+                sock.settimeout(min(remaining, next_send - now))
                 try:
                     data, addr = sock.recvfrom(1024)
+                except OSError:
+                    # Timed out: resend on the next pass
+                    continue
 
-                    # Parse response
-                    import json
-                    response = json.loads(data.decode())
-
-                    if response.get("type") == "herdbot_server":
-                        sock.close()
-                        return addr[0]
+                response = json.loads(data.decode())
 
-                except socket.timeout:
-                    pass
+                if response.get("type") == "herdbot_server":
+                    sock.close()
+                    return addr[0]
 
             except Exception as e:
                 print(f"Broadcast error: {e}")
 
-            time.sleep(0.5)
-
         sock.close()
 
     except Exception as e:
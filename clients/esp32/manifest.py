@@ -0,0 +1,11 @@
+# Freeze the herdbot client into ESP32 firmware, so its bytecode runs from
+# flash instead of being compiled into the heap at boot:
+#
+#   cd micropython/ports/esp32
+#   make BOARD=ESP32_GENERIC FROZEN_MANIFEST=/path/to/herd/clients/esp32/manifest.py
+
+include("$(PORT_DIR)/boards/manifest.py")
+
+# opt=3 removes asserts and line-number info (docstrings are never
+# stored in bytecode at any level)
+package("herdbot", opt=3)
@@ -3,7 +3,7 @@
 Reads distance from HC-SR04 ultrasonic sensor and publishes to herdbot.
 
 Hardware:
-    - Raspberry Pi Pico W
+    - Raspberry Pi Pico W (echo timing uses PIO state machine 0)
     - HC-SR04 ultrasonic sensor
         - VCC -> 3.3V or 5V
         - GND -> GND
@@ -16,12 +16,17 @@ Usage:
     3. Upload to Pico W and run
 """
 
+import asyncio
 import time
+from array import array
 
+import micropython
 import network
+import rp2
 from herdbot import Device
 from herdbot.sensors import DistanceSensor
 from machine import Pin
+from micropython import const
 
 # WiFi configuration
 WIFI_SSID = "your_wifi_ssid"
@@ -35,47 +40,111 @@ TRIG_PIN = 2
 ECHO_PIN = 3
 
 
-class HCSR04:
-    """HC-SR04 ultrasonic distance sensor driver."""
+# Echo pulse timing runs in a PIO state machine at 2 MHz: the count loop takes
+# two cycles, so one iteration is 1 us.
+_PIO_FREQ = const(2_000_000)
+_ECHO_TIMEOUT_US = const(30000)
+# Give up on a measurement (no echo at all) after this long
+_MEASURE_TIMEOUT_MS = const(60)
+
 
-    def __init__(self, trig_pin: int, echo_pin: int):
-        self.trig = Pin(trig_pin, Pin.OUT)
-        self.echo = Pin(echo_pin, Pin.IN)
-        self.trig.value(0)
+@rp2.asm_pio(set_init=rp2.PIO.OUT_LOW)
+def _echo_program():
+    pull(block)  # wait for a request; OSR = timeout in us
+    mov(x, osr)
+    set(pins, 1)[19]  # 10 us trigger pulse
+    set(pins, 0)
+    wait(1, pin, 0)  # echo rising edge
+    label("count")
+    jmp(x_dec, "high")  # x-- (exits on timeout)
+    jmp("done")
+    label("high")
+    jmp(pin, "count")  # loop while echo is high
+    label("done")
+    mov(isr, x)
+    push(block)
 
-    def measure_mm(self) -> float:
-        """Measure distance in millimeters.
+
+class HCSR04:
+    """HC-SR04 ultrasonic distance sensor driver.
+
+    The trigger pulse and echo timing are done by a PIO state machine, so a
+    measurement never busy-waits the CPU. Call start(), then poll read_mm()
+    (returns None until the result is ready), or await measure_mm_async().
+    """
+
+    def __init__(self, trig_pin: int, echo_pin: int, sm_id: int = 0):
+        echo = Pin(echo_pin, Pin.IN)
+        self.sm = rp2.StateMachine(
+            sm_id,
+            _echo_program,
+            freq=_PIO_FREQ,
+            set_base=Pin(trig_pin, Pin.OUT),
+            in_base=echo,
+            jmp_pin=echo,
+        )
+        self.sm.active(1)
+        self._pending = False
+        self._started_ms = 0
+
+    def start(self):
+        """Start a measurement if none is in progress."""
+        if not self._pending:
+            self.sm.put(_ECHO_TIMEOUT_US)
+            self._pending = True
+            self._started_ms = time.ticks_ms()
+
+    @micropython.native
+    def read_mm(self):
+        """Get the result of the measurement in progress without blocking.
 
         Returns:
-            Distance in mm, or -1 if timeout
+            Distance in whole mm, -1 on timeout, or None if not finished yet
         """
-        # Send trigger pulse
-        self.trig.value(0)
-        time.sleep_us(2)
-        self.trig.value(1)
-        time.sleep_us(10)
-        self.trig.value(0)
-
-        # Wait for echo start
-        timeout = time.ticks_us() + 30000  # 30ms timeout
-        while self.echo.value() == 0:
-            if time.ticks_us() > timeout:
-                return -1
-            start = time.ticks_us()
+        if not self._pending:
+            return None
 
-        # Wait for echo end
-        while self.echo.value() == 1:
-            if time.ticks_us() > timeout:
+        if self.sm.rx_fifo():
+            remaining = self.sm.get()
+            self._pending = False
+            if remaining > _ECHO_TIMEOUT_US:
                 return -1
-            end = time.ticks_us()
+            duration = _ECHO_TIMEOUT_US - remaining
+
+            # Speed of sound = 343 m/s = 0.343 mm/us
+            # Distance = (time * speed) / 2 (round trip) = time * 0.1715,
+            # in integer math: the RP2040 has no FPU
+            return duration * 1715 // 10000
+
+        if time.ticks_diff(time.ticks_ms(), self._started_ms) > _MEASURE_TIMEOUT_MS:
+            # No echo edge at all: the program is stuck waiting for it
+            self.sm.restart()
+            self._pending = False
+            return -1
+
+        return None
 
-        # Calculate distance
-        # Speed of sound = 343 m/s = 0.343 mm/us
-        # Distance = (time * speed) / 2 (round trip)
-        duration = time.ticks_diff(end, start)
-        distance_mm = (duration * 0.343) / 2
+    async def measure_mm_async(self):
+        """Measure distance in millimeters, yielding while the PIO works."""
+        self.start()
+        while True:
+            distance = self.read_mm()
+            if distance is not None:
+                return distance
+            await asyncio.sleep_ms(1)
+
+    def measure_mm(self) -> int:
+        """Measure distance in millimeters (blocking).
 
-        return distance_mm
+        Returns:
+            Distance in whole mm, or -1 if timeout
+        """
+        self.start()
+        while True:
+            distance = self.read_mm()
+            if distance is not None:
+                return distance
+            time.sleep_ms(1)
 
 
 def connect_wifi():
@@ -122,9 +191,12 @@ def main():
     # Create distance sensor
     dist_sensor = DistanceSensor(device, "hcsr04")
 
-    # Moving average filter
-    readings = []
+    # Moving average filter: ring buffer with a running sum
     filter_size = 5
+    readings = array("i", [0] * filter_size)
+    idx = 0
+    count = 0
+    total = 0
 
     # Command handler
     @device.on_command("get_reading")
@@ -149,19 +221,23 @@ def main():
 
             now = time.ticks_ms()
             if time.ticks_diff(now, last_publish) >= publish_interval_ms:
-                distance = sensor.measure_mm()
+                sensor.start()
+                last_publish = now
 
+            # Non-blocking: None until the PIO has timed the echo
+            distance = sensor.read_mm()
+            if distance is not None:
                 if distance > 0:
                     # Apply moving average filter
-                    readings.append(distance)
-                    if len(readings) > filter_size:
-                        readings.pop(0)
+                    total += distance - readings[idx]
+                    readings[idx] = distance
+                    idx = (idx + 1) % filter_size
+                    if count < filter_size:
+                        count += 1
 
-                    filtered = sum(readings) / len(readings)
+                    filtered = total // count
                     dist_sensor.publish_mm(filtered)
 
-                last_publish = now
-
             time.sleep_ms(10)
 
     except KeyboardInterrupt:
@@ -4,9 +4,17 @@ Handles MQTT connection, heartbeat, and command handling.
 Same API as ESP32 client for compatibility.
 """
 
+import gc
 import json
+import select
+import struct
 import time
 
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
 try:
     import machine
     from umqtt.simple import MQTTClient
@@ -14,6 +22,70 @@ except ImportError:
     MQTTClient = None
     machine = None
 
+# Resolve MicroPython tick functions once, with CPython fallbacks for testing
+try:
+    _ticks_ms = time.ticks_ms
+    _ticks_diff = time.ticks_diff
+except AttributeError:
+
+    def _ticks_ms():
+        return int(time.time() * 1000)
+
+    def _ticks_diff(a, b):
+        return a - b
+
+
+# Native code emitter and compile-time constants on MicroPython; no-ops on
+# CPython so the module still imports for testing
+try:
+    import micropython
+    from micropython import const
+
+    _native = micropython.native
+except ImportError:
+
+    def const(value):
+        return value
+
+    def _native(func):
+        return func
+
+
+# Packed sensor record: type tag, sensor index, float32 value, ticks_ms()
+# (decoded server-side by shared.schemas.packed)
+TYPE_SENSOR = const(1)
+_RECORD_FMT = ">BHfI"
+_RECORD_SIZE = const(11)
+# ticks_ms() wraps at 2**30 on MicroPython; the mask keeps the CPython
+# fallback in the same range
+_TICKS_MASK = const(0x3FFFFFFF)
+
+# Packed records are buffered and sent together, at most this often
+_TX_BUF_SIZE = const(512)
+_FLUSH_INTERVAL_MS = const(200)
+
+# Messages held while the socket is not writable; older ones are dropped
+_PENDING_MAX = const(16)
+
+# Heartbeats only force a collection when free memory drops below this
+_GC_LOW_MEMORY = const(16384)
+
+
+# asyncio.sleep_ms is MicroPython-only
+_sleep_ms = getattr(asyncio, "sleep_ms", None) or (lambda ms: asyncio.sleep(ms / 1000))
+
+try:
+    # MicroPython's scheduler polls registered sockets itself; this is the
+    # same wait its Stream.read() uses, without consuming any bytes.
+    from asyncio import core as _core
+
+    _core._io_queue
+
+    def _wait_readable(sock):
+        yield _core._io_queue.queue_read(sock)
+except (ImportError, AttributeError):
+    _wait_readable = None
+
 
 class Device:
     """Herdbot device client for Pico W."""
@@ -39,10 +111,49 @@ class Device:
         self._mqtt = None
         self._connected = False
         self._command_handlers = {}
+        self._tasks = []
         self._heartbeat_sequence = 0
-        self._start_time = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
+        self._start_time = _ticks_ms()
         self._topic_prefix = "herd"
-        self._sensors = {}
+
+        # device_id and prefix never change: encode topics once
+        self._topic_info = f"{self._topic_prefix}/devices/{device_id}/info".encode()
+        self._topic_cmd = f"{self._topic_prefix}/commands/{device_id}".encode()
+        self._topic_cmd_response = self._topic_cmd + b"/response"
+        self._sensor_topic_prefix = f"{self._topic_prefix}/sensors/{device_id}/".encode()
+        # Registered Sensor helpers; a sensor's position is its _idx
+        self._sensors = []
+
+        # (topic, payload, keep) tuples waiting for a writable socket
+        self._pending = []
+        self._out_poller = None
+
+        # Scalar readings are buffered as packed binary records
+        self._packed_topic = self._sensor_topic_prefix + b"packed"
+        self._tx_buf = bytearray(_TX_BUF_SIZE)
+        self._tx_view = memoryview(self._tx_buf)
+        self._tx_len = 0
+        self._tx_first_ms = 0
+
+        # Cached ISO timestamp and the ticks_ms() it was built at
+        self._ts_cache = None
+        self._ts_tick = 0
+
+        # Heartbeats have a fixed shape: fill a JSON template instead of
+        # running json.dumps over a dict
+        self._heartbeat_topic = f"{self._topic_prefix}/devices/{device_id}/heartbeat".encode()
+        self._heartbeat_template = (
+            '{"device_id":' + json.dumps(device_id) + ',"sequence":%d,"uptime_ms":%d,'
+            '"load":0.0,"memory_free":%d,"timestamp":"%s"}'
+        )
+
+        # Drop the temporaries from construction before per-message
+        # allocations start, so long-lived objects stay packed together
+        gc.collect()
+        # Collect once a quarter of the remaining heap has been allocated,
+        # instead of only when an allocation fails
+        if hasattr(gc, "threshold"):
+            gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
 
     def connect(self) -> bool:
         """Connect to the MQTT broker."""
@@ -67,8 +178,11 @@ class Device:
             self._mqtt.connect()
             self._connected = True
 
-            cmd_topic = f"{self._topic_prefix}/commands/{self.device_id}"
-            self._mqtt.subscribe(cmd_topic.encode())
+            # Used to check that a publish will not block
+            self._out_poller = select.poll()
+            self._out_poller.register(self._mqtt.sock, select.POLLOUT)
+
+            self._mqtt.subscribe(self._topic_cmd)
 
             self._publish_device_info()
             print(f"Connected to {self.server}:{self.port}")
@@ -81,6 +195,7 @@ class Device:
     def disconnect(self):
         """Disconnect from broker."""
         if self._mqtt and self._connected:
+            self._flush()
             self._mqtt.disconnect()
             self._connected = False
 
@@ -92,33 +207,158 @@ class Device:
             "name": self.name,
             "capabilities": self.capabilities,
             "firmware_version": self.firmware_version,
+            # Sensor table for packed readings: list position = sensor index
+            "metadata": {
+                "sensors": [[s.sensor_id, s.sensor_type, s.unit] for s in self._sensors],
+            },
             "timestamp": self._get_timestamp(),
         }
-        topic = f"{self._topic_prefix}/devices/{self.device_id}/info"
-        self._publish(topic, info)
+        self._publish_preencoded(self._topic_info, info, keep=True)
 
     def _publish_heartbeat(self):
         """Publish heartbeat."""
         self._heartbeat_sequence += 1
-        heartbeat = {
-            "device_id": self.device_id,
-            "sequence": self._heartbeat_sequence,
-            "uptime_ms": self._get_uptime_ms(),
-            "load": 0.0,
-            "memory_free": self._get_free_memory(),
-            "timestamp": self._get_timestamp(),
-        }
-        topic = f"{self._topic_prefix}/devices/{self.device_id}/heartbeat"
-        self._publish(topic, heartbeat)
+        if self._mqtt and self._connected:
+            payload = self._heartbeat_template % (
+                self._heartbeat_sequence,
+                self._get_uptime_ms(),
+                self._get_free_memory(),
+                self._get_timestamp(),
+            )
+            self._send(self._heartbeat_topic, payload.encode(), keep=True)
 
-    def _publish(self, topic: str, data: dict):
-        """Publish JSON data."""
+    def _publish_preencoded(self, topic: bytes, data: dict, keep: bool = False):
+        """Publish JSON data to an already encoded topic."""
         if self._mqtt and self._connected:
-            payload = json.dumps(data)
-            self._mqtt.publish(topic.encode(), payload.encode())
+            self._send(topic, json.dumps(data).encode(), keep)
+
+    def _send(self, topic: bytes, payload, keep: bool = False):
+        """Publish an encoded message without blocking on a full socket.
+
+        While the socket cannot take more data (WiFi reassociation, slow
+        broker) messages wait in a bounded queue that _flush_task and the
+        next send drain. When the queue is full the oldest message is
+        dropped, preferring ones not sent with keep=True (heartbeats, device
+        info, command responses).
+        """
+        if not (self._mqtt and self._connected):
+            return
+
+        self._drain_pending()
+        if not self._pending and self._out_poller.poll(0):
+            self._mqtt.publish(topic, payload)
+            return
+
+        if len(self._pending) >= _PENDING_MAX:
+            drop = 0
+            for i, entry in enumerate(self._pending):
+                if not entry[2]:
+                    drop = i
+                    break
+            self._pending.pop(drop)
+        # payload may be a view of the reused packed buffer
+        self._pending.append((topic, bytes(payload), keep))
+
+    def _drain_pending(self):
+        """Send queued messages while the socket accepts them."""
+        while self._pending and self._out_poller.poll(0):
+            topic, payload, _ = self._pending.pop(0)
+            self._mqtt.publish(topic, payload)
+
+    def _add_sensor(self, sensor):
+        """Register a Sensor helper with this device.
+
+        Assigns the sensor its index in the packed-reading sensor table and
+        builds its topic and JSON template for non-scalar values.
+        """
+        sensor._idx = len(self._sensors)
+        sensor._topic = self._sensor_topic_prefix + sensor.sensor_id.encode()
+        sensor._template = (
+            '{"device_id":'
+            + json.dumps(self.device_id)
+            + ',"sensor_type":'
+            + json.dumps(sensor.sensor_type)
+            + ',"sensor_id":'
+            + json.dumps(sensor.sensor_id)
+            + ',"value":%s,"unit":'
+            + json.dumps(sensor.unit)
+            + ',"quality":1.0,"timestamp":"%s"}'
+        )
+        self._sensors.append(sensor)
+
+    @_native
+    def _publish_reading(self, sensor, value):
+        """Publish a reading for a registered Sensor helper.
+
+        Scalars go through the packed binary path; other values are encoded
+        on their own and spliced into the sensor's JSON template.
+        """
+        if isinstance(value, (int, float)):
+            self._publish_binary(sensor._idx, value)
+            return
 
+        if self._mqtt and self._connected:
+            payload = sensor._template % (json.dumps(value), self._get_timestamp())
+            self._send(sensor._topic, payload.encode())
+
+    def publish_sensor_batch(self, sensor_id: str, sensor_type: str, samples: list, unit: str = ""):
+        """Publish several sensor samples in a single JSON message."""
+        self.publish_sensor(sensor_id, sensor_type, {"samples": samples}, unit)
+
+    @_native
+    def _publish_binary(self, sensor_idx: int, value):
+        """Buffer one scalar reading as a packed binary record.
+
+        The buffer is sent as a single MQTT message when it is full or
+        _FLUSH_INTERVAL_MS after its first record.
+        """
+        if not (self._mqtt and self._connected):
+            return
+
+        if self._tx_len + _RECORD_SIZE > _TX_BUF_SIZE:
+            self._flush()
+
+        now = _ticks_ms()
+        if self._tx_len == 0:
+            self._tx_first_ms = now
+        struct.pack_into(
+            _RECORD_FMT,
+            self._tx_buf,
+            self._tx_len,
+            TYPE_SENSOR,
+            sensor_idx,
+            value,
+            now & _TICKS_MASK,
+        )
+        self._tx_len += _RECORD_SIZE
+
+        if _ticks_diff(now, self._tx_first_ms) >= _FLUSH_INTERVAL_MS:
+            self._flush()
+
+    def _flush(self):
+        """Send buffered packed records in one MQTT message."""
+        if self._tx_len and self._mqtt and self._connected:
+            self._send(self._packed_topic, self._tx_view[: self._tx_len])
+        self._tx_len = 0
+
+    @_native
     def publish_sensor(self, sensor_id: str, sensor_type: str, value, unit: str = ""):
-        """Publish sensor reading."""
+        """Publish sensor reading.
+
+        Numeric readings from registered sensors use the packed binary path;
+        lists, dicts and unregistered sensors are sent as JSON.
+        """
+        # Sensor helpers publish through _publish_reading(); this scan only
+        # runs for direct publish_sensor() calls
+        sensor = None
+        for s in self._sensors:
+            if s.sensor_id == sensor_id:
+                sensor = s
+                break
+        if sensor is not None and isinstance(value, (int, float)):
+            self._publish_binary(sensor._idx, value)
+            return
+
         reading = {
             "device_id": self.device_id,
             "sensor_type": sensor_type,
@@ -128,16 +368,38 @@ class Device:
             "quality": 1.0,
             "timestamp": self._get_timestamp(),
         }
-        topic = f"{self._topic_prefix}/sensors/{self.device_id}/{sensor_id}"
-        self._publish(topic, reading)
+        if sensor is not None:
+            topic = sensor._topic
+        else:
+            topic = self._sensor_topic_prefix + sensor_id.encode()
+        self._publish_preencoded(topic, reading)
 
     def on_command(self, action: str):
-        """Decorator for command handlers."""
+        """Decorator for command handlers.
+
+        Handlers may be plain functions or coroutines (async def); coroutine
+        handlers run as their own task and respond when they finish.
+        """
         def decorator(func):
             self._command_handlers[action] = func
             return func
         return decorator
 
+    def add_task(self, coro_func):
+        """Register a coroutine function to run alongside the device loop.
+
+        Example:
+            async def sample():
+                while True:
+                    dist.publish_mm(await sensor.measure_mm_async())
+                    await asyncio.sleep_ms(100)
+
+            device.add_task(sample)
+        """
+        self._tasks.append(coro_func)
+        return coro_func
+
+    @_native
     def _on_message(self, topic, msg):
         """Handle incoming messages."""
         try:
@@ -158,6 +420,10 @@ class Device:
         if action in self._command_handlers:
             try:
                 result = self._command_handlers[action](params)
+                if hasattr(result, "send"):
+                    # Coroutine handler: respond once it completes
+                    asyncio.create_task(self._run_command(request_id, result))
+                    return
                 success = True
                 error = None
             except Exception as e:
@@ -169,6 +435,19 @@ class Device:
             success = False
             error = f"Unknown action: {action}"
 
+        self._send_response(request_id, success, result, error)
+
+    async def _run_command(self, request_id, coro):
+        """Await a coroutine command handler and send its response."""
+        try:
+            result = await coro
+        except Exception as e:
+            self._send_response(request_id, False, None, str(e))
+        else:
+            self._send_response(request_id, True, result, None)
+
+    def _send_response(self, request_id, success: bool, result, error):
+        """Publish a command response."""
         response = {
             "request_id": request_id,
             "success": success,
@@ -176,48 +455,105 @@ class Device:
             "error": error,
             "timestamp": self._get_timestamp(),
         }
-        topic = f"{self._topic_prefix}/commands/{self.device_id}/response"
-        self._publish(topic, response)
+        self._publish_preencoded(self._topic_cmd_response, response, keep=True)
 
-    def run(self, heartbeat_interval_ms: int = 2000):
-        """Run main loop."""
+    async def _mqtt_poll_task(self):
+        """Handle incoming MQTT messages.
+
+        On MicroPython the task sleeps in the scheduler's I/O poll until the
+        socket is readable; otherwise it falls back to polling every 5 ms.
+        """
+        if _wait_readable is not None:
+            sock = self._mqtt.sock
+            while True:
+                await _wait_readable(sock)
+                self._mqtt.check_msg()
+        else:
+            while True:
+                self._mqtt.check_msg()
+                await _sleep_ms(5)
+
+    async def _flush_task(self):
+        """Send buffered packed readings that have waited long enough.
+
+        Also retries messages queued while the socket was not writable.
+        """
+        while True:
+            await _sleep_ms(_FLUSH_INTERVAL_MS)
+            if self._pending:
+                self._drain_pending()
+            if self._tx_len and _ticks_diff(_ticks_ms(), self._tx_first_ms) >= _FLUSH_INTERVAL_MS:
+                self._flush()
+
+    async def _heartbeat_task(self, interval_ms: int):
+        """Publish heartbeats at a fixed interval."""
+        while True:
+            await _sleep_ms(interval_ms)
+            self._publish_heartbeat()
+
+    async def run_async(self, heartbeat_interval_ms: int = 2000):
+        """Run the device loop as asyncio tasks.
+
+        MQTT polling, heartbeats and tasks registered with add_task() run
+        concurrently, so a slow sensor read no longer delays heartbeats or
+        incoming commands.
+
+        Args:
+            heartbeat_interval_ms: Heartbeat interval in milliseconds
+        """
         if not self._connected:
             if not self.connect():
                 return
 
-        last_heartbeat = 0
         print(f"Device {self.device_id} running...")
 
-        try:
-            while True:
-                if self._mqtt:
-                    self._mqtt.check_msg()
+        tasks = [
+            asyncio.create_task(self._heartbeat_task(heartbeat_interval_ms)),
+            asyncio.create_task(self._flush_task()),
+        ]
+        for coro_func in self._tasks:
+            tasks.append(asyncio.create_task(coro_func()))
 
-                now = self._get_uptime_ms()
-                if now - last_heartbeat >= heartbeat_interval_ms:
-                    self._publish_heartbeat()
-                    last_heartbeat = now
-
-                time.sleep_ms(10) if hasattr(time, 'sleep_ms') else time.sleep(0.01)
+        try:
+            await self._mqtt_poll_task()
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.disconnect()
 
+    def run(self, heartbeat_interval_ms: int = 2000):
+        """Run main loop (blocking wrapper around run_async)."""
+        try:
+            asyncio.run(self.run_async(heartbeat_interval_ms))
         except KeyboardInterrupt:
-            pass
-        finally:
             self.disconnect()
 
+    @_native
     def _get_timestamp(self) -> str:
-        t = time.localtime()
-        return f"{t[0]:04d}-{t[1]:02d}-{t[2]:02d}T{t[3]:02d}:{t[4]:02d}:{t[5]:02d}Z"
-
+        """ISO timestamp, rebuilt at most once per second of uptime."""
+        now = _ticks_ms()
+        if self._ts_cache is None or _ticks_diff(now, self._ts_tick) >= 1000:
+            t = time.localtime()
+            self._ts_cache = f"{t[0]:04d}-{t[1]:02d}-{t[2]:02d}T{t[3]:02d}:{t[4]:02d}:{t[5]:02d}Z"
+            self._ts_tick = now
+        return self._ts_cache
+
+    @_native
     def _get_uptime_ms(self) -> int:
-        if hasattr(time, 'ticks_ms'):
-            return time.ticks_diff(time.ticks_ms(), self._start_time)
-        return int((time.time() * 1000) - self._start_time)
+        return _ticks_diff(_ticks_ms(), self._start_time)
 
     def _get_free_memory(self) -> int:
+        """Free heap in bytes.
+
+        A full collection stalls the VM for tens of milliseconds, so it only
+        runs here when memory is low; the gc.threshold() set in __init__ keeps
+        the collector running incrementally otherwise.
+        """
         try:
-            import gc
-            gc.collect()
-            return gc.mem_free()
-        except:
+            free = gc.mem_free()
+            if free < _GC_LOW_MEMORY:
+                gc.collect()
+                free = gc.mem_free()
+            return free
+        except AttributeError:
             return 0
@@ -0,0 +1,11 @@
+# Freeze the herdbot client into Pico W firmware, so its bytecode runs from
+# flash instead of being compiled into the heap at boot:
+#
+#   cd micropython/ports/rp2
+#   make BOARD=RPI_PICO_W FROZEN_MANIFEST=/path/to/herd/clients/pico/manifest.py
+
+include("$(PORT_DIR)/boards/RPI_PICO_W/manifest.py")
+
+# opt=3 removes asserts and line-number info (docstrings are never
+# stored in bytecode at any level)
+package("herdbot", opt=3)
@@ -22,6 +22,23 @@ except ImportError:
     MICROPYTHON = False
     print("Running in simulation mode (no hardware)")
 
+# Resolve tick functions once (time.time() has 1 s resolution on MicroPython)
+try:
+    _ticks_ms = time.ticks_ms
+    _ticks_diff = time.ticks_diff
+    _sleep_ms = time.sleep_ms
+except AttributeError:
+
+    def _ticks_ms():
+        return int(time.time() * 1000)
+
+    def _ticks_diff(a, b):
+        return a - b
+
+    def _sleep_ms(ms):
+        time.sleep(ms / 1000)
+
+
 # Herdbot client
 from herdbot import Device
 from herdbot.sensors import Sensor
@@ -103,33 +120,27 @@ def main():
     print("Commands: set_led, toggle, set_blink")
 
     # Main loop
-    last_blink = time.time() if hasattr(time, 'time') else 0
-    last_publish = 0
+    last_blink = _ticks_ms()
 
     try:
         while True:
-            now = time.time() if hasattr(time, 'time') else time.ticks_ms() / 1000
+            now = _ticks_ms()
 
             # Handle blinking
-            if blink_enabled and (now - last_blink) >= blink_interval:
+            if blink_enabled and _ticks_diff(now, last_blink) >= blink_interval * 1000:
                 current_state = not current_state
                 led.value(1 if current_state else 0)
                 last_blink = now
 
-            # Publish state periodically
-            if (now - last_publish) >= 0.5:
-                led_state.publish(1 if current_state else 0)
-                last_publish = now
+            # Publish state when it changes, with a keepalive every 10 s
+            led_state.publish_if_changed(1 if current_state else 0, keepalive_ms=10000)
 
             # Check for commands (if connected)
             if MICROPYTHON and device._mqtt and device._connected:
                 device._mqtt.check_msg()
 
             # Small delay
-            if MICROPYTHON:
-                time.sleep_ms(50)
-            else:
-                time.sleep(0.05)
+            _sleep_ms(50)
 
     except KeyboardInterrupt:
         print("Stopping...")
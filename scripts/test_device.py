@@ -15,16 +15,30 @@ Default connects to herd.neevs.io. All data is synthetic.
 
 import argparse
 import asyncio
+import contextlib
+import json
 import random
 import signal
 import sys
+import time
 
 try:
     import httpx
 except ImportError:
-    print("Install: pip install httpx")
+    print("Install: pip install 'httpx[http2]'")
     sys.exit(1)
 
+# HTTP/2 needs the h2 package (httpx[http2]); without it, keep-alive HTTP/1.1
+try:
+    import h2  # noqa: F401
+
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+# Seconds between heartbeat/telemetry ticks
+TICK_INTERVAL_S = 2.0
+
 
 class FakeDevice:
     """Simulated IoT device for testing."""
@@ -32,44 +46,57 @@ class FakeDevice:
     def __init__(self, base_url: str, device_id: str):
         self.base_url = base_url.rstrip("/")
         self.device_id = device_id
-        self.running = False
         self.temperature = 22.0
         self.uptime_ms = 0
         self.sequence = 0
+        # Set by stop(); the run loop waits on it between ticks
+        self._stopped = asyncio.Event()
+        # One keep-alive HTTP/2 client for registration and the run loop
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=HTTP2,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+        # Telemetry body with only the values left to fill in each tick
+        device = json.dumps(device_id)
+        self._telemetry_tpl = (
+            f'[{{"device_id":{device},"sensor_type":"temperature","value":%.2f,"unit":"celsius"}},'
+            f'{{"device_id":{device},"sensor_type":"battery","value":%d,"unit":"percent"}}]'
+        )
 
     async def register(self) -> bool:
         """Register device with server."""
-        async with httpx.AsyncClient() as client:
-            try:
-                resp = await client.post(
-                    f"{self.base_url}/devices",
-                    json={
-                        "device_id": self.device_id,
-                        "device_type": "sensor_node",
-                        "name": f"Fake Device ({self.device_id})",
-                        "capabilities": [
-                            {"name": "temperature", "capability_type": "sensor"},
-                            {"name": "battery", "capability_type": "sensor"},
-                        ],
-                        "firmware_version": "0.1.0-fake",
-                    },
-                )
-                if resp.status_code in (200, 201):
-                    print(f"[{self.device_id}] Registered")
-                    return True
-                print(f"[{self.device_id}] Registration failed: {resp.status_code} {resp.text}")
-                return False
-            except Exception as e:
-                print(f"[{self.device_id}] Connection failed: {e}")
-                return False
-
-    async def send_heartbeat(self, client: httpx.AsyncClient) -> bool:
+        try:
+            resp = await self._client.post(
+                "/devices",
+                json={
+                    "device_id": self.device_id,
+                    "device_type": "sensor_node",
+                    "name": f"Fake Device ({self.device_id})",
+                    "capabilities": [
+                        {"name": "temperature", "capability_type": "sensor"},
+                        {"name": "battery", "capability_type": "sensor"},
+                    ],
+                    "firmware_version": "0.1.0-fake",
+                },
+            )
+            if resp.status_code in (200, 201):
+                print(f"[{self.device_id}] Registered")
+                return True
+            print(f"[{self.device_id}] Registration failed: {resp.status_code} {resp.text}")
+            return False
+        except Exception as e:
+            print(f"[{self.device_id}] Connection failed: {e}")
+            return False
+
+    async def send_heartbeat(self) -> bool:
         """Send heartbeat to stay online."""
         try:
             self.sequence += 1
-            self.uptime_ms += 2000
-            resp = await client.post(
-                f"{self.base_url}/devices/{self.device_id}/heartbeat",
+            self.uptime_ms += int(TICK_INTERVAL_S * 1000)
+            resp = await self._client.post(
+                f"/devices/{self.device_id}/heartbeat",
                 json={
                     "device_id": self.device_id,
                     "sequence": self.sequence,
@@ -82,59 +109,55 @@ class FakeDevice:
         except Exception:
             return False
 
-    async def send_telemetry(self, client: httpx.AsyncClient) -> bool:
-        """Send sensor telemetry."""
+    async def send_telemetry(self) -> bool:
+        """Send sensor telemetry, all readings in one request."""
         try:
-            # Temperature
-            await client.post(
-                f"{self.base_url}/telemetry/publish",
-                json={
-                    "device_id": self.device_id,
-                    "sensor_type": "temperature",
-                    "value": round(self.temperature, 2),
-                    "unit": "celsius",
-                },
+            body = self._telemetry_tpl % (self.temperature, random.randint(70, 100))
+            resp = await self._client.post(
+                "/telemetry/publish/batch",
+                content=body.encode(),
+                headers={"content-type": "application/json"},
             )
-            # Battery
-            await client.post(
-                f"{self.base_url}/telemetry/publish",
-                json={
-                    "device_id": self.device_id,
-                    "sensor_type": "battery",
-                    "value": random.randint(70, 100),
-                    "unit": "percent",
-                },
-            )
-            return True
+            return resp.status_code == 200
         except Exception:
             return False
 
     async def run(self):
         """Run the fake device."""
-        if not await self.register():
-            return
+        async with self._client:
+            if not await self.register():
+                return
 
-        self.running = True
-        print(f"[{self.device_id}] Running (Ctrl+C to stop)")
+            print(f"[{self.device_id}] Running (Ctrl+C to stop)")
 
-        async with httpx.AsyncClient() as client:
-            while self.running:
+            # Ticks are scheduled on a fixed grid so request time does not
+            # stretch the period
+            next_tick = time.monotonic()
+            while not self._stopped.is_set():
                 self.temperature += random.uniform(-0.5, 0.5)
                 self.temperature = max(15, min(35, self.temperature))
 
-                hb_ok = await self.send_heartbeat(client)
-                tel_ok = await self.send_telemetry(client)
+                # Heartbeat and readings are multiplexed on the HTTP/2 connection
+                hb_ok, tel_ok = await asyncio.gather(self.send_heartbeat(), self.send_telemetry())
 
                 if hb_ok and tel_ok:
                     print(f"[{self.device_id}] temp={self.temperature:.1f}°C uptime={self.uptime_ms // 1000}s")
                 else:
                     print(f"[{self.device_id}] failed (hb={hb_ok} tel={tel_ok})")
 
-                await asyncio.sleep(2)
+                next_tick += TICK_INTERVAL_S
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    # Sleep until the next tick, or return at once on stop()
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(self._stopped.wait(), delay)
+                else:
+                    # Overran a whole tick; restart the grid instead of bursting
+                    next_tick = time.monotonic()
 
     def stop(self):
         """Stop the device."""
-        self.running = False
+        self._stopped.set()
         print(f"\n[{self.device_id}] Stopped")
 
 
@@ -154,4 +177,9 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
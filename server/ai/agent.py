@@ -4,19 +4,104 @@ Subscribes to topics and triggers AI when conditions are met.
 """
 
 import asyncio
+import time
+from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime
+from itertools import chain, islice
 from typing import Any
 
 import structlog
 
-from shared.schemas import Command, SensorReading
+from shared.schemas import Command, SensorReading, SensorType
 
 from .manager import get_ai_manager
 
 logger = structlog.get_logger()
 
+# Number of recent readings included in trigger context
+_CONTEXT_HISTORY = 10
+
+# Fired triggers waiting for AI handling before the oldest are dropped, and
+# the number of tasks handling them
+_DETECTION_QUEUE_SIZE = 256
+_DETECTION_WORKERS = 4
+
+
+class _RollingStats:
+    """Mean and deviation of a sliding window of values, updated in O(1).
+
+    Uses Welford's algorithm, with the inverse update for values leaving
+    the window.
+    """
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value: float) -> None:
+        self.count -= 1
+        if self.count == 0:
+            self.mean = self.m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        # A single value has no spread; drop rounding residue of removed ones
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return (self.m2 / self.count) ** 0.5 if self.count else 0.0
+
+
+@dataclass(slots=True, frozen=True)
+class _HistoryEntry:
+    """A past reading, holding the JSON-dumped fields of a SensorReading.
+
+    Much smaller than the model or its dump dict; the device ID is the key
+    of the history it is stored in.
+    """
+
+    timestamp: str
+    sensor_type: str
+    sensor_id: str | None
+    value: Any
+    unit: str
+    quality: float
+
+    @classmethod
+    def from_dump(cls, dumped: dict[str, Any]) -> "_HistoryEntry":
+        return cls(
+            dumped["timestamp"],
+            dumped["sensor_type"],
+            dumped["sensor_id"],
+            dumped["value"],
+            dumped["unit"],
+            dumped["quality"],
+        )
+
+    def as_dict(self, device_id: str) -> dict[str, Any]:
+        """The reading's JSON dump, as SensorReading.model_dump(mode="json")."""
+        return {
+            "timestamp": self.timestamp,
+            "device_id": device_id,
+            "sensor_type": self.sensor_type,
+            "sensor_id": self.sensor_id,
+            "value": self.value,
+            "unit": self.unit,
+            "quality": self.quality,
+        }
+
 
 @dataclass
 class Trigger:
@@ -28,6 +113,9 @@ class Trigger:
         prompt: AI prompt to use when triggered
         cooldown_s: Minimum seconds between triggers
         enabled: Whether trigger is active
+        sensor_type: Only evaluate readings of this sensor type (None for all)
+        cpu_bound: Evaluate the condition in the default executor instead of
+            on the event loop, for conditions doing heavy computation
     """
 
     name: str
@@ -35,6 +123,13 @@ class Trigger:
     prompt: str
     cooldown_s: float = 5.0
     enabled: bool = True
+    sensor_type: str | None = None
+    cpu_bound: bool = False
+
+
+def _sensor_key(sensor_type: str | None) -> str | None:
+    """Index key for a trigger's sensor type (SensorType members by value)."""
+    return sensor_type.value if isinstance(sensor_type, SensorType) else sensor_type
 
 
 class AIAgent:
@@ -54,30 +149,96 @@ class AIAgent:
         """
         self._provider = provider
         self._triggers: dict[str, Trigger] = {}
-        self._last_trigger_times: dict[str, datetime] = {}
+        # Triggers by the sensor type they apply to, None for all types.
+        # Buckets are replaced rather than mutated, so evaluation can iterate
+        # them while a handler adds or removes triggers.
+        self._by_sensor: dict[str | None, tuple[Trigger, ...]] = {}
+        # Monotonic time each trigger last fired, for cooldowns
+        self._last_trigger_times: dict[str, float] = {}
         self._running = False
-        self._recent_readings: dict[str, list[SensorReading]] = {}
+        self._recent_readings: dict[str, deque[_HistoryEntry]] = {}
         self._max_history = 100
+        # Stats of the numeric values among each device's context history
+        self._history_stats: dict[str, _RollingStats] = {}
+
+        # Fired triggers are handled by worker tasks, so ingestion never waits
+        # on the AI provider or detection callbacks
+        self._detections: asyncio.Queue[tuple[Trigger, dict[str, Any]]] = asyncio.Queue(
+            maxsize=_DETECTION_QUEUE_SIZE
+        )
+        self._workers: list[asyncio.Task[None]] = []
 
         # Response callbacks
         self._on_detection: list[Callable[[str, dict[str, Any]], Any]] = []
         self._on_command: list[Callable[[Command], Any]] = []
 
+    async def start(self) -> None:
+        """Start the detection worker tasks.
+
+        Workers are also started on the first fired trigger if this was not
+        called.
+        """
+        self._start_workers()
+        logger.info("ai_agent_started")
+
+    async def stop(self) -> None:
+        """Stop the detection workers, dropping detections still queued."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._running = False
+        logger.info("ai_agent_stopped")
+
+    def _start_workers(self) -> None:
+        """Create the worker tasks if they are not running."""
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._detection_worker()) for _ in range(_DETECTION_WORKERS)
+            ]
+            self._running = True
+
+    async def _detection_worker(self) -> None:
+        """Handle fired triggers from the queue until cancelled."""
+        while True:
+            trigger, context = await self._detections.get()
+            await self._handle_trigger(trigger, context)
+
+    def _queue_detection(self, trigger: Trigger, context: dict[str, Any]) -> None:
+        """Queue a fired trigger for a worker, dropping the oldest if full."""
+        self._start_workers()
+        try:
+            self._detections.put_nowait((trigger, context))
+        except asyncio.QueueFull:
+            dropped, _ = self._detections.get_nowait()
+            logger.warning("detection_dropped", trigger=dropped.name)
+            self._detections.put_nowait((trigger, context))
+
     def add_trigger(self, trigger: Trigger) -> None:
         """Add a trigger condition.
 
         Args:
             trigger: Trigger to add
         """
+        self.remove_trigger(trigger.name)
         self._triggers[trigger.name] = trigger
+        key = _sensor_key(trigger.sensor_type)
+        self._by_sensor[key] = (*self._by_sensor.get(key, ()), trigger)
         logger.info("trigger_added", name=trigger.name)
 
     def remove_trigger(self, name: str) -> bool:
         """Remove a trigger by name."""
-        if name in self._triggers:
-            del self._triggers[name]
-            return True
-        return False
+        trigger = self._triggers.pop(name, None)
+        if trigger is None:
+            return False
+
+        key = _sensor_key(trigger.sensor_type)
+        bucket = tuple(t for t in self._by_sensor[key] if t is not trigger)
+        if bucket:
+            self._by_sensor[key] = bucket
+        else:
+            del self._by_sensor[key]
+        return True
 
     def on_detection(self, callback: Callable[[str, dict[str, Any]], Any]) -> None:
         """Register callback for AI detections."""
@@ -94,51 +255,90 @@ class AIAgent:
             reading: Sensor reading to process
         """
         device_id = reading.device_id
+        dumped = reading.model_dump(mode="json")
 
-        # Store in history
-        if device_id not in self._recent_readings:
-            self._recent_readings[device_id] = []
-        self._recent_readings[device_id].append(reading)
-
-        # Trim history
-        if len(self._recent_readings[device_id]) > self._max_history:
-            self._recent_readings[device_id] = self._recent_readings[device_id][-self._max_history:]
+        # Store in history; the deque drops the oldest reading when full
+        history = self._recent_readings.get(device_id)
+        if history is None:
+            history = self._recent_readings[device_id] = deque(maxlen=self._max_history)
+        history.append(_HistoryEntry.from_dump(dumped))
+        self._update_history_stats(device_id, reading)
 
         # Check triggers
-        await self._check_triggers(reading)
+        await self._check_triggers(reading, dumped)
+
+    def _update_history_stats(self, device_id: str, reading: SensorReading) -> None:
+        """Slide a device's context history stats forward by one reading."""
+        stats = self._history_stats.get(device_id)
+        if stats is None:
+            stats = self._history_stats[device_id] = _RollingStats()
+
+        if isinstance(reading.value, (int, float)):
+            stats.add(reading.value)
+
+        history = self._recent_readings[device_id]
+        if len(history) > _CONTEXT_HISTORY:
+            dropped = history[-_CONTEXT_HISTORY - 1].value
+            if isinstance(dropped, (int, float)):
+                stats.remove(dropped)
 
-    async def _check_triggers(self, reading: SensorReading) -> None:
-        """Check all triggers against current data."""
-        now = datetime.utcnow()
+    async def _check_triggers(self, reading: SensorReading, dumped: dict[str, Any]) -> None:
+        """Check all triggers against current data.
+
+        Args:
+            reading: Sensor reading to check
+            dumped: The reading's JSON dump
+        """
+        typed = self._by_sensor.get(reading.sensor_type.value, ())
+        untyped = self._by_sensor.get(None, ())
+        if not (typed or untyped):
+            return
+
+        now = time.monotonic()
+
+        device_id = reading.device_id
+        history = self._recent_readings.get(device_id, ())
 
         # Build context for trigger evaluation
         context = {
-            "reading": reading.model_dump(mode="json"),
-            "device_id": reading.device_id,
+            "reading": dumped,
+            "device_id": device_id,
             "sensor_type": reading.sensor_type,
             "value": reading.value,
             "history": [
-                r.model_dump(mode="json")
-                for r in self._recent_readings.get(reading.device_id, [])[-10:]
+                entry.as_dict(device_id)
+                for entry in islice(history, max(len(history) - _CONTEXT_HISTORY, 0), None)
             ],
         }
+        stats = self._history_stats.get(reading.device_id)
+        if stats is not None:
+            context["history_stats"] = {
+                "count": stats.count,
+                "mean": stats.mean,
+                "std": stats.std,
+            }
 
-        for name, trigger in self._triggers.items():
+        for trigger in chain(typed, untyped):
             if not trigger.enabled:
                 continue
+            name = trigger.name
 
             # Check cooldown
             last_time = self._last_trigger_times.get(name)
-            if last_time:
-                elapsed = (now - last_time).total_seconds()
-                if elapsed < trigger.cooldown_s:
-                    continue
+            if last_time is not None and now - last_time < trigger.cooldown_s:
+                continue
 
             # Evaluate condition
             try:
-                if trigger.condition(context):
+                if trigger.cpu_bound:
+                    fired = await asyncio.get_running_loop().run_in_executor(
+                        None, trigger.condition, context
+                    )
+                else:
+                    fired = trigger.condition(context)
+                if fired:
                     self._last_trigger_times[name] = now
-                    await self._handle_trigger(trigger, context)
+                    self._queue_detection(trigger, context)
             except Exception as e:
                 logger.error("trigger_evaluation_error", trigger=name, error=str(e))
 
@@ -244,25 +444,26 @@ def anomaly_trigger(threshold: float = 2.0) -> Trigger:
         if not isinstance(current, (int, float)):
             return False
 
-        values = []
-        for h in history:
-            v = h.get("value")
-            if isinstance(v, (int, float)):
-                values.append(v)
-
-        if len(values) < 5:
+        # The agent keeps these up to date per reading; other callers may
+        # pass only the history
+        stats = ctx.get("history_stats")
+        if stats is None:
+            window = _RollingStats()
+            for h in history:
+                v = h.get("value")
+                if isinstance(v, (int, float)):
+                    window.add(v)
+            stats = {"count": window.count, "mean": window.mean, "std": window.std}
+
+        if stats["count"] < 5:
             return False
 
-        # Calculate mean and std
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / len(values)
-        std = variance ** 0.5
-
+        std = stats["std"]
         if std == 0:
             return False
 
         # Check if current value is anomalous
-        z_score = abs(current - mean) / std
+        z_score = abs(current - stats["mean"]) / std
         return z_score > threshold
 
     return Trigger(
@@ -310,4 +511,5 @@ def threshold_trigger(
         condition=condition,
         prompt=f"A {sensor_type} sensor has exceeded its threshold limits. Analyze the situation and recommend appropriate action.",
         cooldown_s=5.0,
+        sensor_type=sensor_type,
     )
@@ -1,14 +1,44 @@
 """Anthropic/Claude provider implementation for herdbot."""
 
 import json
+from collections.abc import AsyncIterator
 from typing import Any
 
+import httpx
 import structlog
 
 from .base import AIProvider
+from .compression import compress_payload
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    # json.dumps builds a new encoder per call when given options
+    _ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+    def _dumps(obj: Any) -> str:
+        return _ENCODER.encode(obj)
+
 
 logger = structlog.get_logger()
 
+_DECODER = json.JSONDecoder()
+
+# AsyncAnthropic clients shared by all providers in the process, keyed by API
+# key, so their connection pools and TLS sessions are reused
+_CLIENTS: dict[str, Any] = {}
+
+
+async def close_clients() -> None:
+    """Close the shared Anthropic clients."""
+    for client in _CLIENTS.values():
+        await client.close()
+    _CLIENTS.clear()
+
+
 # System prompts
 INTERPRET_SYSTEM_PROMPT = """You are an AI assistant for a robotics system called Herdbot.
 Your role is to interpret sensor data and device states.
@@ -56,8 +86,19 @@ class AnthropicProvider(AIProvider):
     def _get_client(self) -> Any:
         """Lazy initialization of Anthropic client."""
         if self._client is None:
-            from anthropic import AsyncAnthropic
-            self._client = AsyncAnthropic(api_key=self._api_key)
+            client = _CLIENTS.get(self._api_key)
+            if client is None:
+                from anthropic import AsyncAnthropic
+
+                client = _CLIENTS[self._api_key] = AsyncAnthropic(
+                    api_key=self._api_key,
+                    http_client=httpx.AsyncClient(
+                        http2=True,
+                        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+                        timeout=httpx.Timeout(60.0, connect=5.0),
+                    ),
+                )
+            self._client = client
         return self._client
 
     @property
@@ -68,26 +109,43 @@ class AnthropicProvider(AIProvider):
     def model(self) -> str:
         return self._model
 
-    async def interpret(self, data: dict[str, Any], prompt: str) -> dict[str, Any]:
-        """Interpret data using Claude."""
+    async def _stream_text(self, system: str, messages: list[dict[str, str]]) -> tuple[str, int]:
+        """Stream a completion, returning its text and the tokens used."""
         client = self._get_client()
+        async with client.messages.stream(
+            model=self._model,
+            max_tokens=self._max_tokens,
+            system=system,
+            messages=messages,
+        ) as stream:
+            text = "".join([chunk async for chunk in stream.text_stream])
+            message = await stream.get_final_message()
+        return text, message.usage.input_tokens + message.usage.output_tokens
+
+    async def interpret(
+        self,
+        data: dict[str, Any],
+        prompt: str,
+        compression_level: str | None = None,
+    ) -> dict[str, Any]:
+        """Interpret data using Claude."""
+        from server.core import get_settings
 
+        payload = compress_payload(data, compression_level or get_settings().ai_compression_level)
         try:
-            response = await client.messages.create(
-                model=self._model,
-                max_tokens=self._max_tokens,
-                system=INTERPRET_SYSTEM_PROMPT,
-                messages=[
+            text, tokens_used = await self._stream_text(
+                INTERPRET_SYSTEM_PROMPT,
+                [
                     {
                         "role": "user",
-                        "content": f"{prompt}\n\nData:\n```json\n{json.dumps(data, indent=2)}\n```",
+                        "content": f"{prompt}\n\nData:\n```json\n{payload}\n```",
                     }
                 ],
             )
 
             return {
-                "interpretation": response.content[0].text,
-                "tokens_used": response.usage.input_tokens + response.usage.output_tokens,
+                "interpretation": text,
+                "tokens_used": tokens_used,
             }
 
         except Exception as e:
@@ -107,34 +165,41 @@ class AnthropicProvider(AIProvider):
         if constraints:
             constraint_text = "\n\nConstraints:\n" + "\n".join(f"- {c}" for c in constraints)
 
+        content = ""
         try:
-            response = await client.messages.create(
+            async with client.messages.stream(
                 model=self._model,
                 max_tokens=self._max_tokens,
                 system=PLAN_SYSTEM_PROMPT,
                 messages=[
                     {
                         "role": "user",
-                        "content": f"Goal: {goal}\n\nContext:\n```json\n{json.dumps(context, indent=2)}\n```{constraint_text}\n\nRespond with only the JSON object.",
+                        "content": f"Goal: {goal}\n\nContext:\n```json\n{_dumps(context)}\n```{constraint_text}\n\nRespond with only the JSON object.",
                     }
                 ],
-            )
-
-            content = response.content[0].text
-
-            # Extract JSON from response
-            # Handle case where Claude wraps in markdown code block
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
+            ) as stream:
+                parts: list[str] = []
+                result = None
+                async for chunk in stream.text_stream:
+                    parts.append(chunk)
+                    # Stop reading as soon as the plan object is complete;
+                    # leaving the stream ends the rest of the generation
+                    if "}" in chunk:
+                        result = _decode_object("".join(parts))
+                        if result is not None:
+                            break
+                usage = stream.current_message_snapshot.usage
+
+            content = "".join(parts)
+
+            if result is None:
+                result = _extract_json(content)
 
-            result = json.loads(content.strip())
             steps = result.get("steps", result) if isinstance(result, dict) else result
 
             return {
                 "steps": steps,
-                "tokens_used": response.usage.input_tokens + response.usage.output_tokens,
+                "tokens_used": usage.input_tokens + usage.output_tokens,
             }
 
         except json.JSONDecodeError as e:
@@ -151,38 +216,73 @@ class AnthropicProvider(AIProvider):
         system_prompt: str | None = None,
     ) -> dict[str, Any]:
         """Chat with Claude."""
-        client = self._get_client()
-
         messages = []
 
         # Add history
         if history:
             for msg in history:
-                messages.append({
-                    "role": msg.get("role", "user"),
-                    "content": msg.get("content", ""),
-                })
+                messages.append(
+                    {
+                        "role": msg.get("role", "user"),
+                        "content": msg.get("content", ""),
+                    }
+                )
 
         # Add current message
         messages.append({"role": "user", "content": message})
 
         try:
-            response = await client.messages.create(
-                model=self._model,
-                max_tokens=self._max_tokens,
-                system=system_prompt or CHAT_SYSTEM_PROMPT,
-                messages=messages,
+            text, tokens_used = await self._stream_text(
+                system_prompt or CHAT_SYSTEM_PROMPT, messages
             )
 
             return {
-                "response": response.content[0].text,
-                "tokens_used": response.usage.input_tokens + response.usage.output_tokens,
+                "response": text,
+                "tokens_used": tokens_used,
             }
 
         except Exception as e:
             logger.error("anthropic_chat_error", error=str(e))
             raise
 
+    async def chat_stream(
+        self,
+        message: str,
+        history: list[dict[str, str]] | None = None,
+        system_prompt: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Chat with Claude, yielding the response as it is generated."""
+        messages = [
+            {"role": msg.get("role", "user"), "content": msg.get("content", "")}
+            for msg in history or []
+        ]
+        messages.append({"role": "user", "content": message})
+
+        try:
+            async with self._get_client().messages.stream(
+                model=self._model,
+                max_tokens=self._max_tokens,
+                system=system_prompt or CHAT_SYSTEM_PROMPT,
+                messages=messages,
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+
+        except Exception as e:
+            logger.error("anthropic_chat_stream_error", error=str(e))
+            raise
+
+    async def warm_up(self) -> None:
+        """Create the shared client.
+
+        Connections are left to the first request, since the only cheap
+        call to make is not free here.
+        """
+        try:
+            self._get_client()
+        except Exception as e:
+            logger.warning("anthropic_warmup_failed", error=str(e))
+
     async def health_check(self) -> bool:
         """Check Anthropic API availability."""
         try:
@@ -196,3 +296,35 @@ class AnthropicProvider(AIProvider):
             return True
         except Exception:
             return False
+
+
+def _decode_object(text: str) -> dict[str, Any] | None:
+    """Decode the first complete JSON object in text, or None if there is none yet.
+
+    Text where a "[" comes first may hold a top-level array, whose first item
+    is not the plan; that is left to the full-response parse.
+    """
+    start = text.find("{")
+    bracket = text.find("[", 0, start)
+    if start < 0 or bracket >= 0:
+        return None
+    try:
+        result, _ = _DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return None
+    return result if isinstance(result, dict) else None
+
+
+def _extract_json(text: str) -> Any:
+    """Decode the first JSON object or array in text.
+
+    Any prose or markdown code fence around it is skipped without copying.
+
+    Raises:
+        json.JSONDecodeError: If no JSON value starts at the first "{" or "["
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise json.JSONDecodeError("No JSON object found", text, 0)
+    result, _ = _DECODER.raw_decode(text, min(starts))
+    return result
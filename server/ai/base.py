@@ -3,7 +3,9 @@
 Defines the abstract interface that all AI providers must implement.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from typing import Any
 
 
@@ -26,12 +28,19 @@ class AIProvider(ABC):
         pass
 
     @abstractmethod
-    async def interpret(self, data: dict[str, Any], prompt: str) -> dict[str, Any]:
+    async def interpret(
+        self,
+        data: dict[str, Any],
+        prompt: str,
+        compression_level: str | None = None,
+    ) -> dict[str, Any]:
         """Interpret sensor data or situation.
 
         Args:
             data: Data to interpret (sensor readings, device state, etc.)
             prompt: Instructions for interpretation
+            compression_level: Payload compression level (defaults to
+                settings.ai_compression_level)
 
         Returns:
             Dictionary with:
@@ -41,6 +50,22 @@ class AIProvider(ABC):
         """
         pass
 
+    async def interpret_batch(
+        self, items: list[tuple[dict[str, Any], str]]
+    ) -> list[dict[str, Any]]:
+        """Interpret several (data, prompt) items.
+
+        Providers that can answer many items in one request override this;
+        the default interprets each item concurrently.
+
+        Args:
+            items: (data, prompt) pairs, as passed to interpret()
+
+        Returns:
+            One interpret() result per item, in order
+        """
+        return list(await asyncio.gather(*(self.interpret(data, prompt) for data, prompt in items)))
+
     @abstractmethod
     async def plan(
         self,
@@ -84,6 +109,35 @@ class AIProvider(ABC):
         """
         pass
 
+    async def chat_stream(
+        self,
+        message: str,
+        history: list[dict[str, str]] | None = None,
+        system_prompt: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Conversational interface, yielding the response as it is generated.
+
+        Providers that can stream override this; the default yields the
+        whole chat() response at once.
+
+        Args:
+            message: User message
+            history: Conversation history
+            system_prompt: Optional system prompt override
+
+        Yields:
+            Pieces of response text
+        """
+        result = await self.chat(message, history, system_prompt)
+        yield result["response"]
+
+    async def warm_up(self) -> None:
+        """Prepare for the first request (client, connections).
+
+        Called once at startup; must not raise. The default does nothing.
+        """
+        return None
+
     async def health_check(self) -> bool:
         """Check if the provider is available and working.
 
@@ -0,0 +1,116 @@
+"""Token budget for data embedded in AI prompts.
+
+Interpret data and plan context come from API clients and are unbounded. A
+payload over the budget is cut down before it is sent: long strings are
+truncated and long arrays keep their head and tail, with markers saying
+what was left out.
+
+Tokens are counted with tiktoken if it is installed, otherwise estimated
+from the JSON length.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Rough characters per token for JSON when tiktoken is unavailable
+_CHARS_PER_TOKEN = 4
+
+# Passes over a payload; each retries with a tighter target if the token
+# count of the truncated payload is still over budget
+_MAX_PASSES = 3
+
+_ENCODER = json.JSONEncoder(separators=(",", ":"), default=str)
+
+
+def _dumps(obj: Any) -> str:
+    return _ENCODER.encode(obj)
+
+
+@lru_cache(maxsize=16)
+def _encoding(model: str | None) -> Any:
+    try:
+        return tiktoken.encoding_for_model(model or "")
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    """Count (or estimate) the tokens in text for a model."""
+    if tiktoken is None:
+        return len(text) // _CHARS_PER_TOKEN
+    return len(_encoding(model).encode(text, disallowed_special=()))
+
+
+def enforce_budget(obj: Any, max_tokens: int = 4000, model: str | None = None) -> tuple[Any, int]:
+    """Truncate a payload to fit a token budget.
+
+    Args:
+        obj: JSON-serializable payload
+        max_tokens: Token budget for the serialized payload
+        model: Model whose tokenizer to count with
+
+    Returns:
+        The payload (unchanged if within budget) and its token count
+    """
+    text = _dumps(obj)
+    tokens = count_tokens(text, model)
+    target = len(text)
+    for _ in range(_MAX_PASSES):
+        if tokens <= max_tokens:
+            break
+        # Aim a little under the budget; tokens per character is not uniform
+        target = int(target * max_tokens / tokens * 0.95)
+        obj = _shrink(obj, target)
+        text = _dumps(obj)
+        tokens = count_tokens(text, model)
+    return obj, tokens
+
+
+def _shrink(value: Any, budget: int) -> Any:
+    """Shrink value to about budget serialized characters."""
+    size = len(_dumps(value))
+    if size <= budget:
+        return value
+
+    if isinstance(value, str):
+        keep = max(budget - 24, 0)
+        return f"{value[:keep]}...[+{len(value) - keep} chars]"
+
+    if isinstance(value, dict):
+        scale = budget / size
+        return {k: _shrink(v, int(len(_dumps(v)) * scale)) for k, v in value.items()}
+
+    if isinstance(value, list):
+        return _shrink_list(value, budget, size)
+
+    return value
+
+
+def _shrink_list(items: list[Any], budget: int, size: int) -> list[Any]:
+    # Keep whole items from both ends while they fit, alternating
+    sizes = [len(_dumps(item)) + 1 for item in items]
+    head, tail = 0, len(items)
+    used = 0
+    while head < tail:
+        take_head = head <= len(items) - tail
+        index = head if take_head else tail - 1
+        if used + sizes[index] > budget:
+            break
+        used += sizes[index]
+        if take_head:
+            head += 1
+        else:
+            tail -= 1
+
+    if head == 0 and tail == len(items):
+        # Not even one item fits whole; shrink every item instead
+        scale = budget / size
+        return [_shrink(item, int(s * scale)) for item, s in zip(items, sizes, strict=True)]
+
+    return [*items[:head], {"omitted": tail - head}, *items[tail:]]
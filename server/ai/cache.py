@@ -0,0 +1,184 @@
+"""Response caches for AI provider calls.
+
+Identical requests (same model, messages and sampling parameters) are answered
+from memory instead of calling the provider again. Optionally, chat messages
+whose embedding is close enough to an earlier one reuse its response.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from server.core import get_settings
+
+
+class LLMCache:
+    """In-process LRU cache of provider results with a time-to-live.
+
+    Entries are looked up and stored without awaiting, so concurrent
+    coroutines cannot interleave inside an operation and no lock is needed.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl_s: float = 300.0, sampled: bool = False) -> None:
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of cached results
+            ttl_s: Seconds a result stays valid
+            sampled: Also cache requests with temperature > 0
+        """
+        self._maxsize = maxsize
+        self._ttl_s = ttl_s
+        self._sampled = sampled
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_key(
+        self,
+        model: str,
+        messages: list[dict[str, str]],
+        temperature: float,
+        response_format: dict[str, Any] | None = None,
+    ) -> str | None:
+        """Key for a request, or None if its result should not be cached.
+
+        Sampled requests (temperature > 0) are not cached unless the cache
+        was created with sampled=True.
+        """
+        if temperature > 0 and not self._sampled:
+            return None
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "response_format": response_format,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str | None) -> dict[str, Any] | None:
+        """Get a copy of a cached result, or None on a miss."""
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Callers add fields to results; keep the cached one intact
+        return dict(entry[1])
+
+    def set(self, key: str | None, result: dict[str, Any]) -> None:
+        """Cache a result, evicting the least recently used if full."""
+        if key is None:
+            return
+        self._entries[key] = (time.monotonic() + self._ttl_s, dict(result))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counts and current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class SemanticLLMCache:
+    """Cache of responses looked up by embedding similarity.
+
+    Embeddings are stored normalized in a float32 matrix used as a ring
+    buffer, so a lookup is one matrix-vector product. Entries are grouped
+    by a namespace (e.g. model and system prompt) and only match within it.
+    """
+
+    def __init__(self, maxsize: int = 256, threshold: float = 0.92) -> None:
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of cached responses
+            threshold: Minimum cosine similarity for a hit
+        """
+        self._maxsize = maxsize
+        self._threshold = threshold
+        # Allocated on the first add, when the embedding size is known
+        self._vectors: np.ndarray | None = None
+        self._namespaces = np.full(maxsize, -1, dtype=np.int32)
+        self._namespace_ids: dict[str, int] = {}
+        self._results: list[dict[str, Any] | None] = [None] * maxsize
+        self._count = 0
+        self._next = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, namespace: str, embedding: list[float]) -> dict[str, Any] | None:
+        """Get a copy of the closest cached response, or None on a miss."""
+        ns = self._namespace_ids.get(namespace)
+        if self._vectors is None or ns is None:
+            self.misses += 1
+            return None
+
+        sims = self._vectors[: self._count] @ _normalize(embedding)
+        sims[self._namespaces[: self._count] != ns] = -np.inf
+        best = int(sims.argmax())
+        if sims[best] < self._threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return dict(self._results[best])
+
+    def add(self, namespace: str, embedding: list[float], result: dict[str, Any]) -> None:
+        """Cache a response, replacing the oldest if full."""
+        if self._maxsize <= 0:
+            return
+        if self._vectors is None:
+            self._vectors = np.zeros((self._maxsize, len(embedding)), dtype=np.float32)
+
+        row = self._next
+        self._vectors[row] = _normalize(embedding)
+        self._namespaces[row] = self._namespace_ids.setdefault(namespace, len(self._namespace_ids))
+        self._results[row] = dict(result)
+        self._next = (row + 1) % self._maxsize
+        self._count = min(self._count + 1, self._maxsize)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counts and current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": self._count}
+
+
+def _normalize(embedding: list[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@lru_cache
+def get_llm_cache() -> LLMCache:
+    """Get the process-wide AI response cache."""
+    settings = get_settings()
+    return LLMCache(
+        maxsize=settings.ai_cache_size,
+        ttl_s=settings.ai_cache_ttl_s,
+        sampled=settings.ai_cache_sampled,
+    )
+
+
+@lru_cache
+def get_semantic_cache() -> SemanticLLMCache | None:
+    """Get the process-wide semantic response cache, or None if disabled."""
+    settings = get_settings()
+    if not settings.semantic_cache_enabled:
+        return None
+    return SemanticLLMCache(
+        maxsize=settings.ai_cache_size,
+        threshold=settings.semantic_cache_threshold,
+    )
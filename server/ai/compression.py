@@ -0,0 +1,89 @@
+"""Compact serialization of data embedded in AI prompts.
+
+Interpret prompts carry sensor and device state as JSON. Indentation, null
+fields, repeated keys and long sample arrays cost input tokens without
+helping the model, so payloads are compressed before they are sent.
+
+Levels:
+    none: Indented JSON, as readable as possible
+    compact: JSON without whitespace
+    aggressive: Compact JSON with nulls dropped, lists of same-shaped objects
+        turned into columns and rows, and long arrays cut to their head and
+        tail plus a summary of what was left out
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+
+    def _dumps(obj: Any, indent: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+except ImportError:
+    _ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+    def _dumps(obj: Any, indent: bool = False) -> str:
+        return json.dumps(obj, indent=2) if indent else _ENCODER.encode(obj)
+
+
+COMPRESSION_LEVELS = ("none", "compact", "aggressive")
+
+# Arrays longer than this keep only _EDGE_ITEMS items at each end
+_MAX_ARRAY_ITEMS = 10
+_EDGE_ITEMS = 3
+
+
+def compress_payload(data: Any, level: str = "compact") -> str:
+    """Serialize data for a prompt.
+
+    Args:
+        data: JSON-serializable data
+        level: One of COMPRESSION_LEVELS
+
+    Returns:
+        JSON text
+
+    Raises:
+        ValueError: If the level is unknown
+    """
+    if level == "none":
+        return _dumps(data, indent=True)
+    if level == "aggressive":
+        data = _crush(data)
+    elif level != "compact":
+        raise ValueError(f"Unknown compression level: {level}")
+    return _dumps(data)
+
+
+def _crush(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _crush(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return _crush_list([_crush(v) for v in value])
+    return value
+
+
+def _crush_list(items: list[Any]) -> Any:
+    # Same-shaped objects: name each key once instead of once per item
+    if len(items) > 1 and all(isinstance(item, dict) for item in items):
+        columns = list(items[0])
+        if all(list(item) == columns for item in items[1:]):
+            rows = [[item[k] for k in columns] for item in items]
+            return {"columns": columns, "rows": _truncate(rows)}
+    return _truncate(items)
+
+
+def _truncate(items: list[Any]) -> list[Any]:
+    if len(items) <= _MAX_ARRAY_ITEMS:
+        return items
+
+    omitted = items[_EDGE_ITEMS:-_EDGE_ITEMS]
+    summary: dict[str, Any] = {"omitted": len(omitted)}
+    if all(isinstance(v, int | float) and not isinstance(v, bool) for v in items):
+        summary.update(
+            min=min(items),
+            max=max(items),
+            mean=round(sum(items) / len(items), 4),
+        )
+    return [*items[:_EDGE_ITEMS], summary, *items[-_EDGE_ITEMS:]]
@@ -3,6 +3,13 @@
 Routes AI requests to appropriate providers and manages API keys.
 """
 
+import asyncio
+import contextlib
+import hashlib
+import json
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from types import MappingProxyType
 from typing import Any
 
 import structlog
@@ -10,12 +17,93 @@ import structlog
 from server.core import get_settings
 
 from .base import AIProvider
+from .budget import enforce_budget
 
 logger = structlog.get_logger()
 
 # Global manager instance
 _manager: "AIManager | None" = None
 
+# Seconds provider health results are reused for
+_HEALTH_TTL_S = 30.0
+
+
+class BatchingInterpreter:
+    """Coalesces concurrent interpret calls into provider batch requests.
+
+    Calls queue up; a background task collects them until the batch window
+    closes or the batch is full, then sends them with one
+    interpret_batch() call. Every call for a provider shares its interpret
+    system prompt, so a batch never mixes system contexts; a lone call
+    goes through interpret() unchanged.
+    """
+
+    def __init__(self, provider: AIProvider, window_s: float, max_batch: int) -> None:
+        """Initialize the batcher.
+
+        Args:
+            provider: Provider to send batches to
+            window_s: Seconds to wait for more calls after the first
+            max_batch: Most calls per batch
+        """
+        self._provider = provider
+        self._window_s = window_s
+        self._max_batch = max_batch
+        self._queue: asyncio.Queue[tuple[dict[str, Any], str, asyncio.Future]] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def interpret(self, data: dict[str, Any], prompt: str) -> dict[str, Any]:
+        """Interpret data as part of the next batch."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((data, prompt, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop collecting batches."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._window_s
+            while len(batch) < self._max_batch:
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), deadline - loop.time()))
+                except TimeoutError:
+                    break
+
+            # Send in the background so the next batch collects meanwhile
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[tuple[dict[str, Any], str, asyncio.Future]]) -> None:
+        try:
+            if len(batch) == 1:
+                data, prompt, _ = batch[0]
+                results = [await self._provider.interpret(data, prompt)]
+            else:
+                results = await self._provider.interpret_batch(
+                    [(data, prompt) for data, prompt, _ in batch]
+                )
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (*_, future), result in zip(batch, results, strict=True):
+            if not future.done():
+                future.set_result(result)
+
 
 class AIManager:
     """Manages AI providers and routes requests.
@@ -26,8 +114,14 @@ class AIManager:
 
     def __init__(self) -> None:
         """Initialize the AI manager."""
-        self._providers: dict[str, AIProvider] = {}
+        self._providers: Mapping[str, AIProvider] = MappingProxyType({})
         self._default_provider: str | None = None
+        self._batchers: dict[str, BatchingInterpreter] = {}
+        # Requests being sent, by request key; identical concurrent requests
+        # await the same task instead of calling the provider again
+        self._inflight: dict[str, asyncio.Task] = {}
+        # (monotonic time, results) of the last health check
+        self._health: tuple[float, dict[str, Any]] | None = None
         self._initialized = False
 
     def _initialize(self) -> None:
@@ -36,12 +130,14 @@ class AIManager:
             return
 
         settings = get_settings()
+        providers: dict[str, AIProvider] = {}
 
         # Initialize OpenAI if configured
         if settings.openai_api_key:
             try:
                 from .openai_provider import OpenAIProvider
-                self._providers["openai"] = OpenAIProvider(
+
+                providers["openai"] = OpenAIProvider(
                     api_key=settings.openai_api_key,
                 )
                 logger.info("openai_provider_initialized")
@@ -52,7 +148,8 @@ class AIManager:
         if settings.anthropic_api_key:
             try:
                 from .anthropic_provider import AnthropicProvider
-                self._providers["anthropic"] = AnthropicProvider(
+
+                providers["anthropic"] = AnthropicProvider(
                     api_key=settings.anthropic_api_key,
                 )
                 logger.info("anthropic_provider_initialized")
@@ -60,31 +157,36 @@ class AIManager:
                 logger.warning("anthropic_package_not_installed")
 
         # Set default provider
-        if settings.default_ai_provider in self._providers:
+        if settings.default_ai_provider in providers:
             self._default_provider = settings.default_ai_provider
-        elif self._providers:
-            self._default_provider = next(iter(self._providers))
+        elif providers:
+            self._default_provider = next(iter(providers))
 
+        # Read-only from here on, so lookups need no further checks
+        self._providers = MappingProxyType(providers)
         self._initialized = True
 
     def _get_provider(self, provider_name: str | None = None) -> AIProvider:
         """Get a provider by name or return default."""
-        self._initialize()
-
-        if not self._providers:
-            raise RuntimeError("No AI providers configured")
-
-        name = provider_name or self._default_provider
-        if name not in self._providers:
-            raise ValueError(f"Unknown provider: {name}")
-
-        return self._providers[name]
+        if not self._initialized:
+            self._initialize()
+
+        # One lookup on the hot path; work out what went wrong only on a miss
+        try:
+            return self._providers[provider_name or self._default_provider]
+        except KeyError:
+            if not self._providers:
+                raise RuntimeError("No AI providers configured") from None
+            raise ValueError(
+                f"Unknown provider: {provider_name or self._default_provider}"
+            ) from None
 
     async def interpret(
         self,
         data: dict[str, Any],
         prompt: str,
         provider: str | None = None,
+        compression_level: str | None = None,
     ) -> dict[str, Any]:
         """Interpret data using AI.
 
@@ -92,15 +194,42 @@ class AIManager:
             data: Data to interpret
             prompt: Interpretation instructions
             provider: Optional specific provider
+            compression_level: Optional payload compression level
 
         Returns:
             Interpretation result with provider info
         """
         ai = self._get_provider(provider)
+        key = _request_key("interpret", ai.name, data, prompt, compression_level)
+        return await self._single_flight(
+            key, lambda: self._interpret(ai, data, prompt, compression_level)
+        )
 
-        result = await ai.interpret(data, prompt)
+    async def _interpret(
+        self,
+        ai: AIProvider,
+        data: dict[str, Any],
+        prompt: str,
+        compression_level: str | None,
+    ) -> dict[str, Any]:
+        settings = get_settings()
+        payload_tokens = None
+        if settings.ai_payload_max_tokens > 0:
+            data, payload_tokens = enforce_budget(data, settings.ai_payload_max_tokens, ai.model)
+
+        # Batches are sent at the configured compression level
+        if settings.ai_batch_window_ms > 0 and compression_level is None:
+            batcher = self._batchers.get(ai.name)
+            if batcher is None:
+                batcher = self._batchers[ai.name] = BatchingInterpreter(
+                    ai, settings.ai_batch_window_ms / 1000, settings.ai_batch_max
+                )
+            result = await batcher.interpret(data, prompt)
+        else:
+            result = await ai.interpret(data, prompt, compression_level)
         result["provider"] = ai.name
         result["model"] = ai.model
+        result["payload_tokens"] = payload_tokens
 
         return result
 
@@ -123,10 +252,27 @@ class AIManager:
             Plan with provider info
         """
         ai = self._get_provider(provider)
+        key = _request_key("plan", ai.name, goal, context, constraints)
+        return await self._single_flight(key, lambda: self._plan(ai, goal, context, constraints))
+
+    async def _plan(
+        self,
+        ai: AIProvider,
+        goal: str,
+        context: dict[str, Any],
+        constraints: list[str] | None,
+    ) -> dict[str, Any]:
+        settings = get_settings()
+        payload_tokens = None
+        if settings.ai_payload_max_tokens > 0:
+            context, payload_tokens = enforce_budget(
+                context, settings.ai_payload_max_tokens, ai.model
+            )
 
         result = await ai.plan(goal, context, constraints)
         result["provider"] = ai.name
         result["model"] = ai.model
+        result["payload_tokens"] = payload_tokens
 
         return result
 
@@ -149,13 +295,95 @@ class AIManager:
             Response with provider info
         """
         ai = self._get_provider(provider)
+        key = _request_key("chat", ai.name, message, history, system_prompt)
+        return await self._single_flight(
+            key, lambda: self._chat(ai, message, history, system_prompt)
+        )
 
+    async def _chat(
+        self,
+        ai: AIProvider,
+        message: str,
+        history: list[dict[str, str]] | None,
+        system_prompt: str | None,
+    ) -> dict[str, Any]:
         result = await ai.chat(message, history, system_prompt)
         result["provider"] = ai.name
         result["model"] = ai.model
 
         return result
 
+    async def _single_flight(
+        self, key: str, call: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        """Run call, or join an identical request already in flight.
+
+        The call runs as its own task, so a caller that is cancelled (e.g.
+        a client disconnecting) does not cancel it for the others.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Each caller gets its own copy to add fields to
+        return dict(await asyncio.shield(task))
+
+    def chat_stream(
+        self,
+        message: str,
+        history: list[dict[str, str]] | None = None,
+        system_prompt: str | None = None,
+        provider: str | None = None,
+    ) -> tuple[AIProvider, AsyncIterator[str]]:
+        """Chat with AI, streaming the response.
+
+        The provider is resolved before anything is streamed, so
+        configuration errors raise here rather than mid-response.
+
+        Args:
+            message: User message
+            history: Conversation history
+            system_prompt: Optional system prompt
+            provider: Optional specific provider
+
+        Returns:
+            The provider used and an iterator of response text pieces
+        """
+        ai = self._get_provider(provider)
+        return ai, ai.chat_stream(message, history, system_prompt)
+
+    async def check_health(self) -> dict[str, Any]:
+        """Health-check all providers concurrently.
+
+        Results are reused for _HEALTH_TTL_S seconds, and concurrent callers
+        share one round of checks.
+
+        Returns:
+            {provider: {"healthy": bool, "latency_ms": float}}
+        """
+        if self._health is not None and time.monotonic() - self._health[0] < _HEALTH_TTL_S:
+            return self._health[1]
+        return await self._single_flight("health", self._check_health)
+
+    async def _check_health(self) -> dict[str, Any]:
+        self._initialize()
+        providers = list(self._providers.values())
+        results = await asyncio.gather(*(_timed_health_check(ai) for ai in providers))
+        health = {ai.name: result for ai, result in zip(providers, results, strict=True)}
+        self._health = (time.monotonic(), health)
+        return health
+
+    async def warm_up(self) -> None:
+        """Initialize providers and let each prepare for its first request."""
+        self._initialize()
+        await asyncio.gather(*(ai.warm_up() for ai in self._providers.values()))
+
+    async def close(self) -> None:
+        """Stop background batching."""
+        for batcher in self._batchers.values():
+            await batcher.close()
+        self._batchers.clear()
+
     def list_providers(self) -> list[str]:
         """List available provider names."""
         self._initialize()
@@ -168,6 +396,18 @@ class AIManager:
         return self._default_provider
 
 
+async def _timed_health_check(ai: AIProvider) -> dict[str, Any]:
+    start = time.perf_counter()
+    healthy = await ai.health_check()
+    return {"healthy": healthy, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def _request_key(kind: str, *args: Any) -> str:
+    """Key identifying an AI request by its kind and arguments."""
+    payload = json.dumps([kind, *args], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
 def get_ai_manager() -> AIManager:
     """Get the global AI manager instance."""
     global _manager
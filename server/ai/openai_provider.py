@@ -1,44 +1,169 @@
 """OpenAI provider implementation for herdbot."""
 
 import json
+from collections.abc import AsyncIterator
 from typing import Any
 
+import httpx
 import structlog
+from pydantic import BaseModel, Field
+
+from shared.schemas import Command, DeviceInfo, SensorReading
 
 from .base import AIProvider
+from .cache import get_llm_cache, get_semantic_cache
+from .compression import compress_payload
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    _loads = orjson.loads
+except ImportError:
+    # json.dumps builds a new encoder per call when given options
+    _ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+    def _dumps(obj: Any) -> str:
+        return _ENCODER.encode(obj)
+
+    _loads = json.loads
 
 logger = structlog.get_logger()
 
-# Default system prompts
-INTERPRET_SYSTEM_PROMPT = """You are an AI assistant for a robotics system called Herdbot.
+# AsyncOpenAI clients shared by all providers in the process, keyed by API
+# key, so concurrent requests multiplex over one warm HTTP/2 pool
+_CLIENTS: dict[str, Any] = {}
+
+
+def _shared_client(api_key: str) -> Any:
+    """Get the shared AsyncOpenAI client for an API key."""
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        from openai import AsyncOpenAI
+
+        client = _CLIENTS[api_key] = AsyncOpenAI(
+            api_key=api_key,
+            http_client=httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=50,
+                    keepalive_expiry=60.0,
+                ),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            ),
+        )
+    return client
+
+
+async def warm_client(api_key: str) -> None:
+    """Open a pooled connection to the API before the first request needs it."""
+    try:
+        await _shared_client(api_key).models.list()
+        logger.info("openai_client_warmed")
+    except Exception as e:
+        logger.warning("openai_warmup_failed", error=str(e))
+
+
+async def close_clients() -> None:
+    """Close the shared OpenAI clients."""
+    for client in _CLIENTS.values():
+        await client.close()
+    _CLIENTS.clear()
+
+
+def _schema(model: type) -> str:
+    return json.dumps(model.model_json_schema(), sort_keys=True, separators=(",", ":"))
+
+
+# Shared leading part of every system prompt. OpenAI caches prompt prefixes
+# of 1024+ tokens, so the stable context (including the message schemas,
+# which puts it over that size) comes first and is byte-identical on every
+# call; only the role text after it differs per request type.
+SYSTEM_CONTEXT = f"""You are an AI assistant for a robotics system called Herdbot.
+Herdbot devices (robots, sensors, actuators) publish sensor readings and heartbeats,
+and accept commands. The JSON schemas below describe the messages you will see and
+the commands you can suggest.
+
+Command schema:
+{_schema(Command)}
+
+Device info schema:
+{_schema(DeviceInfo)}
+
+Sensor reading schema:
+{_schema(SensorReading)}"""
+
+INTERPRET_SYSTEM_PROMPT = f"""{SYSTEM_CONTEXT}
+
 Your role is to interpret sensor data and device states.
 Provide clear, concise interpretations that help operators understand what's happening.
 Focus on actionable insights and potential issues."""
 
-PLAN_SYSTEM_PROMPT = """You are an AI planner for a robotics system called Herdbot.
-Your role is to break down high-level goals into executable action steps.
+PLAN_SYSTEM_PROMPT = f"""{SYSTEM_CONTEXT}
+
+Your role is to plan: break down high-level goals into executable action steps.
 Each step should be a specific command that can be sent to a device.
 Consider constraints, safety, and efficiency in your plans.
 
-Output format: Return a JSON array of steps, each with:
+Output format: Return a JSON object with a "steps" array. Each step has:
 - action: The command action name
 - device_id: Target device (or "all" for broadcast)
-- params: Command parameters as an object
+- params_json: Command parameters as a JSON object, encoded as a string
 - description: Human-readable description"""
 
-CHAT_SYSTEM_PROMPT = """You are an AI assistant for a robotics system called Herdbot.
+BATCH_INTERPRET_INSTRUCTIONS = """Interpret each item below on its own, following its prompt.
+Return a JSON object {"results": [...]} with one entry per item, each with:
+- id: The item's id
+- interpretation: Your interpretation of the item's data"""
+
+CHAT_SYSTEM_PROMPT = f"""{SYSTEM_CONTEXT}
+
 Help users understand and control their robotic devices.
 You can answer questions about the system, suggest commands, and troubleshoot issues.
 Be helpful, concise, and safety-conscious."""
 
 
+class PlanStep(BaseModel):
+    """One step of a generated plan, as returned by the model."""
+
+    action: str
+    device_id: str
+    # Strict structured outputs only allow objects with fixed keys, so free-form
+    # command parameters come back as JSON text
+    params_json: str = Field(description="Command parameters as a JSON object")
+    description: str
+
+    def to_step(self) -> dict[str, Any]:
+        """Convert to a plan step dict with parsed params."""
+        try:
+            params = _loads(self.params_json)
+        except ValueError:
+            params = {}
+        return {
+            "action": self.action,
+            "device_id": self.device_id,
+            "params": params if isinstance(params, dict) else {},
+            "description": self.description,
+        }
+
+
+class PlanSteps(BaseModel):
+    """Structured output schema for plan()."""
+
+    steps: list[PlanStep]
+
+
 class OpenAIProvider(AIProvider):
     """OpenAI/GPT provider implementation."""
 
     def __init__(
         self,
         api_key: str,
-        model: str = "gpt-4-turbo-preview",
+        model: str = "gpt-4o",
         temperature: float = 0.7,
     ) -> None:
         """Initialize OpenAI provider.
@@ -56,8 +181,7 @@ class OpenAIProvider(AIProvider):
     def _get_client(self) -> Any:
         """Lazy initialization of OpenAI client."""
         if self._client is None:
-            from openai import AsyncOpenAI
-            self._client = AsyncOpenAI(api_key=self._api_key)
+            self._client = _shared_client(self._api_key)
         return self._client
 
     @property
@@ -68,32 +192,108 @@ class OpenAIProvider(AIProvider):
     def model(self) -> str:
         return self._model
 
-    async def interpret(self, data: dict[str, Any], prompt: str) -> dict[str, Any]:
+    def _interpret_messages(
+        self, data: dict[str, Any], prompt: str, compression_level: str | None = None
+    ) -> list[dict[str, str]]:
+        from server.core import get_settings
+
+        payload = compress_payload(data, compression_level or get_settings().ai_compression_level)
+        return [
+            {"role": "system", "content": INTERPRET_SYSTEM_PROMPT},
+            {"role": "user", "content": f"{prompt}\n\nData:\n```json\n{payload}\n```"},
+        ]
+
+    async def interpret(
+        self,
+        data: dict[str, Any],
+        prompt: str,
+        compression_level: str | None = None,
+    ) -> dict[str, Any]:
         """Interpret data using GPT."""
         client = self._get_client()
 
+        messages = self._interpret_messages(data, prompt, compression_level)
+
+        cache = get_llm_cache()
+        key = cache.cache_key(self._model, messages, self._temperature)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await client.chat.completions.create(
+                model=self._model,
+                messages=messages,
+                temperature=self._temperature,
+            )
+
+            result = {
+                "interpretation": response.choices[0].message.content,
+                "tokens_used": response.usage.total_tokens if response.usage else None,
+            }
+            cache.set(key, result)
+            return result
+
+        except Exception as e:
+            logger.error("openai_interpret_error", error=str(e))
+            raise
+
+    async def interpret_batch(
+        self, items: list[tuple[dict[str, Any], str]]
+    ) -> list[dict[str, Any]]:
+        """Interpret several items with one GPT request.
+
+        Cached items are answered from the cache and the rest are sent
+        together as a JSON array. Items missing from the response are
+        retried with interpret(). tokens_used is each item's share of the
+        batch request.
+        """
+        cache = get_llm_cache()
+        keys = [
+            cache.cache_key(self._model, self._interpret_messages(data, prompt), self._temperature)
+            for data, prompt in items
+        ]
+        results = [cache.get(key) for key in keys]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        payload = [{"id": i, "prompt": items[i][1], "data": items[i][0]} for i in pending]
         messages = [
             {"role": "system", "content": INTERPRET_SYSTEM_PROMPT},
             {
                 "role": "user",
-                "content": f"{prompt}\n\nData:\n```json\n{json.dumps(data, indent=2)}\n```",
+                "content": f"{BATCH_INTERPRET_INSTRUCTIONS}\n\n```json\n{compress_payload(payload)}\n```",
             },
         ]
 
         try:
-            response = await client.chat.completions.create(
+            response = await self._get_client().chat.completions.create(
                 model=self._model,
                 messages=messages,
                 temperature=self._temperature,
+                response_format={"type": "json_object"},
             )
 
-            return {
-                "interpretation": response.choices[0].message.content,
-                "tokens_used": response.usage.total_tokens if response.usage else None,
+            parsed = _loads(response.choices[0].message.content).get("results", [])
+            by_id = {
+                entry.get("id"): entry.get("interpretation")
+                for entry in parsed
+                if isinstance(entry, dict)
             }
+            tokens = response.usage.total_tokens // len(pending) if response.usage else None
+
+            for i in pending:
+                interpretation = by_id.get(i)
+                if not isinstance(interpretation, str):
+                    results[i] = await self.interpret(*items[i])
+                    continue
+                results[i] = {"interpretation": interpretation, "tokens_used": tokens}
+                cache.set(keys[i], results[i])
+            return results
 
         except Exception as e:
-            logger.error("openai_interpret_error", error=str(e))
+            logger.error("openai_interpret_batch_error", error=str(e), size=len(pending))
             raise
 
     async def plan(
@@ -113,42 +313,50 @@ class OpenAIProvider(AIProvider):
             {"role": "system", "content": PLAN_SYSTEM_PROMPT},
             {
                 "role": "user",
-                "content": f"Goal: {goal}\n\nContext:\n```json\n{json.dumps(context, indent=2)}\n```{constraint_text}",
+                "content": f"Goal: {goal}\n\nContext:\n```json\n{_dumps(context)}\n```{constraint_text}",
             },
         ]
 
+        temperature = 0.0  # Deterministic plans, which also makes them cacheable
+
+        cache = get_llm_cache()
+        key = cache.cache_key(
+            self._model, messages, temperature, {"type": "json_schema", "name": "PlanSteps"}
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            response = await client.chat.completions.create(
+            # Structured outputs: the reply is guaranteed to match PlanSteps
+            response = await client.chat.completions.parse(
                 model=self._model,
                 messages=messages,
-                temperature=0.3,  # Lower temperature for planning
-                response_format={"type": "json_object"},
+                temperature=temperature,
+                response_format=PlanSteps,
             )
 
-            content = response.choices[0].message.content
-            result = json.loads(content)
+            message = response.choices[0].message
+            if message.parsed is None:
+                raise ValueError(f"Plan refused: {message.refusal}")
 
-            # Handle both {"steps": [...]} and direct array formats
-            steps = result.get("steps", result) if isinstance(result, dict) else result
-
-            return {
-                "steps": steps,
+            result = {
+                "steps": [step.to_step() for step in message.parsed.steps],
                 "tokens_used": response.usage.total_tokens if response.usage else None,
             }
+            cache.set(key, result)
+            return result
 
         except Exception as e:
             logger.error("openai_plan_error", error=str(e))
             raise
 
-    async def chat(
+    def _chat_messages(
         self,
         message: str,
-        history: list[dict[str, str]] | None = None,
-        system_prompt: str | None = None,
-    ) -> dict[str, Any]:
-        """Chat with GPT."""
-        client = self._get_client()
-
+        history: list[dict[str, str]] | None,
+        system_prompt: str | None,
+    ) -> list[dict[str, str]]:
         messages = [
             {"role": "system", "content": system_prompt or CHAT_SYSTEM_PROMPT}
         ]
@@ -163,23 +371,112 @@ class OpenAIProvider(AIProvider):
 
         # Add current message
         messages.append({"role": "user", "content": message})
+        return messages
+
+    async def chat(
+        self,
+        message: str,
+        history: list[dict[str, str]] | None = None,
+        system_prompt: str | None = None,
+    ) -> dict[str, Any]:
+        """Chat with GPT."""
+        client = self._get_client()
+
+        messages = self._chat_messages(message, history, system_prompt)
+
+        cache = get_llm_cache()
+        key = cache.cache_key(self._model, messages, self._temperature)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
 
         try:
+            # Only standalone messages are matched by meaning; with history
+            # the same words can ask something else
+            semantic = get_semantic_cache() if not history else None
+            if semantic is not None:
+                namespace = f"{self._model}\0{messages[0]['content']}"
+                embedding = await self._embed(message)
+                cached = semantic.get(namespace, embedding)
+                if cached is not None:
+                    return cached
+
             response = await client.chat.completions.create(
                 model=self._model,
                 messages=messages,
                 temperature=self._temperature,
             )
 
-            return {
+            result = {
                 "response": response.choices[0].message.content,
                 "tokens_used": response.usage.total_tokens if response.usage else None,
             }
+            cache.set(key, result)
+            if semantic is not None:
+                semantic.add(namespace, embedding, result)
+            return result
 
         except Exception as e:
             logger.error("openai_chat_error", error=str(e))
             raise
 
+    async def chat_stream(
+        self,
+        message: str,
+        history: list[dict[str, str]] | None = None,
+        system_prompt: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Chat with GPT, yielding the response as it is generated."""
+        client = self._get_client()
+
+        messages = self._chat_messages(message, history, system_prompt)
+
+        cache = get_llm_cache()
+        key = cache.cache_key(self._model, messages, self._temperature)
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached["response"]
+            return
+
+        try:
+            stream = await client.chat.completions.create(
+                model=self._model,
+                messages=messages,
+                temperature=self._temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+
+            parts = []
+            tokens_used = None
+            async for chunk in stream:
+                # The last chunk carries usage and no choices
+                if chunk.usage:
+                    tokens_used = chunk.usage.total_tokens
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield parts[-1]
+
+            cache.set(key, {"response": "".join(parts), "tokens_used": tokens_used})
+
+        except Exception as e:
+            logger.error("openai_chat_stream_error", error=str(e))
+            raise
+
+    async def _embed(self, text: str) -> list[float]:
+        """Embed text with the semantic cache's embedding model."""
+        from server.core import get_settings
+
+        response = await self._get_client().embeddings.create(
+            model=get_settings().semantic_cache_model,
+            input=text,
+        )
+        return response.data[0].embedding
+
+    async def warm_up(self) -> None:
+        """Create the shared client and open a pooled connection."""
+        await warm_client(self._api_key)
+
     async def health_check(self) -> bool:
         """Check OpenAI API availability."""
         try:
@@ -0,0 +1,29 @@
+"""FastAPI dependencies for herdbot API routes.
+
+The lifespan stores the server components on ``app.state``; routes receive
+them through these dependencies instead of importing from the app module.
+
+The dependencies are ``async def`` although they do not await: FastAPI runs
+plain ``def`` dependencies in its threadpool, a thread hop per request for
+what is an attribute lookup.
+"""
+
+from typing import Annotated
+
+from fastapi import Depends, Request
+
+from server.core import DeviceRegistry, ZenohHub
+
+
+async def registry_dep(request: Request) -> DeviceRegistry:
+    """Get the app's device registry."""
+    return request.app.state.device_registry
+
+
+async def hub_dep(request: Request) -> ZenohHub:
+    """Get the app's Zenoh hub."""
+    return request.app.state.zenoh_hub
+
+
+Registry = Annotated[DeviceRegistry, Depends(registry_dep)]
+Hub = Annotated[ZenohHub, Depends(hub_dep)]
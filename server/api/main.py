@@ -3,6 +3,7 @@
 Provides REST API and WebSocket endpoints for external integrations.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
@@ -13,8 +14,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
-from server.core import DeviceRegistry, Settings, ZenohHub, get_settings
+from server.ai import get_ai_manager
+from server.ai.anthropic_provider import close_clients as close_anthropic_clients
+from server.ai.openai_provider import close_clients as close_openai_clients
+from server.core import DeviceRegistry, Settings, ZenohHub, configure_logging, get_settings
 
+from .deps import Hub, Registry
 from .routes import ai, devices, telemetry
 
 logger = structlog.get_logger()
@@ -51,11 +56,18 @@ async def lifespan(app: FastAPI):
         cleanup_interval_s=settings.device_cleanup_interval_s,
     )
     zenoh_hub = ZenohHub(settings, device_registry)
+    app.state.device_registry = device_registry
+    app.state.zenoh_hub = zenoh_hub
 
     # Start services
     await device_registry.start()
     await zenoh_hub.start()
 
+    # Load AI providers and open their connections in the background so
+    # startup isn't held up by the network, but the first request skips
+    # the imports and handshakes
+    warmup = asyncio.create_task(get_ai_manager().warm_up())
+
     logger.info(
         "application_started",
         server_id=settings.server_id,
@@ -67,6 +79,10 @@ async def lifespan(app: FastAPI):
     # Shutdown
     await zenoh_hub.stop()
     await device_registry.stop()
+    warmup.cancel()
+    await get_ai_manager().close()
+    await close_anthropic_clients()
+    await close_openai_clients()
 
     logger.info("application_stopped")
 
@@ -83,6 +99,8 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     if settings is None:
         settings = get_settings()
 
+    configure_logging(settings)
+
     app = FastAPI(
         title="Herdbot API",
         description="Lightweight robotics framework REST API",
@@ -108,20 +126,19 @@ def create_app(settings: Settings | None = None) -> FastAPI:
 
     # Health check
     @app.get("/health")
-    async def health_check() -> dict[str, Any]:
+    async def health_check(hub: Hub, registry: Registry) -> dict[str, Any]:
         """Health check endpoint."""
-        hub = get_zenoh_hub()
-        registry = get_device_registry()
-
+        devices, online = registry.snapshot()
         return {
             "status": "healthy",
             "zenoh": {
                 "running": hub.is_running,
                 "session_id": hub.session_id,
+                "sensor_messages": hub.sensor_messages,
             },
             "devices": {
-                "total": len(registry.get_all_devices()),
-                "online": len(registry.get_online_devices()),
+                "total": len(devices),
+                "online": online,
             },
         }
 
@@ -1,11 +1,18 @@
 """AI integration API routes."""
 
-from typing import Any
+import json
+from collections.abc import AsyncIterator
+from typing import Any, Literal
 
 import structlog
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from server.ai.cache import get_llm_cache, get_semantic_cache
+from server.ai.manager import get_ai_manager
+from server.core import get_settings
+
 logger = structlog.get_logger()
 
 router = APIRouter()
@@ -17,6 +24,7 @@ class InterpretRequest(BaseModel):
     data: dict[str, Any]
     prompt: str
     provider: str | None = None
+    compression_level: Literal["none", "compact", "aggressive"] | None = None
 
 
 class InterpretResponse(BaseModel):
@@ -26,6 +34,7 @@ class InterpretResponse(BaseModel):
     provider: str
     model: str
     tokens_used: int | None = None
+    payload_tokens: int | None = None
 
 
 class PlanRequest(BaseModel):
@@ -45,6 +54,7 @@ class PlanResponse(BaseModel):
     provider: str
     model: str
     confidence: float | None = None
+    payload_tokens: int | None = None
 
 
 class ChatRequest(BaseModel):
@@ -72,13 +82,12 @@ async def interpret_data(request: InterpretRequest) -> InterpretResponse:
     or classifying situations.
     """
     try:
-        from server.ai.manager import get_ai_manager
-
         manager = get_ai_manager()
         result = await manager.interpret(
             data=request.data,
             prompt=request.prompt,
             provider=request.provider,
+            compression_level=request.compression_level,
         )
 
         return InterpretResponse(
@@ -86,6 +95,7 @@ async def interpret_data(request: InterpretRequest) -> InterpretResponse:
             provider=result["provider"],
             model=result["model"],
             tokens_used=result.get("tokens_used"),
+            payload_tokens=result.get("payload_tokens"),
         )
     except ImportError:
         # AI module not fully configured
@@ -106,8 +116,6 @@ async def generate_plan(request: PlanRequest) -> PlanResponse:
     that can be sent as commands to devices.
     """
     try:
-        from server.ai.manager import get_ai_manager
-
         manager = get_ai_manager()
         result = await manager.plan(
             goal=request.goal,
@@ -122,6 +130,7 @@ async def generate_plan(request: PlanRequest) -> PlanResponse:
             provider=result["provider"],
             model=result["model"],
             confidence=result.get("confidence"),
+            payload_tokens=result.get("payload_tokens"),
         )
     except ImportError:
         raise HTTPException(
@@ -140,8 +149,6 @@ async def chat(request: ChatRequest) -> ChatResponse:
     Supports multi-turn conversations with history.
     """
     try:
-        from server.ai.manager import get_ai_manager
-
         manager = get_ai_manager()
         result = await manager.chat(
             message=request.message,
@@ -165,11 +172,56 @@ async def chat(request: ChatRequest) -> ChatResponse:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    """Chat with the AI, streaming the response as Server-Sent Events.
+
+    Each event carries {"delta": text}; the last one is
+    {"done": true, "provider": ..., "model": ...}, or {"error": ...} if
+    the provider failed mid-stream.
+    """
+    try:
+        manager = get_ai_manager()
+        ai, deltas = manager.chat_stream(
+            message=request.message,
+            history=request.history,
+            system_prompt=request.system_prompt,
+            provider=request.provider,
+        )
+    except ImportError:
+        raise HTTPException(
+            status_code=503,
+            detail="AI service not available. Configure API keys in settings.",
+        )
+    except Exception as e:
+        logger.error("ai_chat_error", error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for delta in deltas:
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+        except Exception as e:
+            logger.error("ai_chat_stream_error", error=str(e))
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            return
+        yield f"data: {json.dumps({'done': True, 'provider': ai.name, 'model': ai.model})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
 @router.get("/providers")
-async def list_providers() -> dict[str, Any]:
-    """List available AI providers and their status."""
-    from server.core import get_settings
+async def list_providers(check: bool = False) -> dict[str, Any]:
+    """List available AI providers and their status.
 
+    Args:
+        check: Also health-check the configured providers (results are
+            cached for 30 seconds; some checks make a billable request)
+    """
     settings = get_settings()
 
     providers = {
@@ -183,7 +235,13 @@ async def list_providers() -> dict[str, Any]:
         },
     }
 
+    if check:
+        for name, health in (await get_ai_manager().check_health()).items():
+            providers[name].update(health)
+
     return {
         "providers": providers,
         "default": settings.default_ai_provider,
+        "cache": get_llm_cache().stats,
+        "semantic_cache": semantic.stats if (semantic := get_semantic_cache()) else None,
     }
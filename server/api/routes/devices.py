@@ -3,9 +3,10 @@
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 
+from server.api.deps import Hub, Registry
 from shared.schemas import Command, DeviceInfo, DeviceStatus
 from shared.schemas.messages import Heartbeat
 
@@ -36,6 +37,7 @@ class DeviceListResponse(BaseModel):
     devices: list[DeviceInfo]
     total: int
     online: int
+    statuses: dict[str, DeviceStatus] | None = None
 
 
 class DeviceDetailResponse(BaseModel):
@@ -45,38 +47,56 @@ class DeviceDetailResponse(BaseModel):
     status: DeviceStatus
 
 
+def _json_response(model: BaseModel) -> Response:
+    """Serialize a model already known to be valid straight to a response.
+
+    Routes that return registry models use this instead of FastAPI's
+    response_model handling, which validates and serializes them again;
+    the route's response_model is kept for the OpenAPI schema.
+    """
+    body = model.__pydantic_serializer__.to_json(model)
+    return Response(content=body, media_type="application/json")
+
+
 @router.get("", response_model=DeviceListResponse)
-async def list_devices() -> DeviceListResponse:
-    """List all registered devices."""
-    from server.api.main import get_device_registry
-
-    registry = get_device_registry()
-    devices = registry.get_all_devices()
-    online = registry.get_online_devices()
-
-    return DeviceListResponse(
-        devices=devices,
-        total=len(devices),
-        online=len(online),
+async def list_devices(registry: Registry, with_status: bool = False) -> Response:
+    """List all registered devices.
+
+    Args:
+        with_status: Also include each device's status, keyed by device ID
+    """
+    devices, online = registry.snapshot()
+
+    statuses = None
+    if with_status:
+        statuses = {}
+        for device in devices:
+            status = registry.get_status(device.device_id)
+            if status is not None:
+                statuses[device.device_id] = status
+
+    return _json_response(
+        DeviceListResponse.model_construct(
+            devices=devices,
+            total=len(devices),
+            online=online,
+            statuses=statuses,
+        )
     )
 
 
-@router.post("", response_model=DeviceInfo)
-async def register_device(device: DeviceInfo) -> DeviceInfo:
+@router.post("")
+async def register_device(device: DeviceInfo, registry: Registry) -> DeviceInfo:
     """Register a device via HTTP (for testing/simulation)."""
-    from server.api.main import get_device_registry
-
-    registry = get_device_registry()
     await registry.register_device(device)
     return device
 
 
 @router.post("/{device_id}/heartbeat")
-async def device_heartbeat(device_id: str, heartbeat: Heartbeat) -> dict[str, str]:
+async def device_heartbeat(
+    device_id: str, heartbeat: Heartbeat, registry: Registry
+) -> dict[str, str]:
     """Send device heartbeat via HTTP (for testing/simulation)."""
-    from server.api.main import get_device_registry
-
-    registry = get_device_registry()
     await registry.update_heartbeat(
         device_id=heartbeat.device_id,
         uptime_ms=heartbeat.uptime_ms,
@@ -87,12 +107,8 @@ async def device_heartbeat(device_id: str, heartbeat: Heartbeat) -> dict[str, st
 
 
 @router.get("/{device_id}", response_model=DeviceDetailResponse)
-async def get_device(device_id: str) -> DeviceDetailResponse:
+async def get_device(device_id: str, registry: Registry) -> Response:
     """Get device info and status."""
-    from server.api.main import get_device_registry
-
-    registry = get_device_registry()
-
     info = registry.get_device(device_id)
     if not info:
         raise HTTPException(status_code=404, detail=f"Device {device_id} not found")
@@ -101,17 +117,14 @@ async def get_device(device_id: str) -> DeviceDetailResponse:
     if not status:
         status = DeviceStatus(device_id=device_id)
 
-    return DeviceDetailResponse(info=info, status=status)
+    return _json_response(DeviceDetailResponse.model_construct(info=info, status=status))
 
 
-@router.post("/{device_id}/command", response_model=CommandSentResponse)
-async def send_command(device_id: str, request: CommandRequest) -> CommandSentResponse:
+@router.post("/{device_id}/command")
+async def send_command(
+    device_id: str, request: CommandRequest, registry: Registry, hub: Hub
+) -> CommandSentResponse:
     """Send a command to a device."""
-    from server.api.main import get_device_registry, get_zenoh_hub
-
-    registry = get_device_registry()
-    hub = get_zenoh_hub()
-
     # Verify device exists
     device = registry.get_device(device_id)
     if not device:
@@ -136,26 +149,18 @@ async def send_command(device_id: str, request: CommandRequest) -> CommandSentRe
 
 
 @router.get("/{device_id}/status", response_model=DeviceStatus)
-async def get_device_status(device_id: str) -> DeviceStatus:
+async def get_device_status(device_id: str, registry: Registry) -> Response:
     """Get current device status."""
-    from server.api.main import get_device_registry
-
-    registry = get_device_registry()
-
     status = registry.get_status(device_id)
     if not status:
         raise HTTPException(status_code=404, detail=f"Device {device_id} not found")
 
-    return status
+    return _json_response(status)
 
 
 @router.delete("/{device_id}")
-async def unregister_device(device_id: str) -> dict[str, str]:
+async def unregister_device(device_id: str, registry: Registry) -> dict[str, str]:
     """Unregister a device."""
-    from server.api.main import get_device_registry
-
-    registry = get_device_registry()
-
     removed = await registry.unregister_device(device_id)
     if not removed:
         raise HTTPException(status_code=404, detail=f"Device {device_id} not found")
@@ -2,13 +2,18 @@
 
 import asyncio
 import json
+import time
+from array import array
 from typing import Any
 
 import structlog
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Response, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 
+from server.api.deps import Hub
+from server.core import get_settings
 from shared.schemas import SensorReading
+from shared.schemas.wire import JSON_ENCODER, SENSOR_READING_DECODER
 
 logger = structlog.get_logger()
 
@@ -24,39 +29,172 @@ class TelemetryStats(BaseModel):
     devices_streaming: list[str]
 
 
-# Active WebSocket connections
-_active_connections: dict[str, list[WebSocket]] = {}
-_all_connections: list[WebSocket] = []
+_SendQueue = asyncio.Queue[dict[str, Any]]
+
+# Send queues of connected WebSocket clients, per device and for all devices.
+# Each client has a writer task draining its queue, so broadcasting never
+# waits on a socket.
+_active_connections: dict[str, set[_SendQueue]] = {}
+_all_connections: set[_SendQueue] = set()
+# Number of queues across both tables, for /stats
+_stream_count = 0
+
+# Frames buffered per client before the oldest are dropped (telemetry is lossy)
+_SEND_QUEUE_SIZE = 64
+
+# Readings arriving within this window are sent to clients as one frame
+_BATCH_WINDOW_S = 0.002
+_pending: list[tuple[str, SensorReading]] = []
+_flush_handle: asyncio.TimerHandle | None = None
+
+_PONG_MESSAGE = {"type": "websocket.send", "text": "pong"}
+
+# Messages counted into the rate window so far. Broadcasting does no
+# counting itself: each batch is counted once when it is flushed.
 _message_count = 0
-_last_count_reset = 0.0
+
+# Messages per second over the last minute, one slot per monotonic second
+_RATE_WINDOW_S = 60
+_rate_slots = array("Q", [0] * _RATE_WINDOW_S)
+_rate_last_second = time.monotonic_ns() // 1_000_000_000
+
+
+def _advance_rate_window(second: int) -> None:
+    """Zero the slots of seconds that passed without messages."""
+    global _rate_last_second
+    if second == _rate_last_second:
+        return
+    for stale in range(max(_rate_last_second + 1, second - _RATE_WINDOW_S + 1), second + 1):
+        _rate_slots[stale % _RATE_WINDOW_S] = 0
+    _rate_last_second = second
+
+
+def _count_messages(count: int) -> None:
+    """Add messages to the total and the current second's rate slot."""
+    global _message_count
+    _message_count += count
+    second = time.monotonic_ns() // 1_000_000_000
+    _advance_rate_window(second)
+    _rate_slots[second % _RATE_WINDOW_S] += count
 
 
 async def broadcast_sensor_data(device_id: str, data: SensorReading) -> None:
     """Broadcast sensor data to connected WebSocket clients.
 
+    Readings are collected for _BATCH_WINDOW_S and then sent together: a
+    frame holds a single reading object, or a JSON array of readings when
+    several arrived in the same window.
+
     Args:
         device_id: Source device ID
         data: Sensor reading to broadcast
     """
-    global _message_count
-    _message_count += 1
+    global _flush_handle
+    _pending.append((device_id, data))
+    if _flush_handle is None:
+        _flush_handle = asyncio.get_running_loop().call_later(_BATCH_WINDOW_S, _flush_pending)
+
+
+def _flush_pending() -> None:
+    """Send the readings collected in the current batch window."""
+    global _flush_handle
+    _flush_handle = None
+    batch = _pending.copy()
+    _pending.clear()
+    _count_messages(len(batch))
+
+    if not (_all_connections or _active_connections):
+        return
+
+    # Serialize each reading once; device and all-stream frames reuse the bytes.
+    # msgspec encodes the model's fields directly, without a pydantic dump.
+    encoded = [(device_id, JSON_ENCODER.encode(dict(reading))) for device_id, reading in batch]
+
+    if _all_connections:
+        message = _batch_message([payload for _, payload in encoded])
+        for queue in _all_connections:
+            _enqueue(queue, message)
+
+    if _active_connections:
+        by_device: dict[str, list[bytes]] = {}
+        for device_id, payload in encoded:
+            if device_id in _active_connections:
+                by_device.setdefault(device_id, []).append(payload)
+        for device_id, payloads in by_device.items():
+            message = _batch_message(payloads)
+            for queue in _active_connections[device_id]:
+                _enqueue(queue, message)
+
+
+def _batch_message(payloads: list[bytes]) -> dict[str, Any]:
+    """Build the ASGI send message for a batch of encoded readings.
+
+    Frames are binary, so the payload is not re-encoded to UTF-8 for every
+    subscriber, and the message dict is shared by all sends (servers only
+    read it).
+    """
+    body = payloads[0] if len(payloads) == 1 else b"[" + b",".join(payloads) + b"]"
+    return {"type": "websocket.send", "bytes": body}
 
-    message = data.model_dump_json()
 
-    # Send to device-specific subscribers
-    if device_id in _active_connections:
-        for ws in _active_connections[device_id]:
-            try:
-                await ws.send_text(message)
-            except Exception:
-                pass
+def _enqueue(queue: _SendQueue, message: dict[str, Any]) -> None:
+    """Queue a message for a client, dropping its oldest one if full."""
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        queue.get_nowait()
+        queue.put_nowait(message)
 
-    # Send to all-stream subscribers
-    for ws in _all_connections:
-        try:
-            await ws.send_text(message)
-        except Exception:
-            pass
+
+async def _writer(websocket: WebSocket, queue: _SendQueue) -> None:
+    """Send a client's queued messages until cancelled or a send fails."""
+    while True:
+        await websocket.send(await queue.get())
+
+
+async def _serve_stream(websocket: WebSocket, conns: set[_SendQueue]) -> None:
+    """Run a telemetry stream for an accepted WebSocket until it disconnects.
+
+    Registers a send queue in conns and answers "ping" messages through the
+    same queue, so all frames are written by one task. Idle connections are
+    kept alive by the server's WebSocket ping frames (ws_ping_interval).
+    """
+    queue: _SendQueue = asyncio.Queue(maxsize=_SEND_QUEUE_SIZE)
+    writer = asyncio.create_task(_writer(websocket, queue))
+
+    def _writer_done(task: asyncio.Task[None]) -> None:
+        # A client whose send failed stops receiving broadcasts right away
+        _unsubscribe(conns, queue)
+        if not task.cancelled():
+            # Retrieve a send error so it is not logged as never retrieved;
+            # the receive loop sees the disconnect itself
+            task.exception()
+
+    writer.add_done_callback(_writer_done)
+    _subscribe(conns, queue)
+
+    try:
+        while True:
+            # Handle ping/pong or commands from client
+            data = await websocket.receive_text()
+            if data == "ping":
+                _enqueue(queue, _PONG_MESSAGE)
+    finally:
+        _unsubscribe(conns, queue)
+        writer.cancel()
+
+
+def _subscribe(conns: set[_SendQueue], queue: _SendQueue) -> None:
+    global _stream_count
+    conns.add(queue)
+    _stream_count += 1
+
+
+def _unsubscribe(conns: set[_SendQueue], queue: _SendQueue) -> None:
+    global _stream_count
+    if queue in conns:
+        conns.remove(queue)
+        _stream_count -= 1
 
 
 @router.websocket("/stream/{device_id}")
@@ -64,32 +202,16 @@ async def device_stream(websocket: WebSocket, device_id: str) -> None:
     """WebSocket endpoint for streaming a specific device's telemetry."""
     await websocket.accept()
 
-    # Add to connections
-    if device_id not in _active_connections:
-        _active_connections[device_id] = []
-    _active_connections[device_id].append(websocket)
-
+    conns = _active_connections.setdefault(device_id, set())
     logger.info("websocket_connected", device_id=device_id)
 
     try:
-        while True:
-            # Keep connection alive, handle client messages
-            try:
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=30)
-                # Handle ping/pong or commands from client
-                if data == "ping":
-                    await websocket.send_text("pong")
-            except TimeoutError:
-                # Send keepalive
-                await websocket.send_text(json.dumps({"type": "keepalive"}))
-
+        await _serve_stream(websocket, conns)
     except WebSocketDisconnect:
         logger.info("websocket_disconnected", device_id=device_id)
     finally:
-        if device_id in _active_connections:
-            _active_connections[device_id].remove(websocket)
-            if not _active_connections[device_id]:
-                del _active_connections[device_id]
+        if not conns and _active_connections.get(device_id) is conns:
+            del _active_connections[device_id]
 
 
 @router.websocket("/stream/all")
@@ -97,22 +219,12 @@ async def all_stream(websocket: WebSocket) -> None:
     """WebSocket endpoint for streaming all device telemetry."""
     await websocket.accept()
 
-    _all_connections.append(websocket)
     logger.info("websocket_all_connected")
 
     try:
-        while True:
-            try:
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=30)
-                if data == "ping":
-                    await websocket.send_text("pong")
-            except TimeoutError:
-                await websocket.send_text(json.dumps({"type": "keepalive"}))
-
+        await _serve_stream(websocket, _all_connections)
     except WebSocketDisconnect:
         logger.info("websocket_all_disconnected")
-    finally:
-        _all_connections.remove(websocket)
 
 
 @router.post("/publish")
@@ -122,56 +234,61 @@ async def publish_telemetry(reading: SensorReading) -> dict[str, str]:
     return {"status": "ok"}
 
 
+@router.post("/publish/batch")
+async def publish_telemetry_batch(readings: list[SensorReading]) -> dict[str, str | int]:
+    """Publish several readings in one request (for testing/simulation)."""
+    for reading in readings:
+        await broadcast_sensor_data(reading.device_id, reading)
+    return {"status": "ok", "count": len(readings)}
+
+
 @router.get("/stats", response_model=TelemetryStats)
 async def get_telemetry_stats() -> TelemetryStats:
     """Get telemetry streaming statistics."""
-    import time
-
-    global _last_count_reset, _message_count
-
-    now = time.time()
-    elapsed = now - _last_count_reset if _last_count_reset > 0 else 1.0
-    mps = _message_count / elapsed if elapsed > 0 else 0
-
-    # Reset counter periodically
-    if elapsed > 60:
-        _message_count = 0
-        _last_count_reset = now
+    _advance_rate_window(time.monotonic_ns() // 1_000_000_000)
+    # Readings waiting in the current batch window are not counted yet
+    pending = len(_pending)
+    mps = (sum(_rate_slots) + pending) / _RATE_WINDOW_S
 
     return TelemetryStats(
-        total_messages=_message_count,
+        total_messages=_message_count + pending,
         messages_per_second=round(mps, 2),
-        active_streams=len(_all_connections) + sum(len(v) for v in _active_connections.values()),
+        active_streams=_stream_count,
         devices_streaming=list(_active_connections.keys()),
     )
 
 
-@router.get("/latest/{device_id}")
-async def get_latest_telemetry(device_id: str) -> dict[str, Any]:
+@router.get("/latest/{device_id}", response_class=Response)
+async def get_latest_telemetry(device_id: str, hub: Hub) -> Response:
     """Get the latest telemetry data for a device.
 
     Note: This queries the Zenoh network for the latest stored values.
     """
-    from server.api.main import get_zenoh_hub
-    from server.core import get_settings
-
-    hub = get_zenoh_hub()
     settings = get_settings()
 
     # Query for latest sensor data
     selector = f"{settings.topic_sensors}/{device_id}/**"
     results = await hub.query(selector, timeout_s=2.0)
 
+    # Each reading is decoded by msgspec and serialized once to JSON bytes
+    # spliced into the response, with no pydantic model or dict in between
     readings = []
     for _key, payload in results:
         try:
-            reading = SensorReading.from_msgpack(payload)
-            readings.append(reading.model_dump(mode="json"))
+            reading = SENSOR_READING_DECODER.decode(payload)
+            readings.append(JSON_ENCODER.encode(reading))
         except Exception:
             pass
 
-    return {
-        "device_id": device_id,
-        "readings": readings,
-        "count": len(readings),
-    }
+    body = b"".join(
+        (
+            b'{"device_id":',
+            json.dumps(device_id).encode(),
+            b',"readings":[',
+            b",".join(readings),
+            b'],"count":',
+            str(len(readings)).encode(),
+            b"}",
+        )
+    )
+    return Response(content=body, media_type="application/json")
@@ -2,6 +2,7 @@
 
 from .config import Settings, get_settings
 from .device_registry import DeviceRegistry
+from .logging import configure_logging
 from .zenoh_hub import ZenohHub
 
-__all__ = ["ZenohHub", "DeviceRegistry", "Settings", "get_settings"]
+__all__ = ["ZenohHub", "DeviceRegistry", "Settings", "get_settings", "configure_logging"]
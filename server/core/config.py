@@ -3,7 +3,7 @@
 Uses Pydantic Settings for configuration with environment variable support.
 """
 
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pathlib import Path
 
 from pydantic import Field
@@ -22,6 +22,7 @@ class Settings(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         case_sensitive=False,
+        frozen=True,
     )
 
     # Server identification
@@ -32,6 +33,15 @@ class Settings(BaseSettings):
     api_host: str = Field(default="0.0.0.0", description="API bind address")
     api_port: int = Field(default=8000, description="API port")
     api_workers: int = Field(default=1, description="Number of API workers")
+    use_uvloop: bool = Field(
+        default=True, description="Run the server on uvloop when it is installed"
+    )
+    ws_ping_interval_s: float = Field(
+        default=20.0, description="Interval between WebSocket ping frames"
+    )
+    ws_ping_timeout_s: float = Field(
+        default=10.0, description="Close WebSockets whose pong is this late"
+    )
 
     # Zenoh settings
     zenoh_mode: str = Field(default="peer", description="Zenoh mode: peer, client, router")
@@ -57,6 +67,34 @@ class Settings(BaseSettings):
     openai_api_key: str | None = Field(default=None, description="OpenAI API key")
     anthropic_api_key: str | None = Field(default=None, description="Anthropic API key")
     default_ai_provider: str = Field(default="openai", description="Default AI provider")
+    ai_cache_size: int = Field(default=256, description="Cached AI responses (0 disables)")
+    ai_cache_ttl_s: float = Field(default=300.0, description="Seconds an AI response stays cached")
+    ai_cache_sampled: bool = Field(
+        default=False,
+        description=(
+            "Also cache AI requests with temperature > 0; otherwise only "
+            "temperature-0 calls (plan) are cached"
+        ),
+    )
+    semantic_cache_enabled: bool = Field(
+        default=False, description="Reuse chat responses for similar messages (OpenAI)"
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.92, description="Cosine similarity needed for a semantic cache hit"
+    )
+    semantic_cache_model: str = Field(
+        default="text-embedding-3-small", description="Embedding model for the semantic cache"
+    )
+    ai_batch_window_ms: float = Field(
+        default=0.0, description="Window for coalescing interpret requests (0 disables)"
+    )
+    ai_batch_max: int = Field(default=16, description="Most interpret requests per batch")
+    ai_payload_max_tokens: int = Field(
+        default=4000, description="Token budget for interpret data / plan context (0 disables)"
+    )
+    ai_compression_level: str = Field(
+        default="compact", description="Interpret data compression: none, compact or aggressive"
+    )
 
     # Visualization
     rerun_enabled: bool = Field(default=True, description="Enable Rerun integration")
@@ -69,22 +107,22 @@ class Settings(BaseSettings):
     # Paths
     data_dir: Path = Field(default=Path("./data"), description="Data directory")
 
-    @property
+    @cached_property
     def topic_devices(self) -> str:
         """Topic pattern for device messages."""
         return f"{self.topic_prefix}/devices"
 
-    @property
+    @cached_property
     def topic_sensors(self) -> str:
         """Topic pattern for sensor messages."""
         return f"{self.topic_prefix}/sensors"
 
-    @property
+    @cached_property
     def topic_commands(self) -> str:
         """Topic pattern for command messages."""
         return f"{self.topic_prefix}/commands"
 
-    @property
+    @cached_property
     def topic_ai(self) -> str:
         """Topic pattern for AI messages."""
         return f"{self.topic_prefix}/ai"
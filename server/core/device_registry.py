@@ -4,7 +4,10 @@ Manages device registration, heartbeat tracking, and online/offline status.
 """
 
 import asyncio
-from collections.abc import Callable
+import heapq
+import inspect
+import time
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta
 from typing import Any
 
@@ -36,11 +39,27 @@ class DeviceRegistry:
         """
         self._devices: dict[str, DeviceInfo] = {}
         self._status: dict[str, DeviceStatus] = {}
-        self._heartbeat_timeout = timedelta(milliseconds=heartbeat_timeout_ms)
+        # time.monotonic() of each device's last heartbeat; DeviceStatus.last_seen
+        # is derived from it when a status is read
+        self._last_seen_mono: dict[str, float] = {}
+        # IDs of devices whose status is ONLINE, kept in step with status
+        # changes so online lookups do not scan every status
+        self._online: set[str] = set()
+        self._heartbeat_timeout_s = heartbeat_timeout_ms / 1000.0
+        # (expiry, device_id) heap with at most one entry per device. Entries
+        # are not updated on heartbeats; when one expires for a device that
+        # has been seen since, it is pushed again with the new expiry.
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._expiry_scheduled: set[str] = set()
         self._cleanup_interval = cleanup_interval_s
         self._cleanup_task: asyncio.Task[None] | None = None
-        self._on_device_online: list[Callable[[str, DeviceInfo], Any]] = []
-        self._on_device_offline: list[Callable[[str], Any]] = []
+        # Callbacks, split at registration into plain and coroutine functions.
+        # The tuples are replaced, never mutated, so events iterate a stable
+        # snapshot even if a callback registers another one.
+        self._sync_online: tuple[Callable[[str, DeviceInfo], Any], ...] = ()
+        self._async_online: tuple[Callable[[str, DeviceInfo], Awaitable[Any]], ...] = ()
+        self._sync_offline: tuple[Callable[[str], Any], ...] = ()
+        self._async_offline: tuple[Callable[[str], Awaitable[Any]], ...] = ()
         self._lock = asyncio.Lock()
 
     async def start(self) -> None:
@@ -60,11 +79,30 @@ class DeviceRegistry:
 
     def on_device_online(self, callback: Callable[[str, DeviceInfo], Any]) -> None:
         """Register callback for device online events."""
-        self._on_device_online.append(callback)
+        if inspect.iscoroutinefunction(callback):
+            self._async_online = (*self._async_online, callback)
+        else:
+            self._sync_online = (*self._sync_online, callback)
 
     def on_device_offline(self, callback: Callable[[str], Any]) -> None:
         """Register callback for device offline events."""
-        self._on_device_offline.append(callback)
+        if inspect.iscoroutinefunction(callback):
+            self._async_offline = (*self._async_offline, callback)
+        else:
+            self._sync_offline = (*self._sync_offline, callback)
+
+    async def _notify_online(self, device_id: str, device_info: DeviceInfo) -> None:
+        """Run device online callbacks, logging their errors."""
+        for callback in self._sync_online:
+            try:
+                callback(device_id, device_info)
+            except Exception as e:
+                logger.error("device_online_callback_error", error=str(e))
+        for async_callback in self._async_online:
+            try:
+                await async_callback(device_id, device_info)
+            except Exception as e:
+                logger.error("device_online_callback_error", error=str(e))
 
     async def register_device(self, device_info: DeviceInfo) -> None:
         """Register a new device or update existing registration.
@@ -86,11 +124,11 @@ class DeviceRegistry:
                 self._status[device_id] = DeviceStatus(
                     device_id=device_id,
                     status=ConnectionStatus.ONLINE,
-                    last_seen=datetime.utcnow(),
                 )
             else:
                 self._status[device_id].status = ConnectionStatus.ONLINE
-                self._status[device_id].last_seen = datetime.utcnow()
+            self._online.add(device_id)
+            self._touch(device_id)
 
             if is_new or was_offline:
                 logger.info(
@@ -99,13 +137,7 @@ class DeviceRegistry:
                     device_type=device_info.device_type,
                     is_new=is_new,
                 )
-                for callback in self._on_device_online:
-                    try:
-                        result = callback(device_id, device_info)
-                        if asyncio.iscoroutine(result):
-                            await result
-                    except Exception as e:
-                        logger.error("device_online_callback_error", error=str(e))
+                await self._notify_online(device_id, device_info)
 
     async def unregister_device(self, device_id: str) -> bool:
         """Unregister a device.
@@ -119,8 +151,9 @@ class DeviceRegistry:
         async with self._lock:
             if device_id in self._devices:
                 del self._devices[device_id]
-                if device_id in self._status:
-                    del self._status[device_id]
+                self._status.pop(device_id, None)
+                self._last_seen_mono.pop(device_id, None)
+                self._online.discard(device_id)
                 logger.info("device_unregistered", device_id=device_id)
                 return True
             return False
@@ -140,6 +173,13 @@ class DeviceRegistry:
             load: CPU/resource load (0.0-1.0)
             memory_free: Free memory in bytes
         """
+        status = self._status.get(device_id)
+        if status is not None and status.status == ConnectionStatus.ONLINE:
+            # Common case: an online device checking in. Nothing here awaits,
+            # so the update is atomic on the event loop without the lock.
+            self._apply_heartbeat(device_id, status, uptime_ms, load, memory_free)
+            return
+
         async with self._lock:
             if device_id not in self._status:
                 self._status[device_id] = DeviceStatus(device_id=device_id)
@@ -148,23 +188,29 @@ class DeviceRegistry:
             was_offline = status.status != ConnectionStatus.ONLINE
 
             status.status = ConnectionStatus.ONLINE
-            status.last_seen = datetime.utcnow()
-            status.uptime_ms = uptime_ms
-
-            if memory_free is not None:
-                status.extra["memory_free"] = memory_free
-            if load > 0:
-                status.extra["load"] = load
+            self._online.add(device_id)
+            self._apply_heartbeat(device_id, status, uptime_ms, load, memory_free)
 
             if was_offline and device_id in self._devices:
                 logger.info("device_reconnected", device_id=device_id)
-                for callback in self._on_device_online:
-                    try:
-                        result = callback(device_id, self._devices[device_id])
-                        if asyncio.iscoroutine(result):
-                            await result
-                    except Exception as e:
-                        logger.error("device_online_callback_error", error=str(e))
+                await self._notify_online(device_id, self._devices[device_id])
+
+    def _apply_heartbeat(
+        self,
+        device_id: str,
+        status: DeviceStatus,
+        uptime_ms: int,
+        load: float,
+        memory_free: int | None,
+    ) -> None:
+        """Copy heartbeat fields onto a device status."""
+        self._touch(device_id)
+        status.uptime_ms = uptime_ms
+
+        if memory_free is not None:
+            status.extra["memory_free"] = memory_free
+        if load > 0:
+            status.extra["load"] = load
 
     def get_device(self, device_id: str) -> DeviceInfo | None:
         """Get device info by ID."""
@@ -172,7 +218,10 @@ class DeviceRegistry:
 
     def get_status(self, device_id: str) -> DeviceStatus | None:
         """Get device status by ID."""
-        return self._status.get(device_id)
+        status = self._status.get(device_id)
+        if status is not None:
+            self._fill_last_seen(status, datetime.utcnow(), time.monotonic())
+        return status
 
     def get_all_devices(self) -> list[DeviceInfo]:
         """Get all registered devices."""
@@ -180,15 +229,25 @@ class DeviceRegistry:
 
     def get_all_statuses(self) -> list[DeviceStatus]:
         """Get status for all devices."""
+        now, now_mono = datetime.utcnow(), time.monotonic()
+        for status in self._status.values():
+            self._fill_last_seen(status, now, now_mono)
         return list(self._status.values())
 
+    def _fill_last_seen(self, status: DeviceStatus, now: datetime, now_mono: float) -> None:
+        """Set status.last_seen from the monotonic heartbeat time."""
+        seen = self._last_seen_mono.get(status.device_id)
+        if seen is not None:
+            status.last_seen = now - timedelta(seconds=now_mono - seen)
+
     def get_online_devices(self) -> list[DeviceInfo]:
         """Get all online devices."""
-        return [
-            self._devices[device_id]
-            for device_id, status in self._status.items()
-            if status.is_online() and device_id in self._devices
-        ]
+        devices = self._devices
+        return [devices[device_id] for device_id in self._online if device_id in devices]
+
+    def snapshot(self) -> tuple[list[DeviceInfo], int]:
+        """Get all registered devices and how many are online."""
+        return list(self._devices.values()), len(self._online.intersection(self._devices))
 
     async def _cleanup_loop(self) -> None:
         """Background task to check device health and mark offline."""
@@ -201,25 +260,56 @@ class DeviceRegistry:
             except Exception as e:
                 logger.error("cleanup_loop_error", error=str(e))
 
+    def _touch(self, device_id: str) -> None:
+        """Record a heartbeat and make sure the device has an expiry entry."""
+        now = time.monotonic()
+        self._last_seen_mono[device_id] = now
+        if device_id not in self._expiry_scheduled:
+            self._expiry_scheduled.add(device_id)
+            heapq.heappush(self._expiry_heap, (now + self._heartbeat_timeout_s, device_id))
+
     async def _check_device_health(self) -> None:
-        """Check all devices and mark timed-out ones as offline."""
-        now = datetime.utcnow()
+        """Mark devices whose heartbeat timed out as offline.
+
+        Only expiry entries that are due are looked at, so healthy devices
+        cost nothing here beyond an occasional reschedule.
+        """
+        now = time.monotonic()
+        heap = self._expiry_heap
         offline_devices: list[str] = []
 
         async with self._lock:
-            for device_id, status in self._status.items():
-                if status.status == ConnectionStatus.ONLINE and status.last_seen:
-                    if now - status.last_seen > self._heartbeat_timeout:
-                        status.status = ConnectionStatus.OFFLINE
-                        offline_devices.append(device_id)
+            while heap and heap[0][0] <= now:
+                _, device_id = heapq.heappop(heap)
+                seen = self._last_seen_mono.get(device_id)
+                if seen is None:
+                    # Unregistered since the entry was pushed
+                    self._expiry_scheduled.discard(device_id)
+                    continue
+
+                expiry = seen + self._heartbeat_timeout_s
+                if expiry > now:
+                    # Heard from since; check again at the new expiry
+                    heapq.heappush(heap, (expiry, device_id))
+                    continue
+
+                self._expiry_scheduled.discard(device_id)
+                status = self._status[device_id]
+                if status.status == ConnectionStatus.ONLINE:
+                    status.status = ConnectionStatus.OFFLINE
+                    self._online.discard(device_id)
+                    offline_devices.append(device_id)
 
         # Trigger callbacks outside lock
         for device_id in offline_devices:
             logger.warning("device_offline", device_id=device_id)
-            for callback in self._on_device_offline:
+            for callback in self._sync_offline:
+                try:
+                    callback(device_id)
+                except Exception as e:
+                    logger.error("device_offline_callback_error", error=str(e))
+            for async_callback in self._async_offline:
                 try:
-                    result = callback(device_id)
-                    if asyncio.iscoroutine(result):
-                        await result
+                    await async_callback(device_id)
                 except Exception as e:
                     logger.error("device_offline_callback_error", error=str(e))
@@ -0,0 +1,38 @@
+"""Logging configuration for herdbot server.
+
+Configures structlog from Settings.log_level and Settings.log_format.
+"""
+
+import logging
+
+import structlog
+
+from .config import Settings
+
+
+def configure_logging(settings: Settings) -> None:
+    """Configure structlog for the server process.
+
+    Loggers filter by level before any processor runs, so calls below
+    settings.log_level cost a method lookup and nothing else.
+
+    Args:
+        settings: Settings providing log_level and log_format
+    """
+    level = logging.getLevelNamesMapping().get(settings.log_level.upper(), logging.INFO)
+    if settings.log_format == "console":
+        # ConsoleRenderer formats exceptions itself
+        renderers = [structlog.dev.ConsoleRenderer()]
+    else:
+        renderers = [structlog.processors.format_exc_info, structlog.processors.JSONRenderer()]
+
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            *renderers,
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        cache_logger_on_first_use=True,
+    )
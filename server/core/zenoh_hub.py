@@ -4,21 +4,129 @@ Manages Zenoh session, topic subscriptions, and message routing.
 """
 
 import asyncio
+import json
+from collections import OrderedDict
 from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from functools import lru_cache
 
+import msgspec
 import structlog
 import zenoh
-from zenoh import Config, Sample, Session, Subscriber
-
-from shared.schemas import Command, CommandResponse, DeviceInfo, Heartbeat, SensorReading
+from zenoh import Config, KeyExpr, Publisher, Querier, Sample, Session, Subscriber
+
+from shared.schemas import (
+    Command,
+    DeviceInfo,
+    SensorReadingMsg,
+    SensorType,
+    decode_packed_readings,
+)
+from shared.schemas.packed import TICKS_PERIOD
+from shared.schemas.wire import (
+    COMMAND_RESPONSE_DECODER,
+    HEARTBEAT_DECODER,
+    SENSOR_READING_DECODER,
+)
 
 from .config import Settings
 from .device_registry import DeviceRegistry
 
 logger = structlog.get_logger()
 
+# Received payloads are passed on as buffers where Zenoh allows it, to
+# avoid copying them; handlers that keep a payload should copy it
+Payload = bytes | memoryview
+
 # Type alias for message handlers
-MessageHandler = Callable[[str, bytes], Awaitable[None] | None]
+MessageHandler = Callable[[str, Payload], Awaitable[None] | None]
+
+# Sensor handlers also get the reading the hub already decoded
+SensorHandler = Callable[[str, Payload, SensorReadingMsg], Awaitable[None] | None]
+
+# Received samples waiting for dispatch, and how many are dispatched together
+_INGRESS_QUEUE_SIZE = 8192
+_INGRESS_BATCH = 64
+
+# Sensor payloads at least this large are decoded in a worker thread, so a
+# big frame (e.g. a lidar scan) does not stall dispatch of the rest of the
+# batch. Below it, the thread hop costs more than the decode.
+_THREAD_DECODE_BYTES = 64 * 1024
+
+_Ingress = tuple[str, Payload, MessageHandler]
+
+# Queriers kept declared for repeated queries; selectors come from API
+# requests (e.g. one per device ID), so the least recently used is undeclared
+_QUERIER_CACHE_SIZE = 32
+
+# IMU readings whose value is {"samples": [[ticks_ms, ax, ay, az, gx, gy, gz,
+# (mx, my, mz)], ...]} are batches from Device.publish_sensor_batch
+_IMU_TYPES = frozenset({SensorType.IMU_6DOF, SensorType.IMU_9DOF})
+
+
+def _zbytes_is_buffer() -> bool:
+    """Check whether this Zenoh binding exposes ZBytes as a buffer."""
+    try:
+        memoryview(zenoh.ZBytes(b""))
+    except TypeError:
+        return False
+    return True
+
+
+_ZBYTES_BUFFER = _zbytes_is_buffer()
+
+
+def _unbatch_imu(reading: SensorReadingMsg) -> list[SensorReadingMsg]:
+    """Split a batched IMU reading into one reading per sample.
+
+    The batch timestamp is taken as the time of the last sample; earlier ones
+    are placed by their ticks_ms() difference to it. Malformed samples are
+    skipped.
+    """
+    samples = [s for s in reading.value["samples"] if isinstance(s, list) and len(s) >= 7]
+    if not samples:
+        return []
+
+    last_ticks = int(samples[-1][0])
+    readings = []
+    for sample in samples:
+        value = {"accel": sample[1:4], "gyro": sample[4:7]}
+        if len(sample) >= 10:
+            value["mag"] = sample[7:10]
+        age_ms = (last_ticks - int(sample[0])) % TICKS_PERIOD
+        readings.append(
+            msgspec.structs.replace(
+                reading,
+                timestamp=reading.timestamp - timedelta(milliseconds=age_ms),
+                value=value,
+            )
+        )
+    return readings
+
+
+@lru_cache(maxsize=1)
+def build_zenoh_config(
+    mode: str,
+    listen: tuple[str, ...],
+    connect: tuple[str, ...],
+) -> Config:
+    """Build the Zenoh session config, reusing it for the same settings.
+
+    The settings are parsed as one JSON document. zenoh.open() does not
+    modify the config, so hubs restarted with the same settings share one
+    instance.
+
+    Args:
+        mode: Zenoh mode ("peer", "client" or "router")
+        listen: Listen endpoints
+        connect: Connect endpoints
+    """
+    config: dict[str, object] = {"mode": mode}
+    if listen:
+        config["listen"] = {"endpoints": list(listen)}
+    if connect:
+        config["connect"] = {"endpoints": list(connect)}
+    return Config.from_json5(json.dumps(config))
 
 
 class ZenohHub:
@@ -39,8 +147,36 @@ class ZenohHub:
         self._registry = device_registry
         self._session: Session | None = None
         self._subscribers: list[Subscriber] = []
-        self._handlers: dict[str, list[MessageHandler]] = {}
+        # Declared once per topic on first publish, and per key expression
+        # and timeout on first query (least recently used first)
+        self._publishers: dict[str, Publisher] = {}
+        self._queriers: OrderedDict[tuple[str, float], Querier] = OrderedDict()
+
+        # Key expressions are parsed once here rather than on every use
+        prefix = settings.topic_prefix
+        self._topics = {
+            "info": KeyExpr(f"{prefix}/devices/*/info"),
+            "heartbeat": KeyExpr(f"{prefix}/devices/*/heartbeat"),
+            "sensors": KeyExpr(f"{prefix}/sensors/**"),
+            "command_response": KeyExpr(f"{prefix}/commands/*/response"),
+        }
+        self._commands_ke = KeyExpr(f"{prefix}/commands")
+        # Command topic per device ID, joined and validated once
+        self._command_topics: dict[str, str] = {}
+        # Handlers by subscribed key expression; tuples are replaced, never
+        # mutated, like the sensor handlers below
+        self._handlers: dict[KeyExpr, tuple[MessageHandler, ...]] = {}
+        # Replaced, never mutated, so dispatch iterates a stable snapshot
+        self._sensor_handlers: tuple[SensorHandler, ...] = ()
         self._running = False
+        # Sensor messages are counted rather than logged one by one
+        self._sensor_messages = 0
+
+        # Zenoh calls subscribers on its own threads; samples are handed to
+        # the event loop and dispatched in batches by a single drain task
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ingress: asyncio.Queue[_Ingress] = asyncio.Queue(maxsize=_INGRESS_QUEUE_SIZE)
+        self._drain_task: asyncio.Task[None] | None = None
 
     async def start(self) -> None:
         """Start the Zenoh session and set up subscriptions."""
@@ -54,24 +190,17 @@ class ZenohHub:
         )
 
         # Configure Zenoh
-        config = Config()
-
-        # Set mode
-        config.insert_json5("mode", f'"{self._settings.zenoh_mode}"')
-
-        # Set listen endpoints
-        if self._settings.zenoh_listen:
-            endpoints = ", ".join(f'"{e}"' for e in self._settings.zenoh_listen)
-            config.insert_json5("listen/endpoints", f"[{endpoints}]")
-
-        # Set connect endpoints
-        if self._settings.zenoh_connect:
-            endpoints = ", ".join(f'"{e}"' for e in self._settings.zenoh_connect)
-            config.insert_json5("connect/endpoints", f"[{endpoints}]")
+        config = build_zenoh_config(
+            self._settings.zenoh_mode,
+            tuple(self._settings.zenoh_listen),
+            tuple(self._settings.zenoh_connect),
+        )
 
         # Open session (zenoh.open is synchronous)
         self._session = zenoh.open(config)
         self._running = True
+        self._loop = asyncio.get_running_loop()
+        self._drain_task = asyncio.create_task(self._drain())
 
         # Set up core subscriptions
         self._setup_subscriptions()
@@ -90,6 +219,18 @@ class ZenohHub:
             sub.undeclare()
         self._subscribers.clear()
 
+        for pub in self._publishers.values():
+            pub.undeclare()
+        self._publishers.clear()
+        for querier in self._queriers.values():
+            querier.undeclare()
+        self._queriers.clear()
+
+        if self._drain_task:
+            self._drain_task.cancel()
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+            self._drain_task = None
+
         # Close session
         if self._session:
             self._session.close()
@@ -102,33 +243,19 @@ class ZenohHub:
         if not self._session:
             return
 
-        prefix = self._settings.topic_prefix
-
         # Device info subscription
-        self._subscribe(
-            f"{prefix}/devices/*/info",
-            self._handle_device_info,
-        )
+        self._subscribe(self._topics["info"], self._handle_device_info)
 
         # Heartbeat subscription
-        self._subscribe(
-            f"{prefix}/devices/*/heartbeat",
-            self._handle_heartbeat,
-        )
+        self._subscribe(self._topics["heartbeat"], self._handle_heartbeat)
 
         # Sensor data subscription
-        self._subscribe(
-            f"{prefix}/sensors/**",
-            self._handle_sensor_data,
-        )
+        self._subscribe(self._topics["sensors"], self._handle_sensor_data)
 
         # Command response subscription
-        self._subscribe(
-            f"{prefix}/commands/*/response",
-            self._handle_command_response,
-        )
+        self._subscribe(self._topics["command_response"], self._handle_command_response)
 
-    def _subscribe(self, topic: str, handler: MessageHandler) -> None:
+    def _subscribe(self, topic: str | KeyExpr, handler: MessageHandler) -> None:
         """Subscribe to a topic with a handler.
 
         Args:
@@ -138,33 +265,64 @@ class ZenohHub:
         if not self._session:
             return
 
+        if not isinstance(topic, KeyExpr):
+            topic = KeyExpr(topic)
+        loop = self._loop
+
         def callback(sample: Sample) -> None:
-            key = str(sample.key_expr)
-            payload = bytes(sample.payload)
-            asyncio.create_task(self._dispatch_message(key, payload, handler))
+            zbytes = sample.payload
+            payload = memoryview(zbytes) if _ZBYTES_BUFFER else zbytes.to_bytes()
+            item = (str(sample.key_expr), payload, handler)
+            loop.call_soon_threadsafe(self._enqueue, item)
 
         sub = self._session.declare_subscriber(topic, callback)
         self._subscribers.append(sub)
 
         # Track handlers for external access
-        if topic not in self._handlers:
-            self._handlers[topic] = []
-        self._handlers[topic].append(handler)
+        self._handlers[topic] = (*self._handlers.get(topic, ()), handler)
+
+        logger.debug("subscribed", topic=str(topic))
+
+    def _enqueue(self, item: _Ingress) -> None:
+        """Queue a received sample for dispatch, dropping the oldest if full."""
+        try:
+            self._ingress.put_nowait(item)
+        except asyncio.QueueFull:
+            dropped, _, _ = self._ingress.get_nowait()
+            logger.warning("zenoh_sample_dropped", topic=dropped)
+            self._ingress.put_nowait(item)
 
-        logger.debug("subscribed", topic=topic)
+    async def _drain(self) -> None:
+        """Dispatch queued samples until cancelled.
+
+        Waits for one sample, then takes whatever else is already queued (up
+        to _INGRESS_BATCH) and dispatches them together.
+        """
+        while True:
+            batch = [await self._ingress.get()]
+            while len(batch) < _INGRESS_BATCH and not self._ingress.empty():
+                batch.append(self._ingress.get_nowait())
+            if len(batch) == 1:
+                await self._dispatch_message(*batch[0])
+            else:
+                await asyncio.gather(*(self._dispatch_message(*item) for item in batch))
 
     async def _dispatch_message(
-        self, key: str, payload: bytes, handler: MessageHandler
+        self,
+        key: str,
+        payload: Payload,
+        handler: Callable[..., Awaitable[None] | None],
+        *args: object,
     ) -> None:
         """Dispatch a message to its handler."""
         try:
-            result = handler(key, payload)
+            result = handler(key, payload, *args)
             if asyncio.iscoroutine(result):
                 await result
         except Exception as e:
             logger.error("message_handler_error", topic=key, error=str(e))
 
-    async def _handle_device_info(self, key: str, payload: bytes) -> None:
+    async def _handle_device_info(self, key: str, payload: Payload) -> None:
         """Handle device info/registration messages."""
         try:
             device_info = DeviceInfo.from_msgpack(payload)
@@ -172,10 +330,10 @@ class ZenohHub:
         except Exception as e:
             logger.error("device_info_parse_error", topic=key, error=str(e))
 
-    async def _handle_heartbeat(self, key: str, payload: bytes) -> None:
+    async def _handle_heartbeat(self, key: str, payload: Payload) -> None:
         """Handle device heartbeat messages."""
         try:
-            heartbeat = Heartbeat.from_msgpack(payload)
+            heartbeat = HEARTBEAT_DECODER.decode(payload)
             await self._registry.update_heartbeat(
                 device_id=heartbeat.device_id,
                 uptime_ms=heartbeat.uptime_ms,
@@ -185,26 +343,75 @@ class ZenohHub:
         except Exception as e:
             logger.error("heartbeat_parse_error", topic=key, error=str(e))
 
-    async def _handle_sensor_data(self, key: str, payload: bytes) -> None:
-        """Handle sensor data messages."""
-        try:
-            reading = SensorReading.from_msgpack(payload)
-            # Forward to registered handlers
-            for handler in self._handlers.get("sensor_data", []):
-                await self._dispatch_message(key, payload, handler)
+    async def _handle_sensor_data(self, key: str, payload: Payload) -> None:
+        """Handle sensor data messages.
 
-            logger.debug(
-                "sensor_data_received",
-                device_id=reading.device_id,
-                sensor_type=reading.sensor_type,
-            )
+        Payloads on ``{prefix}/sensors/{device_id}/packed`` are packed binary
+        frames (see shared.schemas.packed); everything else is one
+        MessagePack-encoded reading. Batched IMU readings are forwarded as
+        one reading per sample.
+        """
+        try:
+            if key.endswith("/packed"):
+                await self._handle_packed_frame(key, payload)
+                return
+
+            if len(payload) < _THREAD_DECODE_BYTES:
+                reading = SENSOR_READING_DECODER.decode(payload)
+            else:
+                reading = await asyncio.to_thread(SENSOR_READING_DECODER.decode, payload)
+
+            if (
+                reading.sensor_type in _IMU_TYPES
+                and isinstance(reading.value, dict)
+                and "samples" in reading.value
+            ):
+                for sample in _unbatch_imu(reading):
+                    await self._forward_reading(key, payload, sample)
+                return
+
+            await self._forward_reading(key, payload, reading)
         except Exception as e:
             logger.error("sensor_data_parse_error", topic=key, error=str(e))
 
-    async def _handle_command_response(self, key: str, payload: bytes) -> None:
+    async def _handle_packed_frame(self, key: str, payload: Payload) -> None:
+        """Decode a packed sensor frame and forward each of its readings."""
+        device_id = key.rsplit("/", 2)[-2]
+        device = self._registry.get_device(device_id)
+        if device is None:
+            # The sensor table comes with the device info message
+            logger.warning("packed_frame_unknown_device", device_id=device_id)
+            return
+
+        for r in decode_packed_readings(device, payload):
+            reading = SensorReadingMsg(
+                timestamp=r.timestamp,
+                device_id=r.device_id,
+                sensor_type=r.sensor_type,
+                sensor_id=r.sensor_id,
+                value=r.value,
+                unit=r.unit,
+                quality=r.quality,
+            )
+            await self._forward_reading(key, payload, reading)
+
+    async def _forward_reading(self, key: str, payload: Payload, reading: SensorReadingMsg) -> None:
+        """Count a decoded reading and pass it to the sensor handlers."""
+        self._sensor_messages += 1
+        # Forward to registered handlers; they are independent, so run
+        # them concurrently (each logs its own errors)
+        handlers = self._sensor_handlers
+        if len(handlers) == 1:
+            await self._dispatch_message(key, payload, handlers[0], reading)
+        elif handlers:
+            await asyncio.gather(
+                *(self._dispatch_message(key, payload, h, reading) for h in handlers)
+            )
+
+    async def _handle_command_response(self, key: str, payload: Payload) -> None:
         """Handle command response messages."""
         try:
-            response = CommandResponse.from_msgpack(payload)
+            response = COMMAND_RESPONSE_DECODER.decode(payload)
             logger.debug(
                 "command_response_received",
                 request_id=str(response.request_id),
@@ -213,15 +420,19 @@ class ZenohHub:
         except Exception as e:
             logger.error("command_response_parse_error", topic=key, error=str(e))
 
-    def add_sensor_handler(self, handler: MessageHandler) -> None:
-        """Add a handler for sensor data messages."""
-        if "sensor_data" not in self._handlers:
-            self._handlers["sensor_data"] = []
-        self._handlers["sensor_data"].append(handler)
+    def add_sensor_handler(self, handler: SensorHandler) -> None:
+        """Add a handler for sensor data messages.
+
+        Handlers are called with the topic key, the raw payload (bytes or a
+        memoryview) and the decoded reading.
+        """
+        self._sensor_handlers = (*self._sensor_handlers, handler)
 
-    async def publish(self, topic: str, payload: bytes) -> None:
+    async def publish(self, topic: str | KeyExpr, payload: bytes) -> None:
         """Publish a message to a topic.
 
+        A publisher is declared for each topic on first use and reused.
+
         Args:
             topic: Topic to publish to
             payload: Message payload (MessagePack encoded)
@@ -229,8 +440,12 @@ class ZenohHub:
         if not self._session:
             raise RuntimeError("Zenoh session not started")
 
-        self._session.put(topic, payload)
-        logger.debug("message_published", topic=topic, size=len(payload))
+        key = str(topic)
+        publisher = self._publishers.get(key)
+        if publisher is None:
+            publisher = self._publishers[key] = self._session.declare_publisher(topic)
+        publisher.put(payload)
+        logger.debug("message_published", topic=key, size=len(payload))
 
     async def send_command(self, device_id: str, command: Command) -> None:
         """Send a command to a device.
@@ -239,7 +454,9 @@ class ZenohHub:
             device_id: Target device ID
             command: Command to send
         """
-        topic = f"{self._settings.topic_prefix}/commands/{device_id}"
+        topic = self._command_topics.get(device_id)
+        if topic is None:
+            topic = self._command_topics[device_id] = str(self._commands_ke.join(device_id))
         await self.publish(topic, command.to_msgpack())
         logger.info(
             "command_sent",
@@ -263,7 +480,20 @@ class ZenohHub:
 
         results: list[tuple[str, bytes]] = []
 
-        replies = self._session.get(selector, timeout=timeout_s)
+        # Repeated queries reuse a querier declared for the key expression
+        key_expr, _, parameters = selector.partition("?")
+        cache_key = (key_expr, timeout_s)
+        querier = self._queriers.get(cache_key)
+        if querier is None:
+            querier = self._session.declare_querier(key_expr, timeout=timeout_s)
+            self._queriers[cache_key] = querier
+            if len(self._queriers) > _QUERIER_CACHE_SIZE:
+                _, evicted = self._queriers.popitem(last=False)
+                evicted.undeclare()
+        else:
+            self._queriers.move_to_end(cache_key)
+
+        replies = querier.get(parameters=parameters or None)
         for reply in replies:
             if reply.ok:
                 sample = reply.ok
@@ -276,6 +506,11 @@ class ZenohHub:
         """Check if the hub is running."""
         return self._running
 
+    @property
+    def sensor_messages(self) -> int:
+        """Number of sensor messages decoded since the hub was created."""
+        return self._sensor_messages
+
     @property
     def session_id(self) -> str | None:
         """Get the Zenoh session ID."""
@@ -7,98 +7,152 @@ from typing import Any
 
 from shared.schemas import ConnectionStatus, DeviceStatus, Pose2D, SensorReading, SensorType
 
+# Status colors for device visualization
+_GRAY = (128, 128, 128)
+_STATUS_COLORS = {
+    ConnectionStatus.ONLINE: (0, 255, 0),  # Green
+    ConnectionStatus.OFFLINE: (255, 0, 0),  # Red
+    ConnectionStatus.CONNECTING: (255, 255, 0),  # Yellow
+    ConnectionStatus.ERROR: (255, 128, 0),  # Orange
+    ConnectionStatus.UNKNOWN: _GRAY,  # Gray
+}
 
-def format_sensor_reading(reading: SensorReading) -> dict[str, Any]:
-    """Format a sensor reading for Rerun visualization.
+# ConnectionStatus -> (status string, color). ConnectionStatus is a str enum,
+# so plain status strings (DeviceStatus uses enum values) hit the same keys.
+_STATUS_META = {cs: (cs.value, _STATUS_COLORS.get(cs, _GRAY)) for cs in ConnectionStatus}
 
-    Args:
-        reading: Sensor reading to format
 
-    Returns:
-        Dictionary with visualization type and formatted data
-    """
-    sensor_type = reading.sensor_type
+def _scalar(value: float, unit: str) -> dict[str, Any]:
+    return {"type": "scalar", "value": float(value), "unit": unit}
+
+
+def _format_scalar(reading: SensorReading) -> dict[str, Any]:
+    """Temperature, humidity, pressure, light, battery - scalar values."""
     value = reading.value
+    if isinstance(value, (int, float)):
+        return _scalar(value, reading.unit)
+    elif isinstance(value, dict):
+        # Take first numeric value
+        for v in value.values():
+            if isinstance(v, (int, float)):
+                return _scalar(v, reading.unit)
+    return _format_generic(reading)
 
-    # Temperature, humidity, pressure, light, battery - scalar values
-    if sensor_type in (
-        SensorType.TEMPERATURE,
-        SensorType.HUMIDITY,
-        SensorType.PRESSURE,
-        SensorType.LIGHT,
-        SensorType.BATTERY,
-    ):
-        if isinstance(value, (int, float)):
-            return {"type": "scalar", "value": float(value), "unit": reading.unit}
-        elif isinstance(value, dict):
-            # Take first numeric value
-            for v in value.values():
-                if isinstance(v, (int, float)):
-                    return {"type": "scalar", "value": float(v), "unit": reading.unit}
-
-    # Distance sensor
-    if sensor_type == SensorType.DISTANCE:
-        if isinstance(value, (int, float)):
-            return {"type": "scalar", "value": float(value), "unit": reading.unit}
-        elif isinstance(value, list) and len(value) >= 1:
-            return {"type": "scalar", "value": float(value[0]), "unit": reading.unit}
-
-    # IMU sensors
-    if sensor_type in (SensorType.IMU_6DOF, SensorType.IMU_9DOF):
-        if isinstance(value, dict):
-            accel = value.get("accel", [0, 0, 0])
-            gyro = value.get("gyro", [0, 0, 0])
-            mag = value.get("mag", [0, 0, 0]) if sensor_type == SensorType.IMU_9DOF else None
-
-            return {
-                "type": "imu",
-                "accel": accel[:3] if len(accel) >= 3 else accel + [0] * (3 - len(accel)),
-                "gyro": gyro[:3] if len(gyro) >= 3 else gyro + [0] * (3 - len(gyro)),
-                "mag": mag[:3] if mag and len(mag) >= 3 else None,
-            }
-
-    # GPS
-    if sensor_type == SensorType.GPS:
-        if isinstance(value, dict):
-            return {
-                "type": "gps",
-                "lat": value.get("lat", 0),
-                "lon": value.get("lon", 0),
-                "alt": value.get("alt"),
-                "speed": value.get("speed"),
-                "heading": value.get("heading"),
-            }
-
-    # Encoder
-    if sensor_type == SensorType.ENCODER:
-        if isinstance(value, (int, float)):
-            return {"type": "scalar", "value": float(value), "unit": "ticks"}
-        elif isinstance(value, dict):
-            encoder_val = value.get("count") or value.get("delta") or 0
-            return {
-                "type": "scalar",
-                "value": float(encoder_val),
-                "unit": "ticks",
-            }
-
-    # Generic/custom - try to extract a scalar
+
+def _format_distance(reading: SensorReading) -> dict[str, Any]:
+    value = reading.value
     if isinstance(value, (int, float)):
-        return {"type": "scalar", "value": float(value), "unit": reading.unit}
+        return _scalar(value, reading.unit)
+    elif isinstance(value, list) and len(value) >= 1:
+        return _scalar(value[0], reading.unit)
+    return _format_generic(reading)
+
+
+_ZEROS3 = (0.0, 0.0, 0.0)
+
+
+def _pad3(v: list[float] | tuple[()]) -> list[float]:
+    """First three components of a vector, zero-padded if shorter."""
+    n = len(v)
+    return v[:3] if n >= 3 else [*v, *_ZEROS3[n:]]
+
+
+def _format_imu(reading: SensorReading) -> dict[str, Any]:
+    value = reading.value
+    if not isinstance(value, dict):
+        return _format_generic(reading)
+
+    mag = value.get("mag", _ZEROS3) if reading.sensor_type == SensorType.IMU_9DOF else None
+
+    return {
+        "type": "imu",
+        "accel": _pad3(value.get("accel") or ()),
+        "gyro": _pad3(value.get("gyro") or ()),
+        "mag": list(mag[:3]) if mag and len(mag) >= 3 else None,
+    }
+
+
+def _format_gps(reading: SensorReading) -> dict[str, Any]:
+    value = reading.value
+    if not isinstance(value, dict):
+        return _format_generic(reading)
+
+    return {
+        "type": "gps",
+        "lat": value.get("lat", 0),
+        "lon": value.get("lon", 0),
+        "alt": value.get("alt"),
+        "speed": value.get("speed"),
+        "heading": value.get("heading"),
+    }
+
+
+def _format_encoder(reading: SensorReading) -> dict[str, Any]:
+    value = reading.value
+    if isinstance(value, (int, float)):
+        return _scalar(value, "ticks")
+    elif isinstance(value, dict):
+        encoder_val = value.get("count") or value.get("delta") or 0
+        return _scalar(encoder_val, "ticks")
+    return _format_generic(reading)
+
+
+def _format_generic(reading: SensorReading) -> dict[str, Any]:
+    """Generic/custom - try to extract a scalar."""
+    value = reading.value
+    if isinstance(value, (int, float)):
+        return _scalar(value, reading.unit)
     elif isinstance(value, list):
         if len(value) == 3:
             return {"type": "vector3", "value": value}
         elif len(value) >= 1:
-            return {"type": "scalar", "value": float(value[0]), "unit": reading.unit}
+            return _scalar(value[0], reading.unit)
     elif isinstance(value, dict):
         # Try to find a numeric value
-        for _k, v in value.items():
+        for v in value.values():
             if isinstance(v, (int, float)):
-                return {"type": "scalar", "value": float(v), "unit": reading.unit}
+                return _scalar(v, reading.unit)
+
+    elif isinstance(value, bytes):
+        # Binary payloads (camera, lidar) are not rendered from here
+        return {"type": "binary", "size": len(value), "encoding": reading.encoding}
 
     # Fallback
     return {"type": "unknown", "value": str(value)}
 
 
+_SCALAR_TYPES = frozenset(
+    {
+        SensorType.TEMPERATURE,
+        SensorType.HUMIDITY,
+        SensorType.PRESSURE,
+        SensorType.LIGHT,
+        SensorType.BATTERY,
+    }
+)
+
+# Formatter per sensor type; anything else goes through _format_generic
+_FORMATTERS = dict.fromkeys(_SCALAR_TYPES, _format_scalar) | {
+    SensorType.DISTANCE: _format_distance,
+    SensorType.IMU_6DOF: _format_imu,
+    SensorType.IMU_9DOF: _format_imu,
+    SensorType.GPS: _format_gps,
+    SensorType.ENCODER: _format_encoder,
+}
+
+
+def format_sensor_reading(reading: SensorReading) -> dict[str, Any]:
+    """Format a sensor reading for Rerun visualization.
+
+    Args:
+        reading: Sensor reading to format
+
+    Returns:
+        Dictionary with visualization type and formatted data
+    """
+    return _FORMATTERS.get(reading.sensor_type, _format_generic)(reading)
+
+
 def format_pose(pose: Pose2D) -> dict[str, Any]:
     """Format a 2D pose for Rerun visualization.
 
@@ -126,19 +180,12 @@ def format_device_status(status: DeviceStatus) -> dict[str, Any]:
     Returns:
         Dictionary with formatted status data
     """
-    # Map status to color
-    status_colors = {
-        ConnectionStatus.ONLINE: [0, 255, 0],      # Green
-        ConnectionStatus.OFFLINE: [255, 0, 0],     # Red
-        ConnectionStatus.CONNECTING: [255, 255, 0], # Yellow
-        ConnectionStatus.ERROR: [255, 128, 0],     # Orange
-        ConnectionStatus.UNKNOWN: [128, 128, 128], # Gray
-    }
+    status_str, color = _STATUS_META.get(status.status) or (str(status.status), _GRAY)
 
     return {
         "device_id": status.device_id,
-        "status": status.status.value if isinstance(status.status, ConnectionStatus) else status.status,
-        "color": status_colors.get(status.status, [128, 128, 128]),
+        "status": status_str,
+        "color": color,
         "uptime_ms": status.uptime_ms,
         "battery_level": status.battery_level,
         "signal_strength": status.signal_strength,
@@ -3,8 +3,11 @@
 Subscribes to Zenoh topics and forwards data to Rerun for visualization.
 """
 
+import asyncio
+from collections import defaultdict, deque
 from typing import Any
 
+import numpy as np
 import structlog
 
 try:
@@ -20,6 +23,15 @@ from .formatters import format_pose, format_sensor_reading
 
 logger = structlog.get_logger()
 
+# Points kept per sensor time series
+_TIMESERIES_POINTS = 1000
+
+# Length of the heading arrow drawn for poses
+_HEADING_LENGTH = 0.5
+
+# Points are buffered and logged once per viewer frame
+_FLUSH_INTERVAL_S = 1 / 60
+
 
 class RerunBridge:
     """Bridge between Zenoh messages and Rerun visualization.
@@ -45,7 +57,13 @@ class RerunBridge:
         self._running = False
 
         # Track time series for each sensor
-        self._timeseries: dict[str, list[tuple[float, float]]] = {}
+        self._timeseries: dict[str, deque[tuple[float, float]]] = {}
+
+        # Points waiting for the next flush, by entity path and archetype
+        self._pending: defaultdict[tuple[str, Any], list[list[float]]] = defaultdict(list)
+        # Poses waiting for the next flush as (x, y, theta), by entity path
+        self._poses: defaultdict[str, list[tuple[float, float, float]]] = defaultdict(list)
+        self._flush_handle: asyncio.TimerHandle | None = None
 
     async def start(self) -> bool:
         """Start the Rerun bridge.
@@ -78,7 +96,10 @@ class RerunBridge:
             return False
 
     async def stop(self) -> None:
-        """Stop the Rerun bridge."""
+        """Stop the Rerun bridge, logging any buffered points."""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+        self._flush()
         self._running = False
         logger.info("rerun_bridge_stopped")
 
@@ -101,25 +122,20 @@ class RerunBridge:
                 rr.log(entity_path, rr.Scalar(log_data["value"]))  # type: ignore[attr-defined]
 
             elif log_data["type"] == "vector3":
-                rr.log(entity_path, rr.Points3D([log_data["value"]]))
+                self._queue_point(entity_path, rr.Points3D, log_data["value"])
 
             elif log_data["type"] == "imu":
                 # Log accelerometer
-                rr.log(
-                    f"{entity_path}/accel",
-                    rr.Points3D([log_data["accel"]]),
-                )
+                self._queue_point(f"{entity_path}/accel", rr.Points3D, log_data["accel"])
                 # Log gyroscope
-                rr.log(
-                    f"{entity_path}/gyro",
-                    rr.Points3D([log_data["gyro"]]),
-                )
+                self._queue_point(f"{entity_path}/gyro", rr.Points3D, log_data["gyro"])
 
             elif log_data["type"] == "gps":
                 # Log GPS as 2D point on map
-                rr.log(
+                self._queue_point(
                     f"{entity_path}/position",
-                    rr.Points2D([[log_data["lon"], log_data["lat"]]]),
+                    rr.Points2D,
+                    [log_data["lon"], log_data["lat"]],
                 )
 
             # Track time series
@@ -142,25 +158,9 @@ class RerunBridge:
 
         try:
             log_data = format_pose(pose)
-
-            # Log position as 2D point
-            rr.log(
-                f"{entity_path}/position",
-                rr.Points2D([[log_data["x"], log_data["y"]]]),
-            )
-
-            # Log orientation as arrow
-            import math
-            dx = math.cos(log_data["theta"]) * 0.5
-            dy = math.sin(log_data["theta"]) * 0.5
-
-            rr.log(
-                f"{entity_path}/heading",
-                rr.Arrows2D(
-                    origins=[[log_data["x"], log_data["y"]]],
-                    vectors=[[dx, dy]],
-                ),
-            )
+            # Position and heading are logged on the next flush
+            self._poses[entity_path].append((log_data["x"], log_data["y"], log_data["theta"]))
+            self._schedule_flush()
 
         except Exception as e:
             logger.error("rerun_pose_error", entity=entity_path, error=str(e))
@@ -220,22 +220,61 @@ class RerunBridge:
         except Exception as e:
             logger.error("rerun_ai_error", error=str(e))
 
+    def _queue_point(self, entity_path: str, archetype: Any, point: list[float]) -> None:
+        """Buffer a point for the next flush.
+
+        Points for the same entity that arrive within one flush interval are
+        logged together as one batch. Without a running event loop the point
+        is logged right away.
+        """
+        self._pending[(entity_path, archetype)].append(point)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Schedule a flush if none is pending, or flush now without a loop."""
+        if self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._flush()
+                return
+            self._flush_handle = loop.call_later(_FLUSH_INTERVAL_S, self._flush)
+
+    def _flush(self) -> None:
+        """Log buffered points and poses, one call per entity."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, defaultdict(list)
+        for (entity_path, archetype), points in pending.items():
+            try:
+                rr.log(entity_path, archetype(np.asarray(points, dtype=np.float32)))
+            except Exception as e:
+                logger.error("rerun_log_error", entity=entity_path, error=str(e))
+
+        poses, self._poses = self._poses, defaultdict(list)
+        for entity_path, frame in poses.items():
+            try:
+                arr = np.asarray(frame, dtype=np.float32)
+                origins, theta = arr[:, :2], arr[:, 2]
+                vectors = np.stack([np.cos(theta), np.sin(theta)], axis=1) * _HEADING_LENGTH
+                rr.log(f"{entity_path}/position", rr.Points2D(origins))
+                rr.log(f"{entity_path}/heading", rr.Arrows2D(origins=origins, vectors=vectors))
+            except Exception as e:
+                logger.error("rerun_pose_error", entity=entity_path, error=str(e))
+
     def _update_timeseries(
         self, entity_path: str, timestamp: float, data: dict[str, Any]
     ) -> None:
         """Track time series data for trend visualization."""
         key = entity_path
 
-        if key not in self._timeseries:
-            self._timeseries[key] = []
+        # Bounded, so appending drops the oldest point once full
+        series = self._timeseries.get(key)
+        if series is None:
+            series = self._timeseries[key] = deque(maxlen=_TIMESERIES_POINTS)
 
         # Extract scalar value if available
         if "value" in data and isinstance(data["value"], (int, float)):
-            self._timeseries[key].append((timestamp, data["value"]))
-
-            # Keep last 1000 points
-            if len(self._timeseries[key]) > 1000:
-                self._timeseries[key] = self._timeseries[key][-1000:]
+            series.append((timestamp, data["value"]))
 
     @property
     def is_available(self) -> bool:
@@ -1,22 +1,39 @@
-"""Message schemas for herdbot communication."""
-
-from .device import (
-    CapabilityType,
-    ConnectionStatus,
-    DeviceCapability,
-    DeviceInfo,
-    DeviceStatus,
-    DeviceType,
-)
-from .messages import (
-    Command,
-    CommandResponse,
-    Heartbeat,
-    Pose2D,
-    SensorReading,
-    SensorType,
-    Twist2D,
-)
+"""Message schemas for herdbot communication.
+
+Names are imported from their submodules on first access (PEP 562), so a
+process only pays for the schemas it uses.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .device import (
+        CapabilityType,
+        ConnectionStatus,
+        DeviceCapability,
+        DeviceInfo,
+        DeviceStatus,
+        DeviceType,
+    )
+    from .messages import (
+        Command,
+        CommandResponse,
+        Heartbeat,
+        MessageBatch,
+        Pose2D,
+        SensorReading,
+        SensorType,
+        Twist2D,
+    )
+    from .packed import decode_packed_readings
+    from .wire import (
+        CommandResponseMsg,
+        HeartbeatMsg,
+        Pose2DMsg,
+        SensorReadingMsg,
+        Twist2DMsg,
+    )
 
 __all__ = [
     # Device schemas
@@ -34,4 +51,51 @@ __all__ = [
     "Command",
     "CommandResponse",
     "Heartbeat",
+    "MessageBatch",
+    # Packed frames
+    "decode_packed_readings",
+    # Wire structs
+    "SensorReadingMsg",
+    "HeartbeatMsg",
+    "CommandResponseMsg",
+    "Pose2DMsg",
+    "Twist2DMsg",
 ]
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "DeviceInfo": ".device",
+    "DeviceCapability": ".device",
+    "DeviceStatus": ".device",
+    "DeviceType": ".device",
+    "CapabilityType": ".device",
+    "ConnectionStatus": ".device",
+    "SensorReading": ".messages",
+    "SensorType": ".messages",
+    "Pose2D": ".messages",
+    "Twist2D": ".messages",
+    "Command": ".messages",
+    "CommandResponse": ".messages",
+    "Heartbeat": ".messages",
+    "MessageBatch": ".messages",
+    "decode_packed_readings": ".packed",
+    "SensorReadingMsg": ".wire",
+    "HeartbeatMsg": ".wire",
+    "CommandResponseMsg": ".wire",
+    "Pose2DMsg": ".wire",
+    "Twist2DMsg": ".wire",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    # Later lookups find the name in the module dict and skip this hook
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,42 @@
+"""Shared MessagePack packing and unpacking for schema serialization.
+
+msgpack.packb() constructs a new Packer, with its own buffer, for every
+call. Messages are packed on hot paths, so each thread reuses one Packer
+instead (a Packer is not safe to share between threads).
+"""
+
+import threading
+from typing import Any, TypeVar
+
+import msgpack
+from pydantic import BaseModel
+
+_local = threading.local()
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def packb(obj: Any) -> bytes:
+    """Pack obj like msgpack.packb(obj), reusing this thread's Packer."""
+    packer = getattr(_local, "packer", None)
+    if packer is None:
+        packer = _local.packer = msgpack.Packer()
+    return packer.pack(obj)
+
+
+def pack_model(model: BaseModel) -> bytes:
+    """Pack a model's JSON-mode dump, as model_dump(mode="json") would give.
+
+    Calls the model's pydantic-core serializer directly, skipping the
+    argument handling model_dump() does in Python on every call.
+    """
+    return packb(model.__pydantic_serializer__.to_python(model, mode="json"))
+
+
+def unpack_model(cls: type[ModelT], data: bytes | memoryview) -> ModelT:
+    """Unpack MessagePack data and validate it as cls, like model_validate().
+
+    Calls the class's pydantic-core validator directly, for the same reason
+    as pack_model().
+    """
+    return cls.__pydantic_validator__.validate_python(msgpack.unpackb(data))
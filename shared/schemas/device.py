@@ -8,9 +8,10 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Self
 
-import msgpack
 from pydantic import BaseModel, Field
 
+from ._msgpack import pack_model, unpack_model
+
 
 class DeviceType(str, Enum):
     """Standard device types."""
@@ -97,11 +98,11 @@ class DeviceInfo(BaseModel):
 
     def to_msgpack(self) -> bytes:
         """Serialize to MessagePack format."""
-        return msgpack.packb(self.model_dump(mode="json"))
+        return pack_model(self)
     @classmethod
-    def from_msgpack(cls, data: bytes) -> Self:
+    def from_msgpack(cls, data: bytes | memoryview) -> Self:
         """Deserialize from MessagePack format."""
-        return cls.model_validate(msgpack.unpackb(data))
+        return unpack_model(cls, data)
 
 
 class DeviceStatus(BaseModel):
@@ -141,8 +142,8 @@ class DeviceStatus(BaseModel):
 
     def to_msgpack(self) -> bytes:
         """Serialize to MessagePack format."""
-        return msgpack.packb(self.model_dump(mode="json"))
+        return pack_model(self)
     @classmethod
-    def from_msgpack(cls, data: bytes) -> Self:
+    def from_msgpack(cls, data: bytes | memoryview) -> Self:
         """Deserialize from MessagePack format."""
-        return cls.model_validate(msgpack.unpackb(data))
+        return unpack_model(cls, data)
@@ -5,38 +5,101 @@ in the herdbot messaging system. Messages are serialized using MessagePack
 with JSON fallback.
 """
 
+import base64
+from collections.abc import Iterable
 from datetime import datetime
 from enum import Enum
-from typing import Any, Self
+from typing import Annotated, Any, Self, TypeVar
 from uuid import UUID, uuid4
 
 import msgpack
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer
+
+from ._msgpack import pack_model, packb, unpack_model
 
 
 class MessageBase(BaseModel):
-    """Base class for all messages with common fields."""
+    """Base class for all messages with common fields.
+
+    Messages are immutable once built (and hashable when their field values
+    are), so they can be shared between handlers and used as cache keys.
+    """
+
+    # Pydantic has no slots option for BaseModel; frozen is the part that applies
+    model_config = ConfigDict(frozen=True)
 
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
     def to_msgpack(self) -> bytes:
         """Serialize message to MessagePack format."""
-        data = self.model_dump(mode="json")
-        return msgpack.packb(data)
+        return pack_model(self)
 
     @classmethod
-    def from_msgpack(cls, data: bytes) -> Self:
+    def from_msgpack(cls, data: bytes | memoryview) -> Self:
         """Deserialize message from MessagePack format."""
-        return cls.model_validate(msgpack.unpackb(data))
+        return unpack_model(cls, data)
 
     def to_json(self) -> str:
         """Serialize message to JSON string."""
-        return self.model_dump_json()
+        return self.__pydantic_serializer__.to_json(self).decode()
+
+    def to_json_bytes(self) -> bytes:
+        """Serialize message to UTF-8 JSON bytes, without an intermediate str."""
+        return self.__pydantic_serializer__.to_json(self)
+
+    @staticmethod
+    def dumps_batch(messages: Iterable["MessageBase"]) -> bytes:
+        """Serialize messages to one JSON array, as UTF-8 bytes."""
+        return b"[" + b",".join(m.to_json_bytes() for m in messages) + b"]"
 
     @classmethod
     def from_json(cls, data: str | bytes) -> Self:
-        """Deserialize message from JSON string."""
-        return cls.model_validate_json(data)
+        """Deserialize message from a JSON string or UTF-8 bytes.
+
+        Either is passed to pydantic-core's JSON parser as it is, with no
+        decoding or re-encoding in Python.
+        """
+        return cls.__pydantic_validator__.validate_json(data)
+
+
+MessageT = TypeVar("MessageT", bound=MessageBase)
+
+
+class MessageBatch:
+    """Packs several messages into one MessagePack byte string.
+
+    Messages are packed back to back by one Packer into its internal buffer,
+    so a batch is sent as a single payload instead of one per message. The
+    payload is the concatenation of each message's to_msgpack() bytes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty batch."""
+        self._packer = msgpack.Packer(autoreset=False)
+        self._count = 0
+
+    def add(self, message: MessageBase) -> None:
+        """Append a message to the batch."""
+        self._packer.pack(message.__pydantic_serializer__.to_python(message, mode="json"))
+        self._count += 1
+
+    def flush(self) -> bytes:
+        """Get the packed batch and start a new, empty one."""
+        data = self._packer.bytes()
+        self._packer.reset()
+        self._count = 0
+        return data
+
+    def __len__(self) -> int:
+        return self._count
+
+    @staticmethod
+    def unpack(data: bytes | memoryview, cls: type[MessageT]) -> list[MessageT]:
+        """Decode a packed batch of messages of one type."""
+        unpacker = msgpack.Unpacker()
+        unpacker.feed(data)
+        validate = cls.__pydantic_validator__.validate_python
+        return [validate(obj) for obj in unpacker]
 
 
 class SensorType(str, Enum):
@@ -57,6 +120,14 @@ class SensorType(str, Enum):
     CUSTOM = "custom"
 
 
+# Binary sensor data; standard base64 in JSON, as msgspec writes it for the
+# wire structs (pydantic's own base64 mode is the URL-safe alphabet)
+BinaryValue = Annotated[
+    bytes,
+    PlainSerializer(lambda v: base64.b64encode(v).decode("ascii"), when_used="json"),
+]
+
+
 class SensorReading(MessageBase):
     """Sensor data reading from a device.
 
@@ -64,17 +135,35 @@ class SensorReading(MessageBase):
         device_id: Unique identifier of the source device
         sensor_type: Type of sensor (temperature, imu, etc.)
         sensor_id: Optional identifier for specific sensor on device
-        value: The sensor reading value(s)
+        value: The sensor reading value(s), or raw bytes for binary data
+            such as camera frames and lidar scans
         unit: Unit of measurement
         quality: Data quality indicator (0.0-1.0)
+        encoding: Format of a bytes value (e.g. "jpeg", "pcd_xyz_f32")
     """
 
+    # Bytes values are base64 strings in JSON
+    model_config = ConfigDict(val_json_bytes="base64")
+
     device_id: str
     sensor_type: SensorType
     sensor_id: str | None = None
-    value: float | list[float] | dict[str, Any]
+    value: float | list[float] | dict[str, Any] | BinaryValue
     unit: str
     quality: float = Field(default=1.0, ge=0.0, le=1.0)
+    encoding: str | None = None
+
+    def to_msgpack(self) -> bytes:
+        """Serialize message to MessagePack format.
+
+        A bytes value is packed as MessagePack bin, as is, rather than going
+        through the JSON-mode dump.
+        """
+        if not isinstance(self.value, bytes):
+            return pack_model(self)
+        data = self.__pydantic_serializer__.to_python(self, mode="json", exclude={"value"})
+        data["value"] = self.value
+        return packb(data)
 
 
 class Pose2D(MessageBase):
@@ -92,7 +181,7 @@ class Pose2D(MessageBase):
     y: float
     theta: float = Field(ge=-3.14159, le=3.14159)
     frame_id: str = "world"
-    covariance: list[float] | None = None
+    covariance: Annotated[list[float], Field(min_length=6, max_length=6)] | None = None
 
 
 class Twist2D(MessageBase):
@@ -0,0 +1,88 @@
+"""Packed binary sensor frames from microcontroller clients.
+
+Scalar sensor readings from MicroPython clients can be published as fixed-size
+big-endian records instead of JSON, on ``{prefix}/sensors/{device_id}/packed``.
+Each record is::
+
+    B  type tag (TYPE_SENSOR)
+    H  sensor index into the device's sensor table
+    f  value (float32)
+    I  device ticks_ms() when the reading was taken, wrapping at 2**30
+
+The sensor table is sent once in the device info message as
+``metadata["sensors"]``: a list of ``[sensor_id, sensor_type, unit]`` entries,
+where the list position is the sensor index.
+"""
+
+import struct
+from datetime import datetime, timedelta
+
+from .device import DeviceInfo
+from .messages import SensorReading, SensorType
+
+RECORD_FORMAT = ">BHfI"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+# Record type tags
+TYPE_SENSOR = 1
+
+# Period of MicroPython's ticks_ms(), which the record tick field wraps at
+TICKS_PERIOD = 1 << 30
+
+_SENSOR_TYPES = {t.value for t in SensorType}
+
+
+def decode_packed_readings(
+    device: DeviceInfo,
+    payload: bytes | memoryview,
+    received_at: datetime | None = None,
+) -> list[SensorReading]:
+    """Decode a packed sensor frame into sensor readings.
+
+    Record timestamps are reconstructed from the tick field, relative to the
+    last record in the frame, which is assumed to have been sent at
+    ``received_at``. Tick differences are taken modulo TICKS_PERIOD, so a
+    frame spanning a tick wrap still decodes. Records with an unknown tag or
+    sensor index are skipped.
+
+    Args:
+        device: Info of the publishing device, carrying the sensor table
+        payload: Frame payload (a whole number of records)
+        received_at: When the frame was received (defaults to now)
+
+    Returns:
+        Decoded sensor readings in frame order
+
+    Raises:
+        ValueError: If the payload is not a whole number of records
+    """
+    if len(payload) % RECORD_SIZE:
+        raise ValueError(f"Packed frame length {len(payload)} is not a multiple of {RECORD_SIZE}")
+
+    records = list(struct.iter_unpack(RECORD_FORMAT, payload))
+    if not records:
+        return []
+
+    sensors = device.metadata.get("sensors", [])
+    received_at = received_at or datetime.utcnow()
+    newest_ticks = records[-1][3]
+
+    readings = []
+    for tag, index, value, ticks_ms in records:
+        if tag != TYPE_SENSOR or index >= len(sensors):
+            continue
+
+        sensor_id, sensor_type, unit = sensors[index]
+        readings.append(
+            SensorReading(
+                timestamp=received_at
+                - timedelta(milliseconds=(newest_ticks - ticks_ms) % TICKS_PERIOD),
+                device_id=device.device_id,
+                sensor_type=sensor_type if sensor_type in _SENSOR_TYPES else SensorType.CUSTOM,
+                sensor_id=sensor_id,
+                value=value,
+                unit=unit,
+            )
+        )
+
+    return readings
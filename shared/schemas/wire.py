@@ -0,0 +1,80 @@
+"""msgspec mirrors of message schemas for the server's hot paths.
+
+Pydantic models stay the public API. These structs decode the same
+MessagePack payloads (``model_dump(mode="json")`` maps) and encode the same
+JSON, without building pydantic models in between.
+
+Decoded messages are read-only and hold no reference cycles, so the structs
+are frozen and not tracked by the cyclic garbage collector (gc=False).
+"""
+
+from datetime import datetime
+from typing import Annotated, Any
+from uuid import UUID
+
+import msgspec
+
+from .messages import SensorType
+
+
+class SensorReadingMsg(msgspec.Struct, kw_only=True, frozen=True, gc=False):
+    """Wire form of SensorReading."""
+
+    timestamp: datetime = msgspec.field(default_factory=datetime.utcnow)
+    device_id: str
+    sensor_type: SensorType
+    sensor_id: str | None = None
+    value: float | list[float] | dict[str, Any] | bytes
+    unit: str
+    quality: Annotated[float, msgspec.Meta(ge=0.0, le=1.0)] = 1.0
+    encoding: str | None = None
+
+
+class HeartbeatMsg(msgspec.Struct, kw_only=True, frozen=True, gc=False):
+    """Wire form of Heartbeat."""
+
+    timestamp: datetime = msgspec.field(default_factory=datetime.utcnow)
+    device_id: str
+    sequence: Annotated[int, msgspec.Meta(ge=0)]
+    uptime_ms: Annotated[int, msgspec.Meta(ge=0)]
+    load: Annotated[float, msgspec.Meta(ge=0.0, le=1.0)] = 0.0
+    memory_free: int | None = None
+
+
+class CommandResponseMsg(msgspec.Struct, kw_only=True, frozen=True, gc=False):
+    """Wire form of CommandResponse."""
+
+    timestamp: datetime = msgspec.field(default_factory=datetime.utcnow)
+    request_id: UUID
+    success: bool
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    execution_time_ms: int | None = None
+
+
+class Pose2DMsg(msgspec.Struct, kw_only=True, frozen=True, gc=False):
+    """Wire form of Pose2D."""
+
+    timestamp: datetime = msgspec.field(default_factory=datetime.utcnow)
+    x: float
+    y: float
+    theta: Annotated[float, msgspec.Meta(ge=-3.14159, le=3.14159)]
+    frame_id: str = "world"
+    covariance: Annotated[list[float], msgspec.Meta(min_length=6, max_length=6)] | None = None
+
+
+class Twist2DMsg(msgspec.Struct, kw_only=True, frozen=True, gc=False):
+    """Wire form of Twist2D."""
+
+    timestamp: datetime = msgspec.field(default_factory=datetime.utcnow)
+    linear_vel: float
+    angular_vel: float
+    device_id: str | None = None
+
+
+SENSOR_READING_DECODER = msgspec.msgpack.Decoder(SensorReadingMsg)
+HEARTBEAT_DECODER = msgspec.msgpack.Decoder(HeartbeatMsg)
+COMMAND_RESPONSE_DECODER = msgspec.msgpack.Decoder(CommandResponseMsg)
+POSE2D_DECODER = msgspec.msgpack.Decoder(Pose2DMsg)
+TWIST2D_DECODER = msgspec.msgpack.Decoder(Twist2DMsg)
+JSON_ENCODER = msgspec.json.Encoder()
@@ -1,10 +1,15 @@
 """Tests for API routes."""
 
+import asyncio
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
+from server.ai.base import AIProvider
 from server.api.main import create_app
 from server.core import Settings
+from shared.schemas import SensorReading
 
 
 @pytest.fixture
@@ -53,6 +58,18 @@ class TestDeviceEndpoints:
             assert "devices" in data
             assert "total" in data
 
+    def test_list_devices_with_status(self, client):
+        client.post(
+            "/devices",
+            json={"device_id": "test-001", "device_type": "sensor_node", "name": "Test"},
+        )
+
+        response = client.get("/devices", params={"with_status": "true"})
+
+        if response.status_code == 200:
+            data = response.json()
+            assert data["statuses"]["test-001"]["status"] == "online"
+
     def test_get_nonexistent_device(self, client):
         response = client.get("/devices/nonexistent-device")
 
@@ -60,6 +77,114 @@ class TestDeviceEndpoints:
         assert response.status_code in [404, 500]
 
 
+class TestTelemetryEndpoints:
+    """Tests for telemetry endpoints."""
+
+    def test_publish_reaches_stream_subscribers(self, client):
+        with client.websocket_connect("/telemetry/stream/test-001") as ws:
+            client.post(
+                "/telemetry/publish",
+                json={
+                    "device_id": "test-001",
+                    "sensor_type": "temperature",
+                    "value": 21.5,
+                    "unit": "C",
+                },
+            )
+
+            data = ws.receive_json(mode="binary")
+            assert data["device_id"] == "test-001"
+            assert data["value"] == 21.5
+
+    def test_stats_counts_published_messages(self, client):
+        before = client.get("/telemetry/stats").json()
+        client.post(
+            "/telemetry/publish",
+            json={"device_id": "test-001", "sensor_type": "temperature", "value": 1, "unit": "C"},
+        )
+
+        stats = client.get("/telemetry/stats").json()
+        assert stats["total_messages"] == before["total_messages"] + 1
+        assert stats["messages_per_second"] > 0
+
+    def test_publish_batch(self, client):
+        before = client.get("/telemetry/stats").json()
+        response = client.post(
+            "/telemetry/publish/batch",
+            json=[
+                {"device_id": "test-001", "sensor_type": "temperature", "value": 1, "unit": "C"},
+                {"device_id": "test-001", "sensor_type": "battery", "value": 90, "unit": "%"},
+            ],
+        )
+
+        assert response.json() == {"status": "ok", "count": 2}
+        stats = client.get("/telemetry/stats").json()
+        assert stats["total_messages"] == before["total_messages"] + 2
+
+    async def test_broadcast_drops_oldest_for_slow_clients(self):
+        from server.api.routes import telemetry
+
+        queue = asyncio.Queue(maxsize=2)
+        telemetry._all_connections.add(queue)
+        try:
+            for value in (1.0, 2.0, 3.0):
+                reading = SensorReading(
+                    device_id="test-001", sensor_type="temperature", value=value, unit="C"
+                )
+                await telemetry.broadcast_sensor_data("test-001", reading)
+                telemetry._flush_pending()
+
+            values = [json.loads(queue.get_nowait()["bytes"])["value"] for _ in range(2)]
+            assert values == [2.0, 3.0]
+        finally:
+            telemetry._all_connections.clear()
+
+    async def test_broadcast_batches_readings_in_one_frame(self):
+        from server.api.routes import telemetry
+
+        queue = asyncio.Queue()
+        telemetry._all_connections.add(queue)
+        try:
+            for value in (1.0, 2.0):
+                reading = SensorReading(
+                    device_id="test-001", sensor_type="temperature", value=value, unit="C"
+                )
+                await telemetry.broadcast_sensor_data("test-001", reading)
+            await asyncio.sleep(telemetry._BATCH_WINDOW_S * 5)
+
+            assert queue.qsize() == 1
+            frame = json.loads(queue.get_nowait()["bytes"])
+            assert [r["value"] for r in frame] == [1.0, 2.0]
+        finally:
+            telemetry._all_connections.clear()
+
+
+class FakeProvider(AIProvider):
+    """Provider that answers with the prompt, recording its calls."""
+
+    name = "fake"
+    model = "fake-1"
+
+    def __init__(self):
+        self.calls = 0
+        self.batches = []
+
+    async def interpret(self, data, prompt, compression_level=None):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"interpretation": prompt}
+
+    async def interpret_batch(self, items):
+        self.batches.append(len(items))
+        return [{"interpretation": prompt} for _, prompt in items]
+
+    async def plan(self, goal, context, constraints=None):
+        raise NotImplementedError
+
+    async def chat(self, message, history=None, system_prompt=None):
+        raise NotImplementedError
+
+
 class TestAIEndpoints:
     """Tests for AI endpoints."""
 
@@ -70,6 +195,7 @@ class TestAIEndpoints:
             data = response.json()
             assert "providers" in data
             assert "default" in data
+            assert set(data["cache"]) == {"hits", "misses", "size"}
 
     def test_chat_without_api_key(self, client):
         response = client.post(
@@ -79,3 +205,117 @@ class TestAIEndpoints:
 
         # Should return 500/503 if no API keys configured, 200 if configured
         assert response.status_code in [200, 500, 503]
+
+    def test_chat_stream_without_api_key(self, client):
+        response = client.post(
+            "/ai/chat/stream",
+            json={"message": "Hello"},
+        )
+
+        # Should return 500/503 if no API keys configured, 200 if configured
+        assert response.status_code in [200, 500, 503]
+        if response.status_code == 200:
+            assert response.headers["content-type"].startswith("text/event-stream")
+
+    def test_response_cache_skips_sampled_requests(self):
+        from server.ai.cache import LLMCache
+
+        cache = LLMCache(maxsize=1)
+        messages = [{"role": "user", "content": "status?"}]
+        assert cache.cache_key("gpt", messages, temperature=0.7) is None
+
+        key = cache.cache_key("gpt", messages, temperature=0.0)
+        cache.set(key, {"response": "ok"})
+        assert cache.get(key) == {"response": "ok"}
+        assert cache.stats == {"hits": 1, "misses": 0, "size": 1}
+
+    def test_semantic_cache_matches_within_namespace(self):
+        from server.ai.cache import SemanticLLMCache
+
+        cache = SemanticLLMCache(maxsize=2, threshold=0.9)
+        cache.add("gpt", [1.0, 0.0, 0.0], {"response": "ok"})
+
+        assert cache.get("gpt", [0.99, 0.05, 0.0]) == {"response": "ok"}
+        assert cache.get("gpt", [0.0, 1.0, 0.0]) is None
+        assert cache.get("other", [1.0, 0.0, 0.0]) is None
+        assert cache.stats == {"hits": 1, "misses": 2, "size": 1}
+
+    async def test_batching_interpreter_coalesces_calls(self):
+        from server.ai.manager import BatchingInterpreter
+
+        provider = FakeProvider()
+        batcher = BatchingInterpreter(provider, window_s=0.01, max_batch=8)
+        results = await asyncio.gather(*(batcher.interpret({}, str(i)) for i in range(3)))
+        await batcher.close()
+
+        assert [r["interpretation"] for r in results] == ["0", "1", "2"]
+        assert provider.batches == [3]
+
+    async def test_manager_joins_identical_requests_in_flight(self):
+        from server.ai.manager import AIManager
+
+        provider = FakeProvider()
+        manager = AIManager()
+        manager._providers = {"fake": provider}
+        manager._default_provider = "fake"
+        manager._initialized = True
+
+        results = await asyncio.gather(
+            manager.interpret({"t": 1}, "status?"),
+            manager.interpret({"t": 1}, "status?"),
+            manager.interpret({"t": 2}, "status?"),
+        )
+
+        assert provider.calls == 2
+        assert results[0] == results[1]
+        assert results[0] is not results[1]
+
+    async def test_manager_health_checks_are_cached(self):
+        from server.ai.manager import AIManager
+
+        manager = AIManager()
+        manager._providers = {"fake": FakeProvider()}
+        manager._initialized = True
+
+        health = await manager.check_health()
+
+        assert health["fake"]["healthy"] is True
+        assert health["fake"]["latency_ms"] >= 0
+        checked_at = manager._health[0]
+        assert await manager.check_health() == health
+        assert manager._health[0] == checked_at
+
+    def test_compress_payload_levels(self):
+        from server.ai.compression import compress_payload
+
+        data = {"samples": list(range(20)), "error": None}
+        assert compress_payload(data, "compact").startswith('{"samples":[0,1,2,')
+
+        crushed = json.loads(compress_payload(data, "aggressive"))
+        assert crushed == {
+            "samples": [0, 1, 2, {"omitted": 14, "min": 0, "max": 19, "mean": 9.5}, 17, 18, 19]
+        }
+
+        rows = [{"id": "a", "v": 1}, {"id": "b", "v": 2}]
+        assert json.loads(compress_payload(rows, "aggressive")) == {
+            "columns": ["id", "v"],
+            "rows": [["a", 1], ["b", 2]],
+        }
+
+    def test_enforce_budget_truncates_large_payloads(self):
+        from server.ai.budget import count_tokens, enforce_budget
+
+        small = {"temperature": 21.5}
+        assert enforce_budget(small, max_tokens=100) == (
+            small,
+            count_tokens(json.dumps(small, separators=(",", ":"))),
+        )
+
+        data = {"log": "x" * 50_000, "samples": list(range(10_000))}
+        truncated, tokens = enforce_budget(data, max_tokens=1000)
+
+        assert tokens <= 1000
+        assert truncated["samples"][0] == 0
+        assert truncated["samples"][-1] == 9999
+        assert any(isinstance(s, dict) and "omitted" in s for s in truncated["samples"])
+        assert truncated["log"].endswith("chars]")
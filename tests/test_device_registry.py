@@ -0,0 +1,75 @@
+"""Tests for the device registry."""
+
+import asyncio
+
+import pytest
+
+from server.core import DeviceRegistry
+from shared.schemas import ConnectionStatus, DeviceInfo
+
+
+@pytest.fixture
+def registry():
+    """Create a registry with a short heartbeat timeout."""
+    return DeviceRegistry(heartbeat_timeout_ms=50)
+
+
+def make_device(device_id: str) -> DeviceInfo:
+    return DeviceInfo(device_id=device_id, device_type="sensor_node", name=device_id)
+
+
+class TestDeviceHealth:
+    """Tests for heartbeat timeouts."""
+
+    async def test_device_marked_offline_after_timeout(self, registry):
+        offline = []
+        registry.on_device_offline(offline.append)
+        await registry.register_device(make_device("dev-01"))
+
+        await asyncio.sleep(0.06)
+        await registry._check_device_health()
+
+        assert offline == ["dev-01"]
+        assert registry.get_status("dev-01").status == ConnectionStatus.OFFLINE
+
+    async def test_heartbeat_keeps_device_online(self, registry):
+        offline = []
+        registry.on_device_offline(offline.append)
+        await registry.register_device(make_device("dev-01"))
+
+        await asyncio.sleep(0.03)
+        await registry.update_heartbeat("dev-01", uptime_ms=1000)
+        await asyncio.sleep(0.03)
+        await registry._check_device_health()
+
+        assert offline == []
+        status = registry.get_status("dev-01")
+        assert status.status == ConnectionStatus.ONLINE
+        assert status.uptime_ms == 1000
+
+    async def test_reconnect_fires_online_callbacks(self, registry):
+        online = []
+
+        async def on_online(device_id, info):
+            online.append(device_id)
+
+        registry.on_device_online(on_online)
+        await registry.register_device(make_device("dev-01"))
+        await asyncio.sleep(0.06)
+        await registry._check_device_health()
+
+        await registry.update_heartbeat("dev-01")
+
+        assert online == ["dev-01", "dev-01"]
+
+    async def test_snapshot_counts_online_devices(self, registry):
+        await registry.register_device(make_device("dev-01"))
+        await registry.register_device(make_device("dev-02"))
+        await asyncio.sleep(0.06)
+        await registry._check_device_health()
+        await registry.update_heartbeat("dev-02")
+
+        devices, online = registry.snapshot()
+
+        assert [d.device_id for d in devices] == ["dev-01", "dev-02"]
+        assert online == len(registry.get_online_devices()) == 1
@@ -1,20 +1,31 @@
 """Tests for message schemas."""
 
+import struct
 from datetime import datetime
 from uuid import UUID
 
+import msgspec
 import pytest
 
 from shared.schemas import (
     Command,
     CommandResponse,
+    CommandResponseMsg,
     ConnectionStatus,
     DeviceInfo,
     DeviceStatus,
     DeviceType,
+    Heartbeat,
+    HeartbeatMsg,
+    MessageBatch,
     Pose2D,
+    Pose2DMsg,
     SensorReading,
+    SensorReadingMsg,
     SensorType,
+    Twist2D,
+    Twist2DMsg,
+    decode_packed_readings,
 )
 
 
@@ -63,6 +74,61 @@ class TestSensorReading:
         assert unpacked.device_id == reading.device_id
         assert unpacked.value == reading.value
 
+    def test_wire_struct_matches_model_json(self):
+        reading = SensorReading(
+            device_id="test",
+            sensor_type=SensorType.IMU_6DOF,
+            value={"accel": [0.0, 0.0, 9.8], "gyro": [0.0, 0.0, 0.0]},
+            unit="mixed",
+        )
+
+        wire = msgspec.msgpack.decode(reading.to_msgpack(), type=SensorReadingMsg)
+        assert msgspec.json.encode(wire) == reading.model_dump_json().encode()
+
+    def test_bytes_value(self):
+        reading = SensorReading(
+            device_id="cam-01",
+            sensor_type=SensorType.CAMERA,
+            value=bytes(range(256)),
+            unit="",
+            encoding="jpeg",
+        )
+
+        packed = reading.to_msgpack()
+        assert bytes(range(256)) in packed
+        assert SensorReading.from_msgpack(packed) == reading
+        assert SensorReading.from_json(reading.to_json()) == reading
+
+        wire = msgspec.msgpack.decode(packed, type=SensorReadingMsg)
+        assert wire.value == reading.value
+        assert msgspec.json.decode(msgspec.json.encode(wire)) == reading.model_dump(mode="json")
+
+    def test_json_bytes_batch(self):
+        readings = [
+            SensorReading(device_id=f"s{i}", sensor_type=SensorType.HUMIDITY, value=i, unit="%")
+            for i in range(3)
+        ]
+
+        body = SensorReading.dumps_batch(readings)
+        assert body == b"[" + b",".join(r.model_dump_json().encode() for r in readings) + b"]"
+        assert SensorReading.from_json(readings[0].to_json_bytes()) == readings[0]
+
+    def test_msgpack_batch(self):
+        readings = [
+            SensorReading(device_id=f"s{i}", sensor_type=SensorType.LIGHT, value=i, unit="lx")
+            for i in range(3)
+        ]
+        batch = MessageBatch()
+        for reading in readings:
+            batch.add(reading)
+        assert len(batch) == 3
+
+        packed = batch.flush()
+        assert packed == b"".join(r.to_msgpack() for r in readings)
+        assert MessageBatch.unpack(packed, SensorReading) == readings
+        assert len(batch) == 0
+        assert batch.flush() == b""
+
 
 class TestPose2D:
     """Tests for Pose2D schema."""
@@ -82,6 +148,19 @@ class TestPose2D:
         with pytest.raises(ValueError):
             Pose2D(x=0, y=0, theta=-4.0)  # < -pi
 
+    def test_covariance_length(self):
+        with pytest.raises(ValueError):
+            Pose2D(x=0, y=0, theta=0, covariance=[0.1] * 9)
+
+    def test_wire_structs_match_model_json(self):
+        pose = Pose2D(x=1.0, y=2.0, theta=0.5, covariance=[0.1] * 6)
+        wire = msgspec.msgpack.decode(pose.to_msgpack(), type=Pose2DMsg)
+        assert msgspec.json.encode(wire) == pose.model_dump_json().encode()
+
+        twist = Twist2D(linear_vel=0.5, angular_vel=-0.1, device_id="robot-01")
+        wire = msgspec.msgpack.decode(twist.to_msgpack(), type=Twist2DMsg)
+        assert msgspec.json.encode(wire) == twist.model_dump_json().encode()
+
 
 class TestCommand:
     """Tests for Command schema."""
@@ -98,6 +177,13 @@ class TestCommand:
         assert cmd.params["linear"] == 0.5
         assert isinstance(cmd.request_id, UUID)
 
+    def test_messages_are_frozen(self):
+        heartbeat = Heartbeat(device_id="robot-01", sequence=1, uptime_ms=10)
+
+        with pytest.raises(ValueError):
+            heartbeat.sequence = 2
+        assert hash(heartbeat) == hash(heartbeat.model_copy())
+
     def test_command_response(self):
         cmd = Command(device_id="test", action="test")
 
@@ -111,6 +197,17 @@ class TestCommand:
         assert response.success is True
         assert response.error is None
 
+    def test_wire_structs_decode_msgpack(self):
+        cmd = Command(device_id="test", action="test")
+        response = CommandResponse(request_id=cmd.request_id, success=False, error="busy")
+        wire = msgspec.msgpack.decode(response.to_msgpack(), type=CommandResponseMsg)
+        assert wire.request_id == response.request_id
+        assert wire.error == "busy"
+
+        heartbeat = Heartbeat(device_id="robot-01", sequence=3, uptime_ms=1200, load=0.5)
+        wire = msgspec.msgpack.decode(heartbeat.to_msgpack(), type=HeartbeatMsg)
+        assert msgspec.json.encode(wire) == heartbeat.model_dump_json().encode()
+
 
 class TestDeviceInfo:
     """Tests for DeviceInfo schema."""
@@ -158,3 +255,63 @@ class TestDeviceStatus:
         )
 
         assert status.is_online() is False
+
+
+class TestPackedReadings:
+    """Tests for packed binary sensor frames."""
+
+    def test_decode_packed_frame(self):
+        device = DeviceInfo(
+            device_id="pico-01",
+            device_type=DeviceType.SENSOR_NODE,
+            metadata={"sensors": [["hcsr04", "distance", "mm"], ["temp", "temperature", "C"]]},
+        )
+        payload = struct.pack(">BHfI", 1, 1, 21.5, 1000) + struct.pack(">BHfI", 1, 0, 150.0, 1200)
+        received_at = datetime(2024, 1, 1, 12, 0, 0)
+
+        readings = decode_packed_readings(device, payload, received_at=received_at)
+
+        assert [r.sensor_id for r in readings] == ["temp", "hcsr04"]
+        assert readings[0].sensor_type == SensorType.TEMPERATURE
+        assert readings[0].value == 21.5
+        assert readings[1].unit == "mm"
+        assert readings[1].timestamp == received_at
+        assert (received_at - readings[0].timestamp).total_seconds() == 0.2
+
+    def test_decode_frame_across_tick_wrap(self):
+        device = DeviceInfo(
+            device_id="pico-01",
+            device_type=DeviceType.SENSOR_NODE,
+            metadata={"sensors": [["temp", "temperature", "C"]]},
+        )
+        payload = struct.pack(">BHfI", 1, 0, 21.5, (1 << 30) - 150) + struct.pack(
+            ">BHfI", 1, 0, 21.6, 50
+        )
+        received_at = datetime(2024, 1, 1, 12, 0, 0)
+
+        readings = decode_packed_readings(device, payload, received_at=received_at)
+
+        assert readings[1].timestamp == received_at
+        assert (received_at - readings[0].timestamp).total_seconds() == 0.2
+
+    def test_decode_rejects_truncated_frame(self):
+        device = DeviceInfo(device_id="pico-01", device_type=DeviceType.SENSOR_NODE)
+
+        with pytest.raises(ValueError):
+            decode_packed_readings(device, b"\x01\x00")
+
+
+class TestPackageExports:
+    """Tests for the lazily loaded package exports."""
+
+    def test_all_exports_resolve(self):
+        import shared.schemas
+
+        for name in shared.schemas.__all__:
+            assert getattr(shared.schemas, name).__name__ == name
+
+    def test_unknown_name_raises(self):
+        import shared.schemas
+
+        with pytest.raises(AttributeError):
+            shared.schemas.NotASchema  # noqa: B018
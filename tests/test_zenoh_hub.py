@@ -0,0 +1,147 @@
+"""Tests for the Zenoh hub's message handling."""
+
+import struct
+from datetime import datetime, timedelta
+
+import pytest
+
+from server.core import DeviceRegistry, Settings
+from server.core.zenoh_hub import ZenohHub
+from server.viz.formatters import format_sensor_reading
+from shared.schemas import DeviceInfo, SensorReading, SensorType
+
+
+@pytest.fixture
+def registry():
+    return DeviceRegistry()
+
+
+@pytest.fixture
+def hub(registry):
+    """Create a hub without starting its Zenoh session."""
+    return ZenohHub(Settings(server_id="test-server"), registry)
+
+
+class TestSensorData:
+    """Tests for sensor data decoding and dispatch."""
+
+    async def test_msgpack_reading(self, hub):
+        received = []
+        hub.add_sensor_handler(lambda key, payload, reading: received.append(reading))
+        reading = SensorReading(
+            device_id="robot-01", sensor_type=SensorType.TEMPERATURE, value=21.5, unit="C"
+        )
+
+        await hub._handle_sensor_data("herd/sensors/robot-01/temp", reading.to_msgpack())
+
+        assert [r.value for r in received] == [21.5]
+        assert hub.sensor_messages == 1
+
+    async def test_packed_frame(self, hub, registry):
+        await registry.register_device(
+            DeviceInfo(
+                device_id="pico-01",
+                device_type="sensor_node",
+                metadata={"sensors": [["hcsr04", "distance", "mm"], ["temp", "temperature", "C"]]},
+            )
+        )
+        received = []
+        hub.add_sensor_handler(lambda key, payload, reading: received.append(reading))
+        frame = struct.pack(">BHfI", 1, 1, 21.5, 1000) + struct.pack(">BHfI", 1, 0, 150.0, 1200)
+
+        await hub._handle_sensor_data("herd/sensors/pico-01/packed", frame)
+
+        assert [(r.device_id, r.sensor_id, r.value) for r in received] == [
+            ("pico-01", "temp", 21.5),
+            ("pico-01", "hcsr04", 150.0),
+        ]
+        assert received[0].sensor_type == SensorType.TEMPERATURE
+        assert hub.sensor_messages == 2
+
+    async def test_packed_frame_from_unknown_device(self, hub):
+        received = []
+        hub.add_sensor_handler(lambda key, payload, reading: received.append(reading))
+
+        await hub._handle_sensor_data(
+            "herd/sensors/pico-02/packed", struct.pack(">BHfI", 1, 0, 1.0, 0)
+        )
+
+        assert received == []
+
+    async def test_imu_batch_is_split_per_sample(self, hub):
+        received = []
+        hub.add_sensor_handler(lambda key, payload, reading: received.append(reading))
+        timestamp = datetime(2024, 1, 1, 12, 0, 0)
+        reading = SensorReading(
+            timestamp=timestamp,
+            device_id="esp32-01",
+            sensor_type=SensorType.IMU_6DOF,
+            sensor_id="imu",
+            value={
+                "samples": [
+                    [(1 << 30) - 30, 0.1, 0.2, 9.8, 0.01, 0.02, 0.03],
+                    [20, 0.2, 0.3, 9.7, 0.04, 0.05, 0.06],
+                ]
+            },
+            unit="m/s^2,rad/s",
+        )
+
+        await hub._handle_sensor_data("herd/sensors/esp32-01/imu", reading.to_msgpack())
+
+        assert [r.value for r in received] == [
+            {"accel": [0.1, 0.2, 9.8], "gyro": [0.01, 0.02, 0.03]},
+            {"accel": [0.2, 0.3, 9.7], "gyro": [0.04, 0.05, 0.06]},
+        ]
+        assert [r.timestamp for r in received] == [
+            timestamp - timedelta(milliseconds=50),
+            timestamp,
+        ]
+        assert hub.sensor_messages == 2
+
+        formatted = format_sensor_reading(
+            SensorReading.model_validate(received[1], from_attributes=True)
+        )
+        assert formatted["accel"] == [0.2, 0.3, 9.7]
+        assert formatted["gyro"] == [0.04, 0.05, 0.06]
+
+
+class _FakeQuerier:
+    def __init__(self, key_expr):
+        self.key_expr = key_expr
+        self.undeclared = False
+
+    def get(self, parameters=None):
+        return []
+
+    def undeclare(self):
+        self.undeclared = True
+
+
+class _FakeSession:
+    def __init__(self):
+        self.declared = []
+
+    def declare_querier(self, key_expr, timeout):
+        querier = _FakeQuerier(key_expr)
+        self.declared.append(querier)
+        return querier
+
+
+class TestQuery:
+    """Tests for querier reuse."""
+
+    async def test_querier_cache_is_bounded(self, hub, monkeypatch):
+        monkeypatch.setattr("server.core.zenoh_hub._QUERIER_CACHE_SIZE", 2)
+        session = hub._session = _FakeSession()
+
+        await hub.query("herd/sensors/a/**")
+        await hub.query("herd/sensors/b/**")
+        await hub.query("herd/sensors/a/**?limit=1")
+        await hub.query("herd/sensors/c/**")
+
+        assert [q.key_expr for q in session.declared] == [
+            "herd/sensors/a/**",
+            "herd/sensors/b/**",
+            "herd/sensors/c/**",
+        ]
+        assert [q.undeclared for q in session.declared] == [False, True, False]